@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app import settings
+from app.api.v1.user import get_current_user
+from app.history.service import naive_utc
+
+from app.nomicsapi.refresher import PriceRefresher, get_price_refresher
+from app.repositories.price import AsyncPriceRepository, get_price_repository
+
+
+price_router = APIRouter(prefix='/api/v1/prices')
+
+
+@price_router.get('/refresher', status_code=status.HTTP_200_OK, tags=['Prices'])
+async def get_price_refresher_status(
+    user: dict = Depends(get_current_user),
+    refresher: PriceRefresher = Depends(get_price_refresher)
+):
+    return {'data': refresher.status()}
+
+
+@price_router.get('/{asset}/history', status_code=status.HTTP_200_OK, tags=['Prices'])
+async def get_price_history(
+    asset: str,
+    start: datetime,
+    end: datetime,
+    user: dict = Depends(get_current_user),
+    repository: AsyncPriceRepository = Depends(get_price_repository)
+):
+    # compared as naive UTC, an aware and a naive datetime are not comparable
+    start, end = naive_utc(start), naive_utc(end)
+    if start > end or end - start > timedelta(days=settings.MAX_PRICE_HISTORY_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid time range..'
+        )
+
+    return {'data': await repository.get_range(asset, start, end)}
+
+
+@price_router.get('/{asset}', status_code=status.HTTP_200_OK, tags=['Prices'])
+async def get_price_at(
+    asset: str,
+    at: datetime,
+    user: dict = Depends(get_current_user),
+    repository: AsyncPriceRepository = Depends(get_price_repository)
+):
+    price = await repository.get_at(asset, at)
+    if not price:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Price is not found..'
+        )
+
+    return {'data': price}
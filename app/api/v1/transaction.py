@@ -1,13 +1,20 @@
-import datetime
-
+from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, Depends, UploadFile, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, HTTPException, Query, status
 
+from app import settings
 from app.api.v1.user import get_current_user
 
-from app.nomicsapi.service import api_handler
+from app.costbasis.service import apply_unrealized_pnl
+from app.history.service import \
+    build_price_series, \
+    build_timeline, \
+    compute_history, \
+    count_points
+from app.nomicsapi.service import NomicsAPIHandler, get_api_handler
+from app.repositories.price import AsyncPriceRepository, get_price_repository
 from app.repositories.transaction import \
-    TransactionRepository, \
+    AsyncTransactionRepository, \
     get_transaction_repository
 from app.schemas.transaction import Transaction
 
@@ -20,25 +27,30 @@ transaction_router = APIRouter(prefix='/api/v1/transactions')
     status_code=status.HTTP_200_OK,
     tags=['Transactions']
 )
-def get_all_transaction(
+async def get_all_transaction(
     asset: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[str] = None,
     user: dict = Depends(get_current_user),
-    repository: TransactionRepository = Depends(get_transaction_repository)
+    repository: AsyncTransactionRepository = Depends(get_transaction_repository)
 ):
     if asset:
-        return {'data': repository.get_all_by_asset(asset)}
-
-    transactions = repository.get_all(owner_id=user['id'])
-    transactions = sorted(
-        transactions,
-        key=lambda t: datetime.datetime(
-            int(t['date'].split('-')[0]),
-            int(t['date'].split('-')[1]),
-            int(t['date'].split('-')[2])
-        ),
-        reverse=True
-    )
-    return {'data': transactions}
+        return {'data': await repository.get_all_by_asset(asset, owner_id=user['id'])}
+
+    if limit or after:
+        try:
+            return await repository.get_page(
+                limit or settings.DEFAULT_PAGE_SIZE,
+                after,
+                owner_id=user['id']
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Invalid cursor..'
+            )
+
+    return {'data': await repository.get_all_sorted_by_date(owner_id=user['id'])}
 
 
 @transaction_router.post(
@@ -46,13 +58,13 @@ def get_all_transaction(
     status_code=status.HTTP_201_CREATED,
     tags=['Transactions']
 )
-def create_new_transaction(
+async def create_new_transaction(
     new_transaction: Transaction,
     user: dict = Depends(get_current_user),
-    repository: TransactionRepository = Depends(get_transaction_repository)
+    repository: AsyncTransactionRepository = Depends(get_transaction_repository)
 ):
     try:
-        stored_transaction = repository.create(new_transaction)
+        stored_transaction = await repository.create(new_transaction)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -68,16 +80,72 @@ def create_new_transaction(
     tags=['Transactions']
 )
 async def calculate_portfolio(
+    include_transactions: bool = False,
+    cost_basis: Optional[str] = Query(default=None, pattern='^(fifo|lifo|average)$'),
     user: dict = Depends(get_current_user),
-    repository: TransactionRepository = Depends(get_transaction_repository)
+    repository: AsyncTransactionRepository = Depends(get_transaction_repository),
+    api_handler: NomicsAPIHandler = Depends(get_api_handler)
 ):
-    portfolio = repository.calculate_portfolio(owner_id=user['id'])
+    portfolio = await repository.calculate_portfolio(
+        include_transactions=include_transactions,
+        cost_basis=cost_basis,
+        owner_id=user['id']
+    )
     if not portfolio:
         return {'data': {'portfolio': {}}}
 
-    api_data = await api_handler.get_asset_data(*portfolio['assets'].keys())
+    api_data, missing_assets, prices_stale = await api_handler.lookup(
+        *portfolio['assets'].keys(),
+        timeout=settings.PRICE_LOOKUP_TIMEOUT
+    )
+    if cost_basis:
+        apply_unrealized_pnl(
+            portfolio,
+            {asset: data['price'] for asset, data in api_data.items() if 'price' in data}
+        )
+
+    return {
+        'data': {
+            'portfolio': portfolio,
+            'api_data': api_data,
+            'missing_assets': missing_assets,
+            'prices_stale': prices_stale
+        }
+    }
+
+
+@transaction_router.get(
+    '/portfolio/history',
+    status_code=status.HTTP_200_OK,
+    tags=['Transactions']
+)
+async def get_portfolio_history(
+    start: datetime = Query(alias='from'),
+    end: datetime = Query(alias='to'),
+    interval: str = Query(default='day', pattern='^(hour|day|week)$'),
+    user: dict = Depends(get_current_user),
+    repository: AsyncTransactionRepository = Depends(get_transaction_repository),
+    price_repository: AsyncPriceRepository = Depends(get_price_repository)
+):
+    # checked before building, a huge range must not allocate its timeline
+    points = count_points(start, end, interval)
+    if not points or points > settings.MAX_HISTORY_POINTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid time range..'
+        )
+
+    timeline = build_timeline(start, end, interval)
 
-    return {'data': {'portfolio': portfolio, 'api_data': api_data}}
+    transactions = await repository.get_all(owner_id=user['id'])
+    assets = sorted({transaction['asset'].upper() for transaction in transactions})
+    # the last price before the range values the first points
+    price_series = build_price_series(
+        await price_repository.get_range_series(assets, start, end),
+        await price_repository.get_at_many(assets, start)
+    )
+
+    return {'data': compute_history(transactions, price_series, timeline)}
 
 
 @transaction_router.get(
@@ -85,13 +153,13 @@ async def calculate_portfolio(
     status_code=status.HTTP_200_OK,
     tags=['Transactions']
 )
-def get_transaction_by_id(
+async def get_transaction_by_id(
     id: str,
     user: dict = Depends(get_current_user),
-    repository: TransactionRepository = Depends(get_transaction_repository)
+    repository: AsyncTransactionRepository = Depends(get_transaction_repository)
 ):
     try:
-        lookup_transaction = repository.get_by_id(id)
+        lookup_transaction = await repository.get_by_id(id)
     except:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -112,14 +180,14 @@ def get_transaction_by_id(
     status_code=status.HTTP_200_OK,
     tags=['Transactions']
 )
-def update_transactionby_id(
+async def update_transactionby_id(
     id: str,
     update_data: dict,
     user: dict = Depends(get_current_user),
-    repository: TransactionRepository = Depends(get_transaction_repository)
+    repository: AsyncTransactionRepository = Depends(get_transaction_repository)
 ):
     try:
-        updated_transaction = repository.update_by_id(id, update_data)
+        updated_transaction = await repository.update_by_id(id, update_data)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -139,13 +207,13 @@ def update_transactionby_id(
     status_code=status.HTTP_200_OK,
     tags=['Transactions']
 )
-def delete_transaction_by_id(
+async def delete_transaction_by_id(
     id: str,
     user: dict = Depends(get_current_user),
-    repository: TransactionRepository = Depends(get_transaction_repository)
+    repository: AsyncTransactionRepository = Depends(get_transaction_repository)
 ):
     try:
-        deleted_transaction = repository.delete_by_id(id)
+        deleted_transaction = await repository.delete_by_id(id)
     except:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -169,27 +237,17 @@ def delete_transaction_by_id(
 async def import_transaction_csv(
     file: UploadFile,
     user: dict = Depends(get_current_user),
-    repository: TransactionRepository = Depends(get_transaction_repository)
+    repository: AsyncTransactionRepository = Depends(get_transaction_repository)
 ):  # pragma: no cover
     if file.filename.split('.')[-1] not in {'csv'}:
         return{'error': 'Wrong file type..'}
 
-    try:
-        transactions = await repository.import_csv(file)
-    except:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail='Invalid transaction data..'
-        )
-
-    try:
-        for transaction in transactions:
-            transaction['owner_id'] = user['id']
-            repository.create(transaction)
-    except:
+    result = await repository.import_csv(file, user['id'])
+    # a file that broke off after some rows were stored is reported, not failed
+    if result['aborted'] and not result['imported']:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail='Invalid transaction data..'
+            detail=f"Invalid transaction data.. {result['aborted']}"
         )
 
-    return {'data': {'processed_file': file.filename, 'data': transactions}}
+    return {'data': {'processed_file': file.filename, **result}}
@@ -1,8 +1,12 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from pymongo.errors import DuplicateKeyError
 
-from app.repositories.user import UserRepository, get_user_repository
-from app.schemas.user import User
+from app.auth.service import TokenVerifier, get_token_verifier
+from app.repositories.user import AsyncUserRepository, UserRepository, get_user_repository
+from app.schemas.user import RefreshToken, User
 
 
 oauth2_schema = OAuth2PasswordBearer(tokenUrl='/api/v1/users/auth')
@@ -16,19 +20,17 @@ user_router = APIRouter(prefix='/api/v1/users')
     status_code=status.HTTP_201_CREATED,
     tags=['Users']
 )
-def create_new_user(
+async def create_new_user(
     new_user: User,
-    repository: UserRepository = Depends(get_user_repository)
+    repository: AsyncUserRepository = Depends(get_user_repository)
 ):
-    db_user = repository.get_by_username(new_user.username)
-    if db_user:
+    try:
+        stored_user = await repository.create(new_user)
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='This username is already taken..'
         )
-
-    try:
-        stored_user = repository.create(new_user)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -43,11 +45,11 @@ def create_new_user(
     status_code=status.HTTP_200_OK,
     tags=['Users']
 )
-def auth_user(
+async def auth_user(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    repository: UserRepository = Depends(get_user_repository)
+    repository: AsyncUserRepository = Depends(get_user_repository)
 ):
-    authenticate_data = repository.get_authenticated_user(
+    authenticate_data = await repository.get_authenticated_user(
         form_data.username,
         form_data.password
     )
@@ -66,11 +68,11 @@ def auth_user(
     status_code=status.HTTP_200_OK,
     tags=['Users']
 )
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_schema),
-    repository: UserRepository = Depends(get_user_repository)
+    verifier: TokenVerifier = Depends(get_token_verifier)
 ):
-    payload = repository.verify_jwt_token(token)
+    payload = await verifier.verify(token)
     if not payload['authorized']:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -78,3 +80,47 @@ def get_current_user(
         )
 
     return {'username': payload['username'], 'id': payload['id']}
+
+
+@user_router.post(
+    '/refresh',
+    status_code=status.HTTP_200_OK,
+    tags=['Users']
+)
+async def refresh_token(
+    refresh_data: RefreshToken,
+    verifier: TokenVerifier = Depends(get_token_verifier)
+):
+    payload = await verifier.verify(refresh_data.refresh_token, token_type='refresh')
+    # refresh tokens are single use, a replayed one fails to claim in every process
+    if not payload['authorized'] or not await verifier.claim(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Invalid refresh token..'
+        )
+
+    return UserRepository.generate_jwt_token(payload)
+
+
+@user_router.post(
+    '/logout',
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=['Users']
+)
+async def logout_user(
+    refresh_data: Optional[RefreshToken] = None,
+    token: str = Depends(oauth2_schema),
+    verifier: TokenVerifier = Depends(get_token_verifier)
+):
+    payload = await verifier.verify(token)
+    if not payload['authorized']:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Invalid credentials..'
+        )
+
+    await verifier.revoke(payload)
+    if refresh_data:
+        refresh_payload = await verifier.verify(refresh_data.refresh_token, token_type='refresh')
+        if refresh_payload['authorized'] and refresh_payload['id'] == payload['id']:
+            await verifier.claim(refresh_payload)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 
+from app import settings
 from app.api.v1.user import get_current_user
 
 from app.repositories.wallet import \
-    WalletRepository, \
+    AsyncWalletRepository, \
     get_wallet_repository
 from app.schemas.wallet import Wallet
 
@@ -12,21 +14,36 @@ wallet_router = APIRouter(prefix='/api/v1/wallets')
 
 
 @wallet_router.get('', status_code=status.HTTP_200_OK, tags=['Wallets'])
-def get_all_wallet(
+async def get_all_wallet(
+    limit: Optional[int] = Query(default=None, ge=1, le=settings.MAX_PAGE_SIZE),
+    after: Optional[str] = None,
     user: dict = Depends(get_current_user),
-    repository: WalletRepository = Depends(get_wallet_repository)
+    repository: AsyncWalletRepository = Depends(get_wallet_repository)
 ):
-    return {'data': repository.get_all(owner_id=user['id'])}
+    if limit or after:
+        try:
+            return await repository.get_page(
+                limit or settings.DEFAULT_PAGE_SIZE,
+                after,
+                owner_id=user['id']
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Invalid cursor..'
+            )
+
+    return {'data': await repository.get_all(owner_id=user['id'])}
 
 
 @wallet_router.post('', status_code=status.HTTP_201_CREATED, tags=['Wallets'])
-def create_new_wallet(
+async def create_new_wallet(
     new_wallet: Wallet,
     user: dict = Depends(get_current_user),
-    repository: WalletRepository = Depends(get_wallet_repository)
+    repository: AsyncWalletRepository = Depends(get_wallet_repository)
 ):
     try:
-        stored_wallet = repository.create(new_wallet)
+        stored_wallet = await repository.create(new_wallet)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -37,13 +54,13 @@ def create_new_wallet(
 
 
 @wallet_router.get('/{id}', status_code=status.HTTP_200_OK, tags=['Wallets'])
-def get_wallet_by_id(
+async def get_wallet_by_id(
     id: str,
     user: dict = Depends(get_current_user),
-    repository: WalletRepository = Depends(get_wallet_repository)
+    repository: AsyncWalletRepository = Depends(get_wallet_repository)
 ):
     try:
-        lookup_wallet = repository.get_by_id(id)
+        lookup_wallet = await repository.get_by_id(id)
     except:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -60,14 +77,14 @@ def get_wallet_by_id(
 
 
 @wallet_router.put('/{id}', status_code=status.HTTP_200_OK, tags=['Wallets'])
-def update_wallet_by_id(
+async def update_wallet_by_id(
     id: str,
     update_data: dict,
     user: dict = Depends(get_current_user),
-    repository: WalletRepository = Depends(get_wallet_repository)
+    repository: AsyncWalletRepository = Depends(get_wallet_repository)
 ):
     try:
-        updated_wallet = repository.update_by_id(id, update_data)
+        updated_wallet = await repository.update_by_id(id, update_data)
     except:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -84,13 +101,13 @@ def update_wallet_by_id(
 
 
 @wallet_router.delete('/{id}', status_code=status.HTTP_200_OK, tags=['Wallets'])
-def delete_wallet_by_id(
+async def delete_wallet_by_id(
     id: str,
     user: dict = Depends(get_current_user),
-    repository: WalletRepository = Depends(get_wallet_repository)
+    repository: AsyncWalletRepository = Depends(get_wallet_repository)
 ):
     try:
-        deleted_wallet = repository.delete_by_id(id)
+        deleted_wallet = await repository.delete_by_id(id)
     except:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
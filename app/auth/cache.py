@@ -0,0 +1,47 @@
+import time
+
+from collections import OrderedDict
+from typing import Callable
+
+from app import settings
+
+
+class TokenCache:
+    """
+    Verified tokens with LRU eviction, keyed by the token hash so raw tokens are not kept
+    An entry with an expiry (epoch seconds, the token's exp claim) is dropped once it is due
+    """
+    def __init__(
+        self,
+        max_size: int = settings.TOKEN_CACHE_MAX_SIZE,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        self._max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[bytes, tuple[dict, float | None]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        user, expires_at = entry
+        if expires_at is not None and self._clock() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return user
+
+    def set(self, key: bytes, user: dict, expires_at: float | None = None) -> None:
+        self._entries[key] = (user, expires_at)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
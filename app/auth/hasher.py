@@ -0,0 +1,175 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from app import settings
+
+
+class ScryptHasher:
+    """
+    Salted scrypt, encoded as $scrypt$n=<cost>,r=<block size>,p=<parallelism>$<salt>$<hash>
+    Memory use is 128 * n * r bytes per hash (16 MiB by default)
+    """
+    prefix = '$scrypt$'
+
+    def __init__(
+        self,
+        n: int = settings.PASSWORD_HASH_COST,
+        r: int = settings.PASSWORD_HASH_BLOCK_SIZE,
+        p: int = settings.PASSWORD_HASH_PARALLELISM,
+        salt_size: int = 16,
+        hash_size: int = 32
+    ) -> None:
+        self._n = n
+        self._r = r
+        self._p = p
+        self._salt_size = salt_size
+        self._hash_size = hash_size
+
+    @staticmethod
+    def _derive(password: str, salt: bytes, n: int, r: int, p: int, size: int) -> bytes:
+        return hashlib.scrypt(
+            password.encode(),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r,
+            dklen=size
+        )
+
+    @staticmethod
+    def _parse(encoded: str) -> tuple[dict, bytes, bytes]:
+        _, _, params, salt, digest = encoded.split('$')
+        params = {
+            key: int(value)
+            for key, value in (param.split('=') for param in params.split(','))
+        }
+        return params, base64.b64decode(salt), base64.b64decode(digest)
+
+    def identify(self, encoded: str) -> bool:
+        return encoded.startswith(self.prefix)
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(self._salt_size)
+        digest = self._derive(password, salt, self._n, self._r, self._p, self._hash_size)
+        return (
+            f'{self.prefix}n={self._n},r={self._r},p={self._p}$'
+            f'{base64.b64encode(salt).decode()}${base64.b64encode(digest).decode()}'
+        )
+
+    def verify(self, password: str, encoded: str) -> bool:
+        try:
+            params, salt, digest = self._parse(encoded)
+            derived = self._derive(
+                password, salt, params['n'], params['r'], params['p'], len(digest)
+            )
+        except (KeyError, ValueError):
+            return False
+
+        return hmac.compare_digest(derived, digest)
+
+    def needs_rehash(self, encoded: str) -> bool:
+        try:
+            params, _, _ = self._parse(encoded)
+        except ValueError:
+            return True
+
+        return params != {'n': self._n, 'r': self._r, 'p': self._p}
+
+
+class Blake2bHasher:
+    """
+    Legacy unsalted blake2b hex digests, verification only
+    """
+    def identify(self, encoded: str) -> bool:
+        return not encoded.startswith('$')
+
+    def verify(self, password: str, encoded: str) -> bool:
+        return hmac.compare_digest(hashlib.blake2b(password.encode()).hexdigest(), encoded)
+
+
+class PasswordHasher:
+    """
+    Hash with the current hasher, verify hashes of the current and the legacy hashers
+    verify_and_update returns a new hash when the stored one is legacy or has an outdated cost
+    verify_unknown spends the same time on a login of an unknown user, so the response time
+    does not tell which usernames exist
+    """
+    def __init__(
+        self,
+        hasher: ScryptHasher | None = None,
+        legacy_hashers: tuple = (Blake2bHasher(),)
+    ) -> None:
+        self._hasher = hasher or ScryptHasher()
+        self._legacy_hashers = legacy_hashers
+        self._dummy_hash: str | None = None
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify_unknown(self, password: str) -> bool:
+        """
+        Verify against a fixed dummy hash of the current cost, always False
+        """
+        if self._dummy_hash is None:
+            self._dummy_hash = self._hasher.hash('')
+        self._hasher.verify(password, self._dummy_hash)
+
+        return False
+
+    def verify_and_update(self, password: str, encoded: str) -> tuple[bool, str | None]:
+        if self._hasher.identify(encoded):
+            if not self._hasher.verify(password, encoded):
+                return False, None
+            if self._hasher.needs_rehash(encoded):
+                return True, self._hasher.hash(password)
+            return True, None
+
+        for legacy_hasher in self._legacy_hashers:
+            if legacy_hasher.identify(encoded) and legacy_hasher.verify(password, encoded):
+                return True, self._hasher.hash(password)
+
+        return False, None
+
+
+class AsyncPasswordHasher(PasswordHasher):
+    """
+    Run the hashing in executor, a bounded pool keeps login bursts off the event loop
+    and caps the memory of concurrent scrypt calls
+    """
+    def __init__(
+        self,
+        hasher: ScryptHasher | None = None,
+        legacy_hashers: tuple = (Blake2bHasher(),),
+        executor: Executor | None = None
+    ) -> None:
+        super().__init__(hasher, legacy_hashers)
+        self._executor = executor
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, super().hash, password
+        )
+
+    async def verify_and_update(self, password: str, encoded: str) -> tuple[bool, str | None]:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, super().verify_and_update, password, encoded
+        )
+
+    async def verify_unknown(self, password: str) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, super().verify_unknown, password
+        )
+
+
+password_hasher = AsyncPasswordHasher(
+    executor=ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS,
+        thread_name_prefix='password-hash'
+    )
+)
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+from typing import Callable
+
+from app import settings
+from app.auth.bloom import BloomFilter
+from app.repositories.revoked_token import \
+    AsyncRevokedTokenRepository, \
+    get_revoked_token_repository
+
+
+class RevocationList:
+    """
+    Revoked token ids behind an in-memory bloom filter, a token not in the filter is not
+    revoked without a database round trip, only filter hits are confirmed in the database
+    The filter is rebuilt from the database every interval seconds, so revocations made by
+    other processes take effect within one interval
+    Until the first rebuild succeeded the filter is incomplete, so every lookup is confirmed
+    in the database
+    Single use tokens are claimed in the database directly, they never use the filter
+    """
+    def __init__(
+        self,
+        get_repository: Callable[[], AsyncRevokedTokenRepository],
+        capacity: int = settings.REVOCATION_CAPACITY,
+        error_rate: float = settings.REVOCATION_ERROR_RATE,
+        interval: float = settings.REVOCATION_REFRESH_INTERVAL,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        self._get_repository = get_repository
+        self._capacity = capacity
+        self._error_rate = error_rate
+        self._interval = interval
+        self._clock = clock
+        self._bloom = BloomFilter(capacity, error_rate)
+        # revoked here since the last rebuild, possibly after the rebuild read the database
+        self._recent: set[str] = set()
+        self._task: asyncio.Task | None = None
+        self.lookups = 0
+        self.last_rebuild_at: float | None = None
+        self.last_error: str | None = None
+
+    async def rebuild(self) -> int:
+        """
+        Replace the filter with the ids of the unexpired revoked tokens, return their number
+        """
+        jtis = await self._get_repository().get_active(self._clock())
+        bloom = BloomFilter(max(self._capacity, 2 * len(jtis)), self._error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        for jti in self._recent:
+            bloom.add(jti)
+
+        self._bloom = bloom
+        self._recent.clear()
+        self.last_rebuild_at = self._clock()
+        self.last_error = None
+        return len(jtis)
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        await self._get_repository().revoke(jti, expires_at)
+        self._recent.add(jti)
+        self._bloom.add(jti)
+
+    async def claim(self, jti: str, expires_at: float) -> bool:
+        """
+        Atomically mark a single use token as used, False if any process used or revoked it
+        """
+        return await self._get_repository().claim(jti, expires_at)
+
+    async def is_revoked(self, jti: str) -> bool:
+        if self.last_rebuild_at is not None and jti not in self._bloom:
+            return False
+
+        self.lookups += 1
+        return await self._get_repository().is_revoked(jti)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.rebuild()
+            except Exception as error:
+                # keep serving the previous filter, local revocations are still added to it,
+                # before the first successful rebuild every lookup goes to the database
+                self.last_error = repr(error)
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        if self._task is None and self._interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+revocation_list = RevocationList(get_revoked_token_repository)
@@ -0,0 +1,161 @@
+import hashlib
+import time
+import uuid
+
+import jwt
+
+from pymongo import AsyncMongoClient
+
+from app import settings
+from app.auth.cache import TokenCache
+from app.auth.revocation import RevocationList, revocation_list
+from app.database.service import AsyncCRUDService
+from app.repositories.revoked_token import AsyncRevokedTokenRepository
+
+
+UNAUTHORIZED = {'authorized': False, 'id': '', 'username': ''}
+
+TOKEN_TTLS = {
+    'access': settings.ACCESS_TOKEN_TTL,
+    'refresh': settings.REFRESH_TOKEN_TTL,
+}
+
+
+def encode_token(
+    user_data: dict,
+    token_type: str = 'access',
+    jwt_secret: str = settings.JWT_SECRET,
+    now: float | None = None
+) -> str:
+    """
+    Issue a token of token_type valid for its TOKEN_TTLS seconds, with a unique jti
+    """
+    issued_at = int(time.time() if now is None else now)
+    payload = {
+        'id': user_data['id'],
+        'username': user_data['username'],
+        'authorized': True,
+        'type': token_type,
+        'iat': issued_at,
+        'exp': issued_at + TOKEN_TTLS[token_type],
+        'jti': uuid.uuid4().hex
+    }
+    return jwt.encode(payload, jwt_secret, algorithm='HS256')
+
+
+def decode_token(
+    jwt_token: str,
+    jwt_secret: str = settings.JWT_SECRET,
+    token_type: str = 'access'
+) -> dict | None:
+    """
+    Return the payload of a valid, unexpired token of token_type that carries the user id
+    and name, None otherwise
+    """
+    try:
+        payload = jwt.decode(
+            jwt_token,
+            jwt_secret,
+            algorithms=['HS256'],
+            options={'require': ['exp', 'iat', 'jti']}
+        )
+    except jwt.PyJWTError:
+        return None
+
+    if 'username' not in payload or 'id' not in payload:
+        return None
+
+    if payload.get('type') != token_type:
+        return None
+
+    return payload
+
+
+class TokenVerifier:
+    """
+    Verify bearer tokens without a database round trip for tokens that are not revoked
+    A verified access token is cached until its exp, so a repeated token skips the signature
+    check and the JSON decoding, the revocation check still runs on every request
+    """
+    def __init__(
+        self,
+        jwt_secret: str = settings.JWT_SECRET,
+        cache: TokenCache | None = None,
+        revocation: RevocationList | None = None
+    ) -> None:
+        self._jwt_secret = jwt_secret
+        self._cache = cache
+        self._revocation = revocation
+
+    def _decode(self, jwt_token: str, token_type: str) -> dict:
+        # refresh tokens are rare and single use, only access tokens are cached
+        cache = self._cache if token_type == 'access' else None
+        key = hashlib.sha256(jwt_token.encode()).digest()
+        if cache is not None:
+            user = cache.get(key)
+            if user is not None:
+                return user
+
+        payload = decode_token(jwt_token, self._jwt_secret, token_type)
+        if payload is None:
+            # failures are not cached, random tokens must not evict verified ones
+            return dict(UNAUTHORIZED)
+
+        user = {
+            'authorized': True,
+            'id': payload['id'],
+            'username': payload['username'],
+            'jti': payload['jti'],
+            'exp': payload['exp']
+        }
+        if cache is not None:
+            cache.set(key, user, payload['exp'])
+
+        return user
+
+    async def verify(self, jwt_token: str, token_type: str = 'access') -> dict:
+        """
+        Refresh tokens are only decoded here, they are checked when they are claimed
+        """
+        user = self._decode(jwt_token, token_type)
+        if not user['authorized'] or token_type != 'access':
+            return user
+
+        if self._revocation is not None and await self._revocation.is_revoked(user['jti']):
+            return dict(UNAUTHORIZED)
+
+        return user
+
+    async def claim(self, user: dict) -> bool:
+        """
+        Use up the verified single use token of user, False if it was already used or revoked
+        """
+        if self._revocation is None:
+            return True
+
+        return await self._revocation.claim(user['jti'], user['exp'])
+
+    async def revoke(self, user: dict) -> None:
+        """
+        Revoke the verified token of user until it expires
+        """
+        if self._revocation is not None:
+            await self._revocation.revoke(user['jti'], user['exp'])
+
+
+token_verifier = TokenVerifier(cache=TokenCache(), revocation=revocation_list)
+
+
+def get_token_verifier() -> TokenVerifier:
+    return token_verifier
+
+
+async def get_test_token_verifier():  # pragma: no cover
+    connection = AsyncMongoClient()
+    repository = AsyncRevokedTokenRepository(
+        AsyncCRUDService(connection, 'test_api_revoked_tokens')
+    )
+    revocation = RevocationList(lambda: repository, interval=0)
+    await revocation.rebuild()
+    yield TokenVerifier(revocation=revocation)
+    await connection.close()
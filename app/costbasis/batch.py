@@ -0,0 +1,163 @@
+from array import array
+from collections.abc import AsyncIterable, Iterable
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from bson import ObjectId
+
+from app.schemas.transaction import parse_date
+
+
+EPOCH = datetime(1970, 1, 1)
+MILLISECOND = timedelta(milliseconds=1)
+
+# the only transaction fields the portfolio math reads, _id breaks ties of equal dates
+PROJECTION = {'asset': 1, 'type': 1, 'amount': 1, 'historical_price': 1, 'date': 1}
+
+
+def _epoch_ms(date: datetime | str) -> int:
+    date = parse_date(date)
+    if date.tzinfo is not None:
+        date = date.astimezone(timezone.utc).replace(tzinfo=None)
+    return (date - EPOCH) // MILLISECOND
+
+
+def _id_bytes(document: dict) -> bytes:
+    # stored documents carry _id, serialized ones id, both order like their ObjectId
+    id = document.get('_id', document.get('id'))
+    if id is None:
+        return b''
+    return ObjectId(id).binary
+
+
+class TransactionBatch:
+    """
+    Columnar transactions: asset codes index into assets (upper cased, interned once),
+    amounts and prices are float64, dates are epoch milliseconds, ids are the 12 ObjectId bytes
+    """
+    __slots__ = ('assets', 'asset_codes', 'is_buy', 'amounts', 'prices', 'dates', 'ids')
+
+    def __init__(
+        self,
+        assets: list[str],
+        asset_codes: np.ndarray,
+        is_buy: np.ndarray,
+        amounts: np.ndarray,
+        prices: np.ndarray,
+        dates: np.ndarray,
+        ids: np.ndarray
+    ) -> None:
+        self.assets = assets
+        self.asset_codes = asset_codes
+        self.is_buy = is_buy
+        self.amounts = amounts
+        self.prices = prices
+        self.dates = dates
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[dict]) -> 'TransactionBatch':
+        """
+        Build from any iterable of transactions, e.g. a cursor with PROJECTION,
+        without holding the documents
+        """
+        builder = _TransactionBatchBuilder()
+        for document in documents:
+            builder.append(document)
+        return builder.build()
+
+    @classmethod
+    async def from_async_documents(cls, documents: AsyncIterable[dict]) -> 'TransactionBatch':
+        builder = _TransactionBatchBuilder()
+        async for document in documents:
+            builder.append(document)
+        return builder.build()
+
+    def date_order(self) -> np.ndarray:
+        """
+        Indices in date order, ties in _id order, so the order does not depend on the cursor
+        """
+        return np.lexsort((self.ids, self.dates))
+
+    def portfolio(self) -> dict:
+        """
+        Per-asset amount, buy investment and average price, the same meta as the aggregation
+        """
+        if not len(self):
+            return {}
+
+        size = len(self.assets)
+        amounts = np.bincount(
+            self.asset_codes,
+            weights=np.where(self.is_buy, self.amounts, -self.amounts),
+            minlength=size
+        )
+        investments = np.bincount(
+            self.asset_codes,
+            weights=np.where(self.is_buy, self.amounts * self.prices, 0),
+            minlength=size
+        )
+
+        portfolio = {
+            'investment': float(investments.sum()),
+            'assets': {}
+        }
+        for code in sorted(range(size), key=self.assets.__getitem__):
+            amount, investment = float(amounts[code]), float(investments[code])
+            portfolio['assets'][self.assets[code]] = {
+                'meta': {
+                    'amount': amount,
+                    'investment': investment,
+                    'average_price': investment / amount if amount != 0 else 0
+                }
+            }
+
+        return portfolio
+
+
+class _TransactionBatchBuilder:
+    __slots__ = (
+        '_codes', '_assets', '_asset_codes', '_is_buy', '_amounts', '_prices', '_dates', '_ids'
+    )
+
+    def __init__(self) -> None:
+        self._codes = {}
+        self._assets = []
+        self._asset_codes = array('i')
+        self._is_buy = array('b')
+        self._amounts = array('d')
+        self._prices = array('d')
+        self._dates = array('q')
+        self._ids = []
+
+    def append(self, document: dict) -> None:
+        asset = document['asset']
+        code = self._codes.get(asset)
+        if code is None:
+            # codes are keyed by the raw asset so 'btc' and 'BTC' share one upper cased entry
+            upper_asset = asset.upper()
+            if upper_asset not in self._assets:
+                self._assets.append(upper_asset)
+            code = self._codes[asset] = self._assets.index(upper_asset)
+
+        self._asset_codes.append(code)
+        self._is_buy.append(document['type'] == 'buy')
+        self._amounts.append(document['amount'])
+        self._prices.append(document['historical_price'])
+        self._dates.append(_epoch_ms(document['date']))
+        self._ids.append(_id_bytes(document))
+
+    def build(self) -> TransactionBatch:
+        return TransactionBatch(
+            self._assets,
+            np.frombuffer(self._asset_codes, dtype=np.int32),
+            np.frombuffer(self._is_buy, dtype=np.int8).astype(bool),
+            np.frombuffer(self._amounts, dtype=np.float64),
+            np.frombuffer(self._prices, dtype=np.float64),
+            np.frombuffer(self._dates, dtype=np.int64),
+            np.array(self._ids, dtype='S12')
+        )
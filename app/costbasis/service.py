@@ -0,0 +1,169 @@
+import math
+
+from array import array
+
+from app.costbasis.batch import TransactionBatch
+
+
+METHODS = ('fifo', 'lifo', 'average')
+
+# lots smaller than this are float residue of partial sells
+EPSILON = 1e-12
+
+
+class LotQueue:
+    """
+    Open buy lots of one asset in two float64 arrays, consumed from the head (FIFO)
+    or the tail (LIFO); consumed head lots are compacted away lazily
+    """
+    __slots__ = ('_amounts', '_prices', '_head')
+
+    def __init__(self) -> None:
+        self._amounts = array('d')
+        self._prices = array('d')
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._amounts) - self._head
+
+    def push(self, amount: float, price: float) -> None:
+        self._amounts.append(amount)
+        self._prices.append(price)
+
+    def consume(self, amount: float, lifo: bool = False) -> tuple[float, float]:
+        """
+        Take amount from the lots, return (taken amount, its cost)
+        """
+        taken, cost = 0.0, 0.0
+        while amount - taken > EPSILON and len(self):
+            index = len(self._amounts) - 1 if lifo else self._head
+            take = min(amount - taken, self._amounts[index])
+            taken += take
+            cost += take * self._prices[index]
+            self._amounts[index] -= take
+            if self._amounts[index] <= EPSILON:
+                if lifo:
+                    self._amounts.pop()
+                    self._prices.pop()
+                else:
+                    self._head += 1
+
+        if self._head and self._head * 2 >= len(self._amounts):
+            del self._amounts[:self._head]
+            del self._prices[:self._head]
+            self._head = 0
+
+        return taken, cost
+
+    def totals(self) -> tuple[float, float]:
+        """
+        Return (open amount, open cost)
+        """
+        amount, cost = 0.0, 0.0
+        for index in range(self._head, len(self._amounts)):
+            amount += self._amounts[index]
+            cost += self._amounts[index] * self._prices[index]
+        return amount, cost
+
+
+class _AverageCost:
+    __slots__ = ('amount', 'cost')
+
+    def __init__(self) -> None:
+        self.amount = 0.0
+        self.cost = 0.0
+
+    def push(self, amount: float, price: float) -> None:
+        self.amount += amount
+        self.cost += amount * price
+
+    def consume(self, amount: float, lifo: bool = False) -> tuple[float, float]:
+        taken = min(amount, self.amount)
+        cost = taken * self.cost / self.amount if self.amount > EPSILON else 0.0
+        self.amount -= taken
+        self.cost -= cost
+        if self.amount <= EPSILON:
+            self.amount, self.cost = 0.0, 0.0
+        return taken, cost
+
+    def totals(self) -> tuple[float, float]:
+        return self.amount, self.cost
+
+
+def calculate_cost_basis(batch: TransactionBatch, method: str = 'fifo') -> dict:
+    """
+    Match sells against earlier buys in date order with the FIFO, LIFO or average cost method
+    A sell realizes its proceeds minus the cost of the matched lots, a sell exceeding the
+    open amount realizes its uncovered part at zero cost
+    O(n log n) for the date sort, every lot is pushed and consumed at most once
+    """
+    if method not in METHODS:
+        raise ValueError(f'unknown cost basis method: {method}')
+    if not len(batch):
+        return {}
+
+    lifo = method == 'lifo'
+    book_type = _AverageCost if method == 'average' else LotQueue
+    books = [book_type() for _ in batch.assets]
+    realized = [0.0] * len(batch.assets)
+
+    order = batch.date_order()
+    for code, is_buy, amount, price in zip(
+        batch.asset_codes[order].tolist(),
+        batch.is_buy[order].tolist(),
+        batch.amounts[order].tolist(),
+        batch.prices[order].tolist()
+    ):
+        if is_buy:
+            books[code].push(amount, price)
+            continue
+
+        _, cost = books[code].consume(amount, lifo)
+        realized[code] += amount * price - cost
+
+    portfolio = {
+        'method': method,
+        'investment': 0.0,
+        'realized_pnl': 0.0,
+        'assets': {}
+    }
+    for code in sorted(range(len(batch.assets)), key=batch.assets.__getitem__):
+        amount, investment = books[code].totals()
+        portfolio['assets'][batch.assets[code]] = {
+            'meta': {
+                'amount': amount,
+                'investment': investment,
+                'average_price': investment / amount if amount > EPSILON else 0,
+                'realized_pnl': realized[code]
+            }
+        }
+        portfolio['investment'] += investment
+        portfolio['realized_pnl'] += realized[code]
+
+    return portfolio
+
+
+def apply_unrealized_pnl(portfolio: dict, prices: dict) -> dict:
+    """
+    Add the unrealized P&L at the current prices {ASSET: price}, None for assets without a
+    valid price
+    """
+    if not portfolio:
+        return portfolio
+
+    portfolio['unrealized_pnl'] = 0.0
+    for asset, asset_data in portfolio['assets'].items():
+        meta = asset_data['meta']
+        try:
+            price = float(prices[asset])
+        except (KeyError, TypeError, ValueError):
+            price = math.nan
+        if not math.isfinite(price):
+            # a missing or unparsable price leaves the P&L unknown
+            meta['unrealized_pnl'] = None
+            continue
+
+        meta['unrealized_pnl'] = meta['amount'] * price - meta['investment']
+        portfolio['unrealized_pnl'] += meta['unrealized_pnl']
+
+    return portfolio
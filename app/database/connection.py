@@ -0,0 +1,73 @@
+from pymongo import AsyncMongoClient, MongoClient
+
+from app import settings
+
+
+class ConnectionManager:
+    """
+    Own a single pooled MongoClient per process
+    The client is opened lazily, so scripts and tests work without the app lifespan
+    """
+    _client_class = MongoClient
+
+    def __init__(self, uri: str, **client_options) -> None:
+        self._uri = uri
+        self._client_options = client_options
+        self._client: MongoClient | None = None
+
+    @property
+    def client(self) -> MongoClient:
+        if self._client is None:
+            return self.open()
+
+        return self._client
+
+    def open(self) -> MongoClient:
+        if self._client is None:
+            self._client = self._client_class(self._uri, **self._client_options)
+
+        return self._client
+
+    def close(self) -> None:
+        if self._client is None:
+            return
+
+        self._client.close()
+        self._client = None
+
+
+class AsyncConnectionManager(ConnectionManager):
+    """
+    Own a single pooled AsyncMongoClient per process
+    The client binds to the event loop it is first used on, so open it from the app lifespan
+    """
+    _client_class = AsyncMongoClient
+
+    async def close(self) -> None:
+        if self._client is None:
+            return
+
+        await self._client.close()
+        self._client = None
+
+
+CLIENT_OPTIONS = {
+    'maxPoolSize': settings.MONGO_MAX_POOL_SIZE,
+    'minPoolSize': settings.MONGO_MIN_POOL_SIZE,
+    'maxIdleTimeMS': settings.MONGO_MAX_IDLE_TIME_MS,
+    'connectTimeoutMS': settings.MONGO_CONNECT_TIMEOUT_MS,
+    'socketTimeoutMS': settings.MONGO_SOCKET_TIMEOUT_MS,
+    'serverSelectionTimeoutMS': settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    'readPreference': settings.MONGO_READ_PREFERENCE
+}
+
+connection_manager = ConnectionManager(settings.MONGO_URI, **CLIENT_OPTIONS)
+async_connection_manager = AsyncConnectionManager(settings.MONGO_URI, **CLIENT_OPTIONS)
+
+
+def get_connection() -> MongoClient:
+    return connection_manager.client
+
+
+def get_async_connection() -> AsyncMongoClient:
+    return async_connection_manager.client
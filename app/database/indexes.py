@@ -0,0 +1,149 @@
+import argparse
+import json
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.database import Database
+
+from app.database.connection import connection_manager
+
+
+INDEX_REGISTRY = {
+    'transactions': [
+        IndexModel(
+            [('owner_id', ASCENDING), ('date', DESCENDING), ('_id', DESCENDING)],
+            name='owner_id_date_id'
+        ),
+        IndexModel([('owner_id', ASCENDING), ('asset', ASCENDING)], name='owner_id_asset'),
+        IndexModel([('owner_id', ASCENDING), ('tags', ASCENDING)], name='owner_id_tags'),
+    ],
+    'wallets': [
+        IndexModel([('owner_id', ASCENDING), ('_id', ASCENDING)], name='owner_id_id'),
+    ],
+    'users': [
+        IndexModel([('username', ASCENDING)], name='username', unique=True),
+    ],
+    'prices': [
+        IndexModel(
+            [('asset', ASCENDING), ('start', DESCENDING)],
+            name='asset_start',
+            unique=True
+        ),
+    ],
+    'revoked_tokens': [
+        IndexModel([('expires_at', ASCENDING)], name='expires_at', expireAfterSeconds=0),
+        IndexModel([('type', ASCENDING), ('expires_at', ASCENDING)], name='type_expires_at'),
+    ],
+}
+
+# (filter, sort) shapes the repositories issue, used for explain plans, keep them in sync
+QUERY_SHAPES = {
+    'transactions': [
+        ({'owner_id': ''}, [('date', DESCENDING), ('_id', DESCENDING)]),
+        ({'owner_id': ''}, None),
+        ({'owner_id': '', 'asset': ''}, None),
+        ({'owner_id': '', 'tags': {'$in': ['']}}, None),
+    ],
+    'wallets': [
+        ({'owner_id': ''}, [('_id', ASCENDING)]),
+    ],
+    'users': [
+        ({'username': ''}, None),
+    ],
+    'prices': [
+        (
+            {'asset': {'$in': ['']}, 'start': {'$gte': 0, '$lte': 0}},
+            [('asset', ASCENDING), ('start', ASCENDING)]
+        ),
+        ({'asset': '', 'start': {'$lte': 0}}, [('start', DESCENDING)]),
+    ],
+    'revoked_tokens': [
+        ({'type': {'$ne': 'claim'}, 'expires_at': {'$gt': 0}}, None),
+    ],
+}
+
+
+def ensure_indexes(db: Database, registry: dict = INDEX_REGISTRY) -> dict:
+    """
+    Create every registered index, creating an already existing index is a no-op
+    """
+    return {
+        collection: db[collection].create_indexes(indexes)
+        for collection, indexes in registry.items()
+    }
+
+
+async def ensure_indexes_async(db: AsyncDatabase, registry: dict = INDEX_REGISTRY) -> dict:
+    return {
+        collection: await db[collection].create_indexes(indexes)
+        for collection, indexes in registry.items()
+    }
+
+
+def _plan_stages(plan: dict) -> list[dict]:
+    plan = plan.get('queryPlan', plan)
+    stages = [plan]
+    if 'inputStage' in plan:
+        stages += _plan_stages(plan['inputStage'])
+    for input_stage in plan.get('inputStages', []):
+        stages += _plan_stages(input_stage)
+    return stages
+
+
+def report_indexes(
+    db: Database,
+    registry: dict = INDEX_REGISTRY,
+    query_shapes: dict = QUERY_SHAPES
+) -> dict:
+    """
+    Compare registered indexes with the live ones of each collection
+    missing: registered but not created, unregistered: created but not registered,
+    unused: zero accesses since server start, collection_scans: query shapes without an index
+    """
+    report = {}
+    for collection, indexes in registry.items():
+        existing = set(db[collection].index_information()) - {'_id_'}
+        registered = {index.document['name'] for index in indexes}
+        index_stats = db[collection].aggregate([{'$indexStats': {}}])
+
+        collection_scans = []
+        for query_filter, sort in query_shapes.get(collection, []):
+            cursor = db[collection].find(query_filter)
+            if sort:
+                cursor = cursor.sort(sort)
+            stages = _plan_stages(cursor.explain()['queryPlanner']['winningPlan'])
+            if any(stage['stage'] == 'COLLSCAN' for stage in stages):
+                collection_scans.append(
+                    {'filter': list(query_filter), 'sort': [key for key, _ in sort or []]}
+                )
+
+        report[collection] = {
+            'missing': sorted(registered - existing),
+            'unregistered': sorted(existing - registered),
+            'unused': sorted(
+                stats['name'] for stats in index_stats
+                if stats['name'] != '_id_' and not stats['accesses']['ops']
+            ),
+            'collection_scans': collection_scans
+        }
+
+    return report
+
+
+def main() -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description='Manage MongoDB indexes')
+    parser.add_argument('command', choices=['ensure', 'report'])
+    args = parser.parse_args()
+
+    db = connection_manager.open().local
+    try:
+        if args.command == 'ensure':
+            print(json.dumps(ensure_indexes(db), indent=2))
+        else:
+            print(json.dumps(report_indexes(db), indent=2))
+    finally:
+        connection_manager.close()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,72 @@
+import base64
+
+from bson import json_util
+from bson.errors import BSONError
+from pymongo import DESCENDING
+
+
+def keyset_filter(sort: list[tuple[str, int]], after: dict) -> dict:
+    """
+    Match the items strictly behind `after` in `sort` order
+    e.g. for (date desc, _id desc): date < d OR (date == d AND _id < i)
+    """
+    clauses = []
+    for position, (key, direction) in enumerate(sort):
+        clause = {previous_key: after[previous_key] for previous_key, _ in sort[:position]}
+        clause[key] = {'$lt' if direction == DESCENDING else '$gt': after[key]}
+        clauses.append(clause)
+
+    return {'$or': clauses}
+
+
+def encode_cursor(item: dict, sort: list[tuple[str, int]]) -> str:
+    return base64.urlsafe_b64encode(
+        json_util.dumps({key: item[key] for key, _ in sort}).encode()
+    ).decode()
+
+
+def decode_cursor(cursor: str, sort: list[tuple[str, int]]) -> dict:
+    """
+    Raise ValueError for a malformed cursor or one encoded for another sort
+    """
+    try:
+        after = json_util.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (BSONError, TypeError, ValueError):
+        raise ValueError
+
+    if not isinstance(after, dict) or set(after) != {key for key, _ in sort}:
+        raise ValueError
+
+    return after
+
+
+def page_args(
+    sort: list[tuple[str, int]],
+    limit: int,
+    after: str | None = None
+) -> tuple[list[tuple[str, int]], int, dict | None]:
+    """
+    Return the (sort, limit, after) arguments of a crud service get_page call
+    One item past limit is fetched to tell whether a next page exists
+    """
+    return sort, limit + 1, decode_cursor(after, sort) if after else None
+
+
+def build_page(
+    items: list[dict],
+    limit: int,
+    sort: list[tuple[str, int]],
+    serializer: type
+) -> dict:
+    """
+    Serialize a get_page result fetched with page_args, items must hold only valid keys
+    """
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1], sort)
+
+    return {
+        'data': serializer.serialize_many(items, validate=False),
+        'next_cursor': next_cursor
+    }
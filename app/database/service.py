@@ -1,7 +1,11 @@
 from bson import ObjectId
-from pymongo import MongoClient
+from pymongo import AsyncMongoClient, MongoClient, ReturnDocument, UpdateOne
+from pymongo.asynchronous.cursor import AsyncCursor
+from pymongo.cursor import Cursor
 from typing import Any, TypeVar
 
+from app.database.pagination import keyset_filter
+
 
 T = TypeVar('T')
 
@@ -14,27 +18,298 @@ class CRUDService:
     def create(self, new_item: T) -> object:
         return self._conn.local[self._collecion].insert_one(new_item)
 
+    def create_many(self, new_items: list[T]) -> object:
+        return self._conn.local[self._collecion].insert_many(new_items, ordered=False)
+
+    def create_and_return(self, new_item: T) -> dict:
+        new_item = dict(new_item)
+        new_item['_id'] = self._conn.local[self._collecion].insert_one(new_item).inserted_id
+        return new_item
+
     def get_by_id(self, id: str | ObjectId) -> object:
         id = ObjectId(id)
         return self._conn.local[self._collecion].find_one({'_id': id})
 
-    def get_all(self, **kwargs) -> list[object]:
-        if 'owner_id' in kwargs:
-            cursor = self._conn.local[self._collecion].find({'owner_id': kwargs['owner_id']})
-        else:
-            cursor = self._conn.local[self._collecion].find({})
+    def get_all(
+        self,
+        sort: list[tuple[str, int]] | None = None,
+        projection: dict | None = None,
+        **kwargs
+    ) -> list[object]:
+        query = {'owner_id': kwargs['owner_id']} if 'owner_id' in kwargs else {}
+        cursor = self._conn.local[self._collecion].find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return [item for item in cursor]
+
+    def get_page(
+        self,
+        sort: list[tuple[str, int]],
+        limit: int,
+        after: dict | None = None,
+        projection: dict | None = None,
+        **kwargs
+    ) -> list[object]:
+        query = {'owner_id': kwargs['owner_id']} if 'owner_id' in kwargs else {}
+        if after:
+            query.update(keyset_filter(sort, after))
+        cursor = self._conn.local[self._collecion] \
+            .find(query, projection) \
+            .sort(sort) \
+            .limit(limit)
         return [item for item in cursor]
 
     def get_all_by_key(self, key: str, value: Any) -> list[object]:
         cursor = self._conn.local[self._collecion].find({key: value})
         return [item for item in cursor]
 
+    def find_one(self, query: dict, projection: dict | None = None) -> object:
+        return self._conn.local[self._collecion].find_one(query, projection)
+
+    def find(
+        self,
+        query: dict,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0,
+        projection: dict | None = None
+    ) -> list[object]:
+        cursor = self._conn.local[self._collecion].find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return [item for item in cursor.limit(limit)]
+
+    def iterate(self, query: dict, projection: dict | None = None) -> Cursor:
+        """
+        Return the cursor itself, so the caller can consume big results without a list
+        """
+        return self._conn.local[self._collecion].find(query, projection)
+
+    def aggregate(self, pipeline: list[dict]) -> list[object]:
+        cursor = self._conn.local[self._collecion].aggregate(pipeline)
+        return [item for item in cursor]
+
     def update_by_id(self, id: str | ObjectId, **update_data) -> object:
         id = ObjectId(id)
         return self._conn \
             .local[self._collecion] \
             .update_one({'_id': id}, {'$set': update_data})
 
+    def bulk_update_by_id(self, updates: list[tuple[str | ObjectId, dict]]) -> object:
+        return self._conn.local[self._collecion].bulk_write(
+            [UpdateOne({'_id': ObjectId(id)}, {'$set': update_data}) for id, update_data in updates],
+            ordered=False
+        )
+
+    def bulk_upsert(self, updates: list[tuple[dict, dict]]) -> object:
+        return self._conn.local[self._collecion].bulk_write(
+            [UpdateOne(query, update, upsert=True) for query, update in updates],
+            ordered=False
+        )
+
+    def find_one_and_update_by_id(
+        self,
+        id: str | ObjectId,
+        return_document: ReturnDocument = ReturnDocument.AFTER,
+        **update_data
+    ) -> object:
+        id = ObjectId(id)
+        return self._conn.local[self._collecion].find_one_and_update(
+            {'_id': id},
+            {'$set': update_data},
+            return_document=return_document
+        )
+
+    def increment_by_id(
+        self,
+        id: str | ObjectId,
+        upsert: bool = True,
+        **increments
+    ) -> object:
+        id = ObjectId(id)
+        return self._conn \
+            .local[self._collecion] \
+            .update_one({'_id': id}, {'$inc': increments}, upsert=upsert)
+
+    def replace_by_id(self, id: str | ObjectId, new_item: T) -> object:
+        id = ObjectId(id)
+        return self._conn \
+            .local[self._collecion] \
+            .replace_one({'_id': id}, new_item, upsert=True)
+
     def delete_by_id(self, id: str | ObjectId) -> object:
         id = ObjectId(id)
         return self._conn.local[self._collecion].delete_one({'_id': id})
+
+    def delete_all_by_key(self, key: str, value: Any) -> object:
+        return self._conn.local[self._collecion].delete_many({key: value})
+
+    def find_one_and_delete_by_id(self, id: str | ObjectId) -> object:
+        id = ObjectId(id)
+        return self._conn.local[self._collecion].find_one_and_delete({'_id': id})
+
+    def find_one_and_update(
+        self,
+        query: dict,
+        return_document: ReturnDocument = ReturnDocument.AFTER,
+        **update_data
+    ) -> object:
+        return self._conn.local[self._collecion].find_one_and_update(
+            query,
+            {'$set': update_data},
+            return_document=return_document
+        )
+
+    def find_one_and_delete(self, query: dict) -> object:
+        return self._conn.local[self._collecion].find_one_and_delete(query)
+
+
+class AsyncCRUDService:
+    def __init__(self, conn: AsyncMongoClient, collecion: str) -> None:
+        self._conn = conn
+        self._collecion = collecion
+
+    async def create(self, new_item: T) -> object:
+        return await self._conn.local[self._collecion].insert_one(new_item)
+
+    async def create_many(self, new_items: list[T]) -> object:
+        return await self._conn.local[self._collecion].insert_many(new_items, ordered=False)
+
+    async def create_and_return(self, new_item: T) -> dict:
+        new_item = dict(new_item)
+        new_item['_id'] = (
+            await self._conn.local[self._collecion].insert_one(new_item)
+        ).inserted_id
+        return new_item
+
+    async def get_by_id(self, id: str | ObjectId) -> object:
+        id = ObjectId(id)
+        return await self._conn.local[self._collecion].find_one({'_id': id})
+
+    async def get_all(
+        self,
+        sort: list[tuple[str, int]] | None = None,
+        projection: dict | None = None,
+        **kwargs
+    ) -> list[object]:
+        query = {'owner_id': kwargs['owner_id']} if 'owner_id' in kwargs else {}
+        cursor = self._conn.local[self._collecion].find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.to_list()
+
+    async def get_page(
+        self,
+        sort: list[tuple[str, int]],
+        limit: int,
+        after: dict | None = None,
+        projection: dict | None = None,
+        **kwargs
+    ) -> list[object]:
+        query = {'owner_id': kwargs['owner_id']} if 'owner_id' in kwargs else {}
+        if after:
+            query.update(keyset_filter(sort, after))
+        cursor = self._conn.local[self._collecion] \
+            .find(query, projection) \
+            .sort(sort) \
+            .limit(limit)
+        return await cursor.to_list()
+
+    async def get_all_by_key(self, key: str, value: Any) -> list[object]:
+        cursor = self._conn.local[self._collecion].find({key: value})
+        return await cursor.to_list()
+
+    async def find_one(self, query: dict, projection: dict | None = None) -> object:
+        return await self._conn.local[self._collecion].find_one(query, projection)
+
+    async def find(
+        self,
+        query: dict,
+        sort: list[tuple[str, int]] | None = None,
+        limit: int = 0,
+        projection: dict | None = None
+    ) -> list[object]:
+        cursor = self._conn.local[self._collecion].find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.limit(limit).to_list()
+
+    def iterate(self, query: dict, projection: dict | None = None) -> AsyncCursor:
+        return self._conn.local[self._collecion].find(query, projection)
+
+    async def aggregate(self, pipeline: list[dict]) -> list[object]:
+        cursor = await self._conn.local[self._collecion].aggregate(pipeline)
+        return await cursor.to_list()
+
+    async def update_by_id(self, id: str | ObjectId, **update_data) -> object:
+        id = ObjectId(id)
+        return await self._conn \
+            .local[self._collecion] \
+            .update_one({'_id': id}, {'$set': update_data})
+
+    async def bulk_update_by_id(self, updates: list[tuple[str | ObjectId, dict]]) -> object:
+        return await self._conn.local[self._collecion].bulk_write(
+            [UpdateOne({'_id': ObjectId(id)}, {'$set': update_data}) for id, update_data in updates],
+            ordered=False
+        )
+
+    async def bulk_upsert(self, updates: list[tuple[dict, dict]]) -> object:
+        return await self._conn.local[self._collecion].bulk_write(
+            [UpdateOne(query, update, upsert=True) for query, update in updates],
+            ordered=False
+        )
+
+    async def find_one_and_update_by_id(
+        self,
+        id: str | ObjectId,
+        return_document: ReturnDocument = ReturnDocument.AFTER,
+        **update_data
+    ) -> object:
+        id = ObjectId(id)
+        return await self._conn.local[self._collecion].find_one_and_update(
+            {'_id': id},
+            {'$set': update_data},
+            return_document=return_document
+        )
+
+    async def increment_by_id(
+        self,
+        id: str | ObjectId,
+        upsert: bool = True,
+        **increments
+    ) -> object:
+        id = ObjectId(id)
+        return await self._conn \
+            .local[self._collecion] \
+            .update_one({'_id': id}, {'$inc': increments}, upsert=upsert)
+
+    async def replace_by_id(self, id: str | ObjectId, new_item: T) -> object:
+        id = ObjectId(id)
+        return await self._conn \
+            .local[self._collecion] \
+            .replace_one({'_id': id}, new_item, upsert=True)
+
+    async def delete_by_id(self, id: str | ObjectId) -> object:
+        id = ObjectId(id)
+        return await self._conn.local[self._collecion].delete_one({'_id': id})
+
+    async def delete_all_by_key(self, key: str, value: Any) -> object:
+        return await self._conn.local[self._collecion].delete_many({key: value})
+
+    async def find_one_and_delete_by_id(self, id: str | ObjectId) -> object:
+        id = ObjectId(id)
+        return await self._conn.local[self._collecion].find_one_and_delete({'_id': id})
+
+    async def find_one_and_update(
+        self,
+        query: dict,
+        return_document: ReturnDocument = ReturnDocument.AFTER,
+        **update_data
+    ) -> object:
+        return await self._conn.local[self._collecion].find_one_and_update(
+            query,
+            {'$set': update_data},
+            return_document=return_document
+        )
+
+    async def find_one_and_delete(self, query: dict) -> object:
+        return await self._conn.local[self._collecion].find_one_and_delete(query)
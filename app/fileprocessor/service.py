@@ -1,24 +1,108 @@
+import codecs
+import csv
+import io
+
+from typing import AsyncIterator
 from fastapi import UploadFile
 
-class TransactionFileProcessor:  # pragma: no cover
+from app import settings
+from app.schemas.transaction import parse_date
+
+
+CSV_COLUMNS = ['asset', 'amount', 'historical_price', 'date', 'type']
+
+
+def split_complete_records(text: str) -> tuple[str, str]:
+    """
+    Split text after its last newline that is outside a quoted field
+    Return the complete records and the pending remainder
+    """
+    parts = text.split('"')
+    # even parts are outside quotes, skip an odd trailing part of an open quoted field
+    last_part = len(parts) - 1 if len(parts) % 2 else len(parts) - 2
+    for index in range(last_part, -1, -2):
+        newline = parts[index].rfind('\n')
+        if newline == -1:
+            continue
+
+        position = sum(len(part) for part in parts[:index]) + index + newline + 1
+        return text[:position], text[position:]
+
+    return '', text
+
+
+class TransactionFileProcessor:
     @staticmethod
-    async def import_csv(file: UploadFile) -> list[dict]:
-        transactions = []
-        content = await file.read()
-        content = [row for row in content.decode().split('\n') if bool(row)]
-        for row in content:
-            row_data = row.split(',')
-            transaction = {
-                'asset': row_data[0],
-                'amount': float(row_data[1]),
-                'historical_price': float(row_data[2]),
-                'date': row_data[3],
-                'type': row_data[4],
+    async def iter_rows(
+        file: UploadFile,
+        chunk_size: int = settings.IMPORT_CHUNK_SIZE
+    ) -> AsyncIterator[list[str]]:
+        """
+        Read the upload in chunks and yield parsed csv rows,
+        memory is bounded by the chunk size and the longest record
+        """
+        decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        pending = ''
+        while chunk := await file.read(chunk_size):
+            complete, pending = split_complete_records(pending + decoder.decode(chunk))
+            if len(pending) > settings.IMPORT_MAX_RECORD_SIZE:
+                raise ValueError('record is too long')
+
+            for row in csv.reader(io.StringIO(complete, newline='')):
+                yield row
+
+        pending += decoder.decode(b'', final=True)
+        for row in csv.reader(io.StringIO(pending, newline='')):
+            yield row
+
+    @staticmethod
+    def parse_row(row: list[str]) -> dict:
+        if len(row) != len(CSV_COLUMNS):
+            raise ValueError(f'expected {len(CSV_COLUMNS)} columns, got {len(row)}')
+
+        asset, amount, historical_price, date, type = (field.strip() for field in row)
+        if type not in {'buy', 'sell'}:
+            raise ValueError(f'invalid type: {type}')
+
+        try:
+            return {
+                'asset': asset,
+                'amount': float(amount),
+                'historical_price': float(historical_price),
+                'date': parse_date(date),
+                'type': type,
                 #constants
                 'currency': 'USD',
                 'tags': []
             }
+        except ValueError:
+            raise ValueError('invalid amount, historical_price or date')
+
+    @staticmethod
+    async def iter_transactions(
+        file: UploadFile,
+        errors: list[dict] | None = None
+    ) -> AsyncIterator[tuple[int, dict]]:
+        """
+        Yield (row number, transaction) pairs
+        Invalid rows are appended to errors as {row, reason} if given, otherwise raise ValueError
+        """
+        row_number = 0
+        async for row in TransactionFileProcessor.iter_rows(file):
+            row_number += 1
+            if not any(field.strip() for field in row):
+                continue
+
+            if row_number == 1 and [field.strip().lower() for field in row] == CSV_COLUMNS:
+                continue
+
+            try:
+                transaction = TransactionFileProcessor.parse_row(row)
+            except ValueError as error:
+                if errors is None:
+                    raise ValueError(f'row {row_number}: {error}')
 
-            transactions.append(transaction)
+                errors.append({'row': row_number, 'reason': str(error)})
+                continue
 
-        return transactions
+            yield row_number, transaction
@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+import numpy as np
+
+
+INTERVALS = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+
+
+def naive_utc(timestamp: datetime) -> datetime:
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return timestamp
+
+
+def count_points(start: datetime, end: datetime, interval: str) -> int:
+    """
+    Return the length of the timeline from start to end every interval without building it
+    """
+    step = int(INTERVALS[interval].total_seconds())
+    span = int(
+        np.datetime64(naive_utc(end), 's').astype(np.int64)
+        - np.datetime64(naive_utc(start), 's').astype(np.int64)
+    )
+    return span // step + 1 if span >= 0 else 0
+
+
+def build_timeline(start: datetime, end: datetime, interval: str) -> np.ndarray:
+    """
+    Return the datetime64[s] points from start to end (inclusive) every interval
+    """
+    step = np.timedelta64(int(INTERVALS[interval].total_seconds()), 's')
+    return np.arange(
+        np.datetime64(naive_utc(start), 's'),
+        np.datetime64(naive_utc(end), 's') + np.timedelta64(1, 's'),
+        step
+    )
+
+
+def as_of(
+    event_times: np.ndarray,
+    values: np.ndarray,
+    timeline: np.ndarray,
+    default: float
+) -> np.ndarray:
+    """
+    Align events to the timeline: the value of the last event at or before each point,
+    default before the first event; event_times must be sorted
+    """
+    if not len(event_times):
+        return np.full(len(timeline), default)
+
+    positions = np.searchsorted(event_times, timeline, side='right') - 1
+    return np.where(positions >= 0, values[np.maximum(positions, 0)], default)
+
+
+def _group_bounds(codes: np.ndarray, count: int) -> np.ndarray:
+    # codes are sorted, rows of code i are [bounds[i], bounds[i + 1])
+    return np.searchsorted(codes, np.arange(count + 1))
+
+
+def build_price_series(range_series: dict, previous_prices: Sequence[dict] = ()) -> dict:
+    """
+    Convert the columnar prices of a range {ASSET: {timestamps: [epoch ms], prices}} to
+    {ASSET: (datetime64 times, float64 prices)}, prepending the last price before the range
+    """
+    series = {
+        asset: (
+            np.array(columns['timestamps'], dtype=np.int64).astype('datetime64[ms]'),
+            np.array(columns['prices'], dtype=np.float64)
+        )
+        for asset, columns in range_series.items()
+    }
+    empty = (np.array([], dtype='datetime64[ms]'), np.array([], dtype=np.float64))
+    for price in previous_prices:
+        times, prices = series.get(price['asset'], empty)
+        series[price['asset']] = (
+            np.concatenate(([np.datetime64(naive_utc(price['timestamp']), 'ms')], times)),
+            np.concatenate(([price['price']], prices))
+        )
+    return series
+
+
+def compute_history(transactions: list[dict], price_series: dict, timeline: np.ndarray) -> dict:
+    """
+    Value the holdings at every timeline point
+    Holdings are the cumulative signed amounts of the transactions per asset, priced with
+    the last price at or before each point from price_series {ASSET: (times, prices)} sorted
+    by time; values without a known price are None
+    """
+    timestamps = timeline.astype(datetime).tolist()
+    if not transactions:
+        return {'timestamps': timestamps, 'total': [0.0] * len(timeline), 'assets': {}}
+
+    assets, asset_codes = np.unique(
+        np.array([transaction['asset'].upper() for transaction in transactions]),
+        return_inverse=True
+    )
+    dates = np.array([transaction['date'] for transaction in transactions], dtype='datetime64[s]')
+    amounts = np.array([
+        transaction['amount'] if transaction['type'] == 'buy' else -transaction['amount']
+        for transaction in transactions
+    ], dtype=np.float64)
+
+    order = np.lexsort((dates, asset_codes))
+    asset_codes, dates, amounts = asset_codes[order], dates[order], amounts[order]
+    # cumulative holdings per asset: running sum minus the running sum before the asset's rows
+    running = np.cumsum(amounts)
+    bounds = _group_bounds(asset_codes, len(assets))
+    offsets = np.concatenate(([0.0], running))[bounds[:-1]]
+    holdings_after = running - np.repeat(offsets, np.diff(bounds))
+
+    holdings = np.empty((len(assets), len(timeline)))
+    asset_prices = np.full((len(assets), len(timeline)), np.nan)
+    for code, asset in enumerate(assets):
+        holdings[code] = as_of(
+            dates[bounds[code]:bounds[code + 1]],
+            holdings_after[bounds[code]:bounds[code + 1]],
+            timeline,
+            0.0
+        )
+        if asset in price_series:
+            times, prices = price_series[asset]
+            asset_prices[code] = as_of(times, prices, timeline, np.nan)
+
+    values = holdings * asset_prices
+    total = np.nansum(values, axis=0)
+    values_or_none = np.where(np.isnan(values), None, values).tolist()
+
+    return {
+        'timestamps': timestamps,
+        'total': total.tolist(),
+        'assets': {
+            str(asset): {'amount': holdings[code].tolist(), 'value': values_or_none[code]}
+            for code, asset in enumerate(assets)
+        }
+    }
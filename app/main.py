@@ -1,9 +1,18 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.v1.price import price_router
 from app.api.v1.transaction import transaction_router
 from app.api.v1.user import user_router
 from app.api.v1.wallet import wallet_router
+from app.auth.revocation import revocation_list
+from app.database.connection import async_connection_manager, connection_manager
+from app.database.indexes import ensure_indexes_async
+from app.nomicsapi.refresher import price_refresher
+from app.nomicsapi.service import api_handler
+from app.repositories.portfolio import get_portfolio_snapshot_repository
 
 
 description = '''
@@ -21,13 +30,33 @@ tags_metadata = [
     {
         'name': 'Wallets',
     },
+    {
+        'name': 'Prices',
+    },
 ]
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):  # pragma: no cover
+    connection = async_connection_manager.open()
+    await ensure_indexes_async(connection.local)
+    await get_portfolio_snapshot_repository().backfill()
+    api_handler.open()
+    price_refresher.start()
+    revocation_list.start()
+    yield
+    await revocation_list.stop()
+    await price_refresher.stop()
+    await api_handler.close()
+    await async_connection_manager.close()
+    connection_manager.close()
+
+
 portfolio_service = FastAPI(
     title='Crypto Verse',
     description=description,
-    openapi_tags=tags_metadata
+    openapi_tags=tags_metadata,
+    lifespan=lifespan
 )
 portfolio_service.add_middleware(
     CORSMiddleware,
@@ -42,3 +71,4 @@ portfolio_service.add_middleware(
 portfolio_service.include_router(transaction_router)
 portfolio_service.include_router(user_router)
 portfolio_service.include_router(wallet_router)
+portfolio_service.include_router(price_router)
@@ -0,0 +1,80 @@
+import time
+
+from typing import Callable
+
+from app import settings
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Stop calling a failing provider
+    closed: calls pass, failure_threshold consecutive failures or slow calls open the circuit
+    open: calls are rejected for reset_timeout seconds, then the circuit turns half open
+    half_open: a single probe call passes, its success closes the circuit, its failure reopens it
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(
+        self,
+        failure_threshold: int = settings.PRICE_BREAKER_FAILURE_THRESHOLD,
+        slow_call_threshold: float = settings.PRICE_BREAKER_SLOW_CALL_THRESHOLD,
+        reset_timeout: float = settings.PRICE_BREAKER_RESET_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._failure_threshold = failure_threshold
+        self._slow_call_threshold = slow_call_threshold
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self._reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+
+        return self._state
+
+    def allow(self) -> bool:
+        """
+        Return whether a call may pass, taking the probe slot when half open
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+
+        return False
+
+    def record_success(self, duration: float) -> None:
+        if duration > self._slow_call_threshold:
+            self.record_failure()
+            return
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probing = False
+
+    def release(self) -> None:
+        """
+        Give back the probe slot of a call that ended without an outcome, e.g. was cancelled
+        """
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self._failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = self._clock()
+            self._probing = False
@@ -0,0 +1,73 @@
+import time
+
+from collections import OrderedDict
+from typing import Callable
+
+from app import settings
+
+
+class PriceCache:
+    """
+    Per-asset price cache with LRU eviction
+    An entry is fresh for ttl seconds, then stale (still served, but due a refresh)
+    for another stale_ttl seconds, then expired
+    """
+    def __init__(
+        self,
+        ttl: float = settings.PRICE_CACHE_TTL,
+        stale_ttl: float = settings.PRICE_CACHE_STALE_TTL,
+        max_size: int = settings.PRICE_CACHE_MAX_SIZE,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        self._max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, ids: tuple[str, ...] | list[str]) -> tuple[dict, list[str], list[str]]:
+        """
+        Return (cached asset data, stale ids, missing ids), expired entries count as missing
+        but are kept for peek until evicted
+        """
+        now = self._clock()
+        hits, stale, missing = {}, [], []
+        for id in ids:
+            entry = self._entries.get(id)
+            if entry is None:
+                missing.append(id)
+                continue
+
+            asset_data, stored_at = entry
+            age = now - stored_at
+            if age > self._ttl + self._stale_ttl:
+                missing.append(id)
+                continue
+
+            self._entries.move_to_end(id)
+            hits[id] = asset_data
+            if age > self._ttl:
+                stale.append(id)
+
+        return hits, stale, missing
+
+    def peek(self, ids: tuple[str, ...] | list[str]) -> dict:
+        """
+        Return the cached asset data of the ids regardless of age, for a degraded response
+        """
+        return {id: self._entries[id][0] for id in ids if id in self._entries}
+
+    def set_many(self, asset_data: dict) -> None:
+        now = self._clock()
+        for id, data in asset_data.items():
+            self._entries[id] = (data, now)
+            self._entries.move_to_end(id)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
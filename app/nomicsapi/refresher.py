@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from app import settings
+from app.nomicsapi.service import NomicsAPIHandler, api_handler
+from app.repositories.portfolio import get_portfolio_snapshot_repository
+from app.repositories.price import get_price_repository
+
+
+class PriceRefresher:
+    """
+    Periodically refresh the cached prices of every held asset, so portfolio requests
+    are served from a warm cache instead of waiting on the upstream API
+    Every refreshed price is also passed to store_prices to build the price history
+    """
+    def __init__(
+        self,
+        api_handler: NomicsAPIHandler,
+        get_assets: Callable[[], Awaitable[list[str]]],
+        store_prices: Callable[[dict, datetime], Awaitable[int]] | None = None,
+        interval: float = settings.PRICE_REFRESH_INTERVAL,
+        clock: Callable[[], float] = time.time
+    ) -> None:
+        self._api_handler = api_handler
+        self._get_assets = get_assets
+        self._store_prices = store_prices
+        self._interval = interval
+        self._clock = clock
+        self._task: asyncio.Task | None = None
+        self.last_refresh_at: float | None = None
+        self.last_error: str | None = None
+        self.refreshed_assets = 0
+
+    @property
+    def lag(self) -> float | None:
+        """
+        Seconds since the last successful refresh, None before the first one
+        """
+        if self.last_refresh_at is None:
+            return None
+
+        return self._clock() - self.last_refresh_at
+
+    def status(self) -> dict:
+        return {
+            'running': self._task is not None and not self._task.done(),
+            'last_refresh_at': self.last_refresh_at,
+            'lag': self.lag,
+            'refreshed_assets': self.refreshed_assets,
+            'last_error': self.last_error
+        }
+
+    async def refresh(self) -> int:
+        """
+        Refresh every held asset, return the number of prices received
+        The handler splits the assets into concurrent chunked ticker calls
+        """
+        asset_data = await self._api_handler.refresh(*await self._get_assets())
+        if self._store_prices and asset_data:
+            await self._store_prices(asset_data, datetime.now(timezone.utc))
+
+        self.last_refresh_at = self._clock()
+        self.last_error = None
+        self.refreshed_assets = len(asset_data)
+        return len(asset_data)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as error:
+                # a failed round keeps the cached prices, lag shows how old they are
+                self.last_error = repr(error)
+            await asyncio.sleep(self._interval)
+
+    def start(self) -> None:
+        if self._task is None and self._interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+async def get_held_assets() -> list[str]:  # pragma: no cover
+    return await get_portfolio_snapshot_repository().get_held_assets()
+
+
+async def store_prices(asset_data: dict, timestamp: datetime) -> int:  # pragma: no cover
+    return await get_price_repository().add_quotes(asset_data, timestamp)
+
+
+price_refresher = PriceRefresher(api_handler, get_held_assets, store_prices)
+
+
+def get_price_refresher() -> PriceRefresher:
+    return price_refresher
@@ -1,18 +1,232 @@
-# pragma: no cover
 import asyncio
+import time
+
 import httpx
-import json
 
-API_KEY = 'ca109ae5159d18fc47942615b0f5018a29869a17'
+from app import settings
+from app.nomicsapi.breaker import CircuitBreaker, CircuitOpenError
+from app.nomicsapi.cache import PriceCache
+
+
+# errors of a failed upstream call: transport and status errors, malformed payloads, open circuit
+UPSTREAM_ERRORS = (httpx.HTTPError, ValueError, KeyError, TypeError, CircuitOpenError)
+
 
 class NomicsAPIHandler:
-    def __init__(self):
-        self._base_url = f'https://api.nomics.com/v1/currencies/ticker?key={API_KEY}'
+    """
+    Own a single pooled, keep-alive httpx.AsyncClient, so price lookups reuse warm connections
+    The client binds to the event loop it is first used on, so open it from the app lifespan
+    With a cache, stale prices are served immediately and refreshed in the background
+    Concurrent lookups within coalesce_window seconds are merged into one upstream call,
+    sent as chunks of chunk_size ids with at most max_concurrency chunks in flight
+    With a breaker, chunks are rejected without a call while the provider is failing
+    """
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        cache: PriceCache | None = None,
+        breaker: CircuitBreaker | None = None,
+        coalesce_window: float = settings.PRICE_API_COALESCE_WINDOW,
+        chunk_size: int = settings.PRICE_API_CHUNK_SIZE,
+        max_concurrency: int = settings.PRICE_API_MAX_CONCURRENCY,
+        **client_options
+    ) -> None:
+        self._base_url = base_url
+        self._api_key = api_key
+        self._cache = cache
+        self.breaker = breaker
+        self._coalesce_window = coalesce_window
+        self._chunk_size = chunk_size
+        self._max_concurrency = max_concurrency
+        self._client_options = client_options
+        self._client: httpx.AsyncClient | None = None
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        # every id being fetched -> its shared future, and the ids of the batch not sent yet
+        self._in_flight: dict[str, asyncio.Future] = {}
+        self._batch: dict[str, asyncio.Future] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            return self.open()
+
+        return self._client
+
+    def open(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(**self._client_options)
+
+        return self._client
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for future in self._in_flight.values():
+            future.cancel()
+        self._in_flight.clear()
+        self._batch.clear()
+
+        if self._client is None:
+            return
+
+        await self._client.aclose()
+        self._client = None
+
+    async def lookup(
+        self,
+        *ids: str,
+        timeout: float | None = None
+    ) -> tuple[dict, list[str], bool]:
+        """
+        Return (asset data, missing ids, prices stale) without raising on upstream failures
+        If the provider fails or does not answer in timeout seconds, fall back to cached prices
+        of any age; prices are stale if any of them is older than the cache ttl or missing
+        """
+        try:
+            asset_data, stale = await asyncio.wait_for(self._get(ids), timeout)
+        except (*UPSTREAM_ERRORS, asyncio.TimeoutError):
+            asset_data, stale = {}, ids
+
+        missing = [id for id in ids if id not in asset_data]
+        if missing and self._cache is not None:
+            asset_data.update(self._cache.peek(missing))
+            missing = [id for id in ids if id not in asset_data]
+
+        asset_data = {id: asset_data[id] for id in ids if id in asset_data}
+        return asset_data, missing, bool(stale or missing)
+
+    async def get_asset_data(self, *ids: str) -> dict:
+        asset_data, _ = await self._get(ids)
+        return asset_data
+
+    async def _get(self, ids: tuple[str, ...] | list[str]) -> tuple[dict, list[str]]:
+        if self._cache is None:
+            return await self._load(ids), []
+
+        asset_data, stale, missing = self._cache.lookup(ids)
+        if stale:
+            self._schedule_refresh(stale)
+        if missing:
+            asset_data.update(await self._load(missing))
+
+        return {id: asset_data[id] for id in ids if id in asset_data}, stale
+
+    async def refresh(self, *ids: str) -> dict:
+        """
+        Fetch the ids upstream regardless of their cache state, the result is cached
+        """
+        return await self._load(ids)
+
+    async def _load(self, ids: tuple[str, ...] | list[str]) -> dict:
+        """
+        Join the in-flight lookup of every id or add it to the next batch
+        """
+        futures = {}
+        for id in ids:
+            if id not in self._in_flight:
+                self._in_flight[id] = self._batch[id] = asyncio.get_running_loop().create_future()
+                if len(self._batch) == 1:
+                    self._spawn(self._flush())
+            futures[id] = self._in_flight[id]
 
-    async def get_asset_data(self, *ids):
-        async with httpx.AsyncClient() as client:
-            req_url = self._base_url + '&ids=' + ','.join(ids)
-            res = await client.get(req_url)
+        # shielded, a cancelled waiter must not cancel the lookups shared with others
+        results = await asyncio.shield(
+            asyncio.gather(*futures.values(), return_exceptions=True)
+        )
+        asset_data = {}
+        for id, result in zip(futures, results):
+            if isinstance(result, BaseException):
+                raise result
+            if result is not None:
+                asset_data[id] = result
+
+        return asset_data
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self._coalesce_window)
+        batch, self._batch = self._batch, {}
+
+        try:
+            asset_data = await self._fetch_asset_data(*batch)
+        except Exception as error:
+            for future in batch.values():
+                future.set_exception(error)
+            return
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        finally:
+            for id in batch:
+                self._in_flight.pop(id, None)
+
+        # cached here, so a lookup abandoned on timeout still warms the cache
+        if self._cache is not None:
+            self._cache.set_many(asset_data)
+        for id, future in batch.items():
+            future.set_result(asset_data.get(id))
+
+    async def _fetch_asset_data(self, *ids: str) -> dict:
+        """
+        Fetch the ids in concurrent chunks, ids of failed chunks are left out
+        Raise the first error only if every chunk failed
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def fetch_chunk(chunk: tuple[str, ...]) -> dict:
+            async with semaphore:
+                return await self._fetch_chunk(*chunk)
+
+        results = await asyncio.gather(
+            *(
+                fetch_chunk(ids[start:start + self._chunk_size])
+                for start in range(0, len(ids), self._chunk_size)
+            ),
+            return_exceptions=True
+        )
+        errors = [result for result in results if isinstance(result, BaseException)]
+        for error in errors:
+            if not isinstance(error, UPSTREAM_ERRORS):
+                raise error
+        if errors and len(errors) == len(results):
+            raise errors[0]
+
+        asset_data = {}
+        for result in results:
+            if not isinstance(result, BaseException):
+                asset_data.update(result)
+        return asset_data
+
+    async def _fetch_chunk(self, *ids: str) -> dict:
+        if self.breaker is None:
+            return await self._request_chunk(*ids)
+
+        if not self.breaker.allow():
+            raise CircuitOpenError('price provider circuit is open')
+
+        start = time.monotonic()
+        try:
+            asset_data = await self._request_chunk(*ids)
+        except asyncio.CancelledError:
+            # a cancelled call says nothing about the provider
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+
+        self.breaker.record_success(time.monotonic() - start)
+        return asset_data
+
+    async def _request_chunk(self, *ids: str) -> dict:
+        res = await self.client.get(
+            self._base_url,
+            params={'key': self._api_key, 'ids': ','.join(ids)}
+        )
+        res.raise_for_status()
 
         res_data = res.json()
         return {
@@ -20,5 +234,49 @@ class NomicsAPIHandler:
             for asset_data in res_data
         }
 
+    def _schedule_refresh(self, ids: list[str]) -> None:
+        ids = [id for id in ids if id not in self._refreshing]
+        if not ids:
+            return
+
+        self._refreshing.update(ids)
+        self._spawn(self._refresh(ids))
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, ids: list[str]) -> None:
+        try:
+            await self.refresh(*ids)
+        except UPSTREAM_ERRORS:
+            # keep serving the stale prices, the next lookup retries
+            pass
+        finally:
+            self._refreshing.difference_update(ids)
+
+
+CLIENT_OPTIONS = {
+    'limits': httpx.Limits(
+        max_connections=settings.PRICE_API_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.PRICE_API_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.PRICE_API_KEEPALIVE_EXPIRY
+    ),
+    'timeout': httpx.Timeout(
+        settings.PRICE_API_TIMEOUT,
+        connect=settings.PRICE_API_CONNECT_TIMEOUT
+    )
+}
+
+api_handler = NomicsAPIHandler(
+    settings.PRICE_API_URL,
+    settings.PRICE_API_KEY,
+    cache=PriceCache(),
+    breaker=CircuitBreaker(),
+    **CLIENT_OPTIONS
+)
+
 
-api_handler = NomicsAPIHandler()
+def get_api_handler() -> NomicsAPIHandler:
+    return api_handler
@@ -0,0 +1,357 @@
+import argparse
+
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from app.database.connection import connection_manager, get_async_connection
+from app.database.service import AsyncCRUDService, CRUDService
+
+
+def portfolio_accumulators() -> dict:
+    """
+    $group accumulators of the per-asset portfolio meta
+    """
+    is_buy = {'$eq': ['$type', 'buy']}
+    return {
+        'amount': {'$sum': {
+            '$cond': [is_buy, '$amount', {'$multiply': ['$amount', -1]}]
+        }},
+        'investment': {'$sum': {
+            '$cond': [is_buy, {'$multiply': ['$amount', '$historical_price']}, 0]
+        }},
+        'count': {'$sum': 1}
+    }
+
+
+class PortfolioSnapshotRepository:
+    """
+    Per-user portfolio materialized view, one document per owner keyed by owner_id:
+    {_id: owner_id, assets: {ASSET: {amount, investment, count}}}
+    Writers call ensure before writing a transaction of an owner, so a snapshot is built
+    only while none of its owner's transactions is being written and every later $inc
+    applies on top of it exactly once
+    """
+    def __init__(
+        self,
+        crud_service: CRUDService,
+        transaction_crud_service: CRUDService
+    ) -> None:
+        self._crud_service = crud_service
+        self._transaction_crud_service = transaction_crud_service
+
+    @staticmethod
+    def _increments(transaction: dict, sign: int) -> dict:
+        asset = transaction['asset'].upper()
+        if transaction['type'] == 'buy':
+            amount = transaction['amount']
+            investment = transaction['amount'] * transaction['historical_price']
+        else:
+            amount = -transaction['amount']
+            investment = 0
+
+        return {
+            f'assets.{asset}.amount': sign * amount,
+            f'assets.{asset}.investment': sign * investment,
+            f'assets.{asset}.count': sign
+        }
+
+    @staticmethod
+    def _build_portfolio(snapshot: dict | None) -> dict | None:
+        if snapshot is None:
+            return None
+
+        portfolio = {
+            'investment': 0,
+            'assets': {}
+        }
+        for asset, asset_data in sorted(snapshot.get('assets', {}).items()):
+            # assets whose transactions were all removed only hold float residue
+            if asset_data['count'] <= 0:
+                continue
+
+            portfolio['assets'][asset] = {
+                'meta': {
+                    'amount': asset_data['amount'],
+                    'investment': asset_data['investment'],
+                    'average_price': asset_data['investment'] / asset_data['amount']
+                                     if asset_data['amount'] != 0 else 0
+                }
+            }
+            portfolio['investment'] += asset_data['investment']
+
+        if not portfolio['assets']:
+            return {}
+
+        return portfolio
+
+    @staticmethod
+    def _rebuild_pipeline(owner_id: str | None) -> list[dict]:
+        return [
+            {'$match': {'owner_id': owner_id} if owner_id else {}},
+            {'$group': {
+                '_id': {'owner_id': '$owner_id', 'asset': {'$toUpper': '$asset'}},
+                **portfolio_accumulators()
+            }}
+        ]
+
+    @staticmethod
+    def _build_snapshots(asset_groups: list[dict]) -> dict:
+        snapshots = {}
+        for asset_group in asset_groups:
+            snapshot = snapshots.setdefault(asset_group['_id']['owner_id'], {'assets': {}})
+            snapshot['assets'][asset_group['_id']['asset']] = {
+                'amount': asset_group['amount'],
+                'investment': asset_group['investment'],
+                'count': asset_group['count']
+            }
+        return snapshots
+
+    @staticmethod
+    def _owners_pipeline() -> list[dict]:
+        return [{'$group': {'_id': '$owner_id'}}]
+
+    @staticmethod
+    def _held_assets_pipeline() -> list[dict]:
+        return [
+            {'$project': {'assets': {'$objectToArray': '$assets'}}},
+            {'$unwind': '$assets'},
+            {'$match': {'assets.v.count': {'$gt': 0}}},
+            {'$group': {'_id': '$assets.k'}},
+            {'$sort': {'_id': 1}}
+        ]
+
+    @staticmethod
+    def _merged_increments(changes: list[tuple[dict, int]]) -> dict:
+        """
+        Merge (transaction, sign) changes into one $inc document per owner
+        """
+        increments_by_owner = {}
+        for transaction, sign in changes:
+            increments = increments_by_owner.setdefault(transaction['owner_id'], {})
+            for key, value in PortfolioSnapshotRepository._increments(transaction, sign).items():
+                increments[key] = increments.get(key, 0) + value
+        return increments_by_owner
+
+    @staticmethod
+    def _missing_owner_ids(owner_groups: list[dict], snapshots: list[dict]) -> list[str]:
+        snapshot_ids = {str(snapshot['_id']) for snapshot in snapshots}
+        return [
+            owner_group['_id'] for owner_group in owner_groups
+            if owner_group['_id'] and str(owner_group['_id']) not in snapshot_ids
+        ]
+
+    @staticmethod
+    def _stale_snapshot_ids(owner_id: str | None, snapshots: dict) -> ObjectId | dict | None:
+        """
+        Return the _id filter of the snapshots a rebuild left without transactions, None if none
+        """
+        if not owner_id:
+            return {'$nin': [ObjectId(snapshot_owner_id) for snapshot_owner_id in snapshots]}
+
+        if owner_id not in snapshots:
+            return ObjectId(owner_id)
+
+        return None
+
+    @staticmethod
+    def _held_assets(asset_groups: list[dict]) -> list[str]:
+        return [asset_group['_id'] for asset_group in asset_groups]
+
+    @staticmethod
+    def _new_snapshot(owner_id: str, asset_groups: list[dict]) -> dict:
+        snapshot = PortfolioSnapshotRepository._build_snapshots(asset_groups).get(
+            owner_id,
+            {'assets': {}}
+        )
+        return {'_id': ObjectId(owner_id), **snapshot}
+
+    def ensure(self, owner_id: str) -> None:
+        """
+        Build the owner's snapshot from the transactions collection if it does not exist yet
+        Created with insert_one, so a concurrent builder that lost the race keeps the winner's
+        """
+        if self._crud_service.find_one({'_id': ObjectId(owner_id)}, {'_id': 1}):
+            return
+
+        snapshot = self._new_snapshot(
+            owner_id,
+            self._transaction_crud_service.aggregate(self._rebuild_pipeline(owner_id))
+        )
+        try:
+            self._crud_service.create(snapshot)
+        except DuplicateKeyError:
+            pass
+
+    def ensure_many(self, transactions: list[dict]) -> None:
+        for owner_id in dict.fromkeys(transaction['owner_id'] for transaction in transactions):
+            self.ensure(owner_id)
+
+    def _apply_changes(self, changes: list[tuple[dict, int]]) -> None:
+        """
+        The transactions must already be written, a snapshot missing anyway, e.g. of an owner
+        not backfilled yet, is built from the transactions collection, which has the changes
+        """
+        for owner_id, increments in self._merged_increments(changes).items():
+            result = self._crud_service.increment_by_id(owner_id, upsert=False, **increments)
+            if not result.matched_count:
+                self.ensure(owner_id)
+
+    def apply(self, transaction: dict) -> None:
+        self._apply_changes([(transaction, 1)])
+
+    def reverse(self, transaction: dict) -> None:
+        self._apply_changes([(transaction, -1)])
+
+    def replace(self, previous_transaction: dict, transaction: dict) -> None:
+        self._apply_changes([(previous_transaction, -1), (transaction, 1)])
+
+    def apply_many(self, transactions: list[dict]) -> None:
+        """
+        Apply a batch with one update per owner
+        """
+        self._apply_changes([(transaction, 1) for transaction in transactions])
+
+    def get_by_owner_id(self, owner_id: str) -> dict | None:
+        """
+        Return None if the owner has no snapshot yet, so the caller can fall back to an aggregation
+        """
+        return self._build_portfolio(self._crud_service.get_by_id(owner_id))
+
+    def get_held_assets(self) -> list[str]:
+        """
+        Return the union of the assets held by any owner
+        """
+        return self._held_assets(self._crud_service.aggregate(self._held_assets_pipeline()))
+
+    def rebuild(self, owner_id: str | None = None) -> int:
+        """
+        Recompute snapshots from the transactions collection to repair drift, a maintenance
+        command: writes of the rebuilt owners running meanwhile may be counted twice or lost
+        Rebuild every owner if owner_id is not given, return the number of snapshots written
+        """
+        snapshots = self._build_snapshots(
+            self._transaction_crud_service.aggregate(self._rebuild_pipeline(owner_id))
+        )
+        for snapshot_owner_id, snapshot in snapshots.items():
+            self._crud_service.replace_by_id(snapshot_owner_id, snapshot)
+
+        stale_snapshot_ids = self._stale_snapshot_ids(owner_id, snapshots)
+        if stale_snapshot_ids is not None:
+            self._crud_service.delete_all_by_key('_id', stale_snapshot_ids)
+
+        return len(snapshots)
+
+    def backfill(self) -> int:
+        """
+        Build the snapshot of every owner who has transactions but no snapshot yet,
+        return the number of snapshots built
+        """
+        missing_owner_ids = self._missing_owner_ids(
+            self._transaction_crud_service.aggregate(self._owners_pipeline()),
+            self._crud_service.find({}, projection={'_id': 1})
+        )
+        for owner_id in missing_owner_ids:
+            self.ensure(owner_id)
+
+        return len(missing_owner_ids)
+
+
+class AsyncPortfolioSnapshotRepository(PortfolioSnapshotRepository):
+    async def ensure(self, owner_id: str) -> None:
+        if await self._crud_service.find_one({'_id': ObjectId(owner_id)}, {'_id': 1}):
+            return
+
+        snapshot = self._new_snapshot(
+            owner_id,
+            await self._transaction_crud_service.aggregate(self._rebuild_pipeline(owner_id))
+        )
+        try:
+            await self._crud_service.create(snapshot)
+        except DuplicateKeyError:
+            pass
+
+    async def ensure_many(self, transactions: list[dict]) -> None:
+        for owner_id in dict.fromkeys(transaction['owner_id'] for transaction in transactions):
+            await self.ensure(owner_id)
+
+    async def _apply_changes(self, changes: list[tuple[dict, int]]) -> None:
+        for owner_id, increments in self._merged_increments(changes).items():
+            result = await self._crud_service.increment_by_id(
+                owner_id,
+                upsert=False,
+                **increments
+            )
+            if not result.matched_count:
+                await self.ensure(owner_id)
+
+    async def apply(self, transaction: dict) -> None:
+        await self._apply_changes([(transaction, 1)])
+
+    async def reverse(self, transaction: dict) -> None:
+        await self._apply_changes([(transaction, -1)])
+
+    async def replace(self, previous_transaction: dict, transaction: dict) -> None:
+        await self._apply_changes([(previous_transaction, -1), (transaction, 1)])
+
+    async def apply_many(self, transactions: list[dict]) -> None:
+        await self._apply_changes([(transaction, 1) for transaction in transactions])
+
+    async def get_by_owner_id(self, owner_id: str) -> dict | None:
+        return self._build_portfolio(await self._crud_service.get_by_id(owner_id))
+
+    async def get_held_assets(self) -> list[str]:
+        return self._held_assets(
+            await self._crud_service.aggregate(self._held_assets_pipeline())
+        )
+
+    async def rebuild(self, owner_id: str | None = None) -> int:
+        snapshots = self._build_snapshots(
+            await self._transaction_crud_service.aggregate(self._rebuild_pipeline(owner_id))
+        )
+        for snapshot_owner_id, snapshot in snapshots.items():
+            await self._crud_service.replace_by_id(snapshot_owner_id, snapshot)
+
+        stale_snapshot_ids = self._stale_snapshot_ids(owner_id, snapshots)
+        if stale_snapshot_ids is not None:
+            await self._crud_service.delete_all_by_key('_id', stale_snapshot_ids)
+
+        return len(snapshots)
+
+    async def backfill(self) -> int:
+        missing_owner_ids = self._missing_owner_ids(
+            await self._transaction_crud_service.aggregate(self._owners_pipeline()),
+            await self._crud_service.find({}, projection={'_id': 1})
+        )
+        for owner_id in missing_owner_ids:
+            await self.ensure(owner_id)
+
+        return len(missing_owner_ids)
+
+
+def get_portfolio_snapshot_repository() -> AsyncPortfolioSnapshotRepository:  # pragma: no cover
+    connection = get_async_connection()
+    return AsyncPortfolioSnapshotRepository(
+        AsyncCRUDService(connection, 'portfolio_snapshots'),
+        AsyncCRUDService(connection, 'transactions')
+    )
+
+
+def main() -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description='Rebuild portfolio snapshots')
+    parser.add_argument('--owner-id', default=None)
+    args = parser.parse_args()
+
+    connection = connection_manager.open()
+    try:
+        repository = PortfolioSnapshotRepository(
+            CRUDService(connection, 'portfolio_snapshots'),
+            CRUDService(connection, 'transactions')
+        )
+        rebuilt = repository.rebuild(owner_id=args.owner_id)
+        print(f'Rebuilt {rebuilt} portfolio snapshot(s)')
+    finally:
+        connection_manager.close()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
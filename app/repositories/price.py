@@ -0,0 +1,357 @@
+import argparse
+import asyncio
+import csv
+
+from datetime import datetime, timedelta, timezone
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient
+from pymongo.errors import BulkWriteError
+
+from app import settings
+from app.database.connection import connection_manager, get_async_connection
+from app.database.service import AsyncCRUDService, CRUDService
+from app.schemas.transaction import parse_date
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class PriceRepository:
+    """
+    Historical prices in time buckets, one document per asset and bucket_seconds window:
+    {asset, start, points: [{timestamp, price}] sorted by timestamp}
+    Lookups seek the asset_start index and read a handful of buckets instead of one
+    document per price
+    """
+    _bucket_sort = [('asset', ASCENDING), ('start', ASCENDING)]
+
+    def __init__(
+        self,
+        crud_service: CRUDService,
+        bucket_seconds: int = settings.PRICE_BUCKET_SECONDS
+    ) -> None:
+        self._crud_service = crud_service
+        self._bucket_seconds = bucket_seconds
+
+    @staticmethod
+    def _normalize_timestamp(timestamp: datetime) -> datetime:
+        # stored as naive UTC, the way pymongo returns dates
+        if timestamp.tzinfo is not None:
+            return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+
+        return timestamp
+
+    @staticmethod
+    def _validate_new(new_price: dict) -> dict:
+        if set(new_price.keys()) != {'asset', 'timestamp', 'price'}:
+            raise ValueError
+
+        return {
+            'asset': str(new_price['asset']).upper(),
+            'timestamp': PriceRepository._normalize_timestamp(parse_date(new_price['timestamp'])),
+            'price': float(new_price['price'])
+        }
+
+    @staticmethod
+    def _quotes(asset_data: dict, timestamp: datetime) -> list[dict]:
+        """
+        Convert ticker asset data {ASSET: {price, ...}} to prices
+        """
+        timestamp = PriceRepository._normalize_timestamp(timestamp)
+        return [
+            {'asset': asset.upper(), 'timestamp': timestamp, 'price': float(data['price'])}
+            for asset, data in asset_data.items()
+        ]
+
+    def _bucket_start(self, timestamp: datetime) -> datetime:
+        seconds = int((timestamp - EPOCH).total_seconds())
+        return EPOCH + timedelta(seconds=seconds - seconds % self._bucket_seconds)
+
+    @staticmethod
+    def _dedupe(prices: list[dict]) -> list[dict]:
+        """
+        Keep the last price of every (asset, timestamp) of a batch
+        """
+        return list({(price['asset'], price['timestamp']): price for price in prices}.values())
+
+    def _bucket_points(self, prices: list[dict]) -> dict[tuple[str, datetime], list[dict]]:
+        buckets = {}
+        for price in prices:
+            key = (price['asset'], self._bucket_start(price['timestamp']))
+            buckets.setdefault(key, []).append(
+                {'timestamp': price['timestamp'], 'price': price['price']}
+            )
+        return buckets
+
+    @staticmethod
+    def _merge_points(points: list[dict]) -> list[dict]:
+        """
+        Update pipeline replacing the stored points of the same timestamps, so writing a price
+        again, e.g. by re-running the loader, never stores its point twice
+        """
+        timestamps = [point['timestamp'] for point in points]
+        return [{'$set': {'points': {'$sortArray': {
+            'input': {'$concatArrays': [
+                {'$filter': {
+                    'input': {'$ifNull': ['$points', []]},
+                    'cond': {'$not': [{'$in': ['$$this.timestamp', timestamps]}]}
+                }},
+                points
+            ]},
+            'sortBy': {'timestamp': 1}
+        }}}}]
+
+    def _bucket_updates(self, prices: list[dict]) -> list[tuple[dict, list[dict]]]:
+        """
+        Group the prices by bucket, one upsert merging every point of a bucket
+        """
+        return [
+            ({'asset': asset, 'start': start}, self._merge_points(points))
+            for (asset, start), points in self._bucket_points(prices).items()
+        ]
+
+    @staticmethod
+    def _duplicate_updates(
+        updates: list[tuple[dict, list[dict]]],
+        error: BulkWriteError
+    ) -> list[tuple[dict, list[dict]]]:
+        """
+        Return the upserts that lost a race to create their bucket, empty if any other write
+        failed; retried, they update the bucket the other writer created
+        """
+        write_errors = error.details.get('writeErrors', [])
+        if not write_errors or any(write_error['code'] != 11000 for write_error in write_errors):
+            return []
+
+        return [updates[write_error['index']] for write_error in write_errors]
+
+    @staticmethod
+    def _normalize_range(start: datetime, end: datetime) -> tuple[datetime, datetime]:
+        return (
+            PriceRepository._normalize_timestamp(start),
+            PriceRepository._normalize_timestamp(end)
+        )
+
+    def _range_query(self, assets: list[str], start: datetime, end: datetime) -> dict:
+        return {
+            'asset': {'$in': [asset.upper() for asset in assets]},
+            'start': {'$gte': self._bucket_start(start), '$lte': end}
+        }
+
+    def _range_find(self, assets: list[str], start: datetime, end: datetime) -> dict:
+        """
+        find arguments of the buckets overlapping [start, end] in asset, start order
+        """
+        return {'query': self._range_query(assets, start, end), 'sort': self._bucket_sort}
+
+    def _series_pipeline(self, assets: list[str], start: datetime, end: datetime) -> list[dict]:
+        return [
+            {'$match': self._range_query(assets, start, end)},
+            {'$sort': {'asset': 1, 'start': 1}},
+            {'$unwind': '$points'},
+            {'$match': {'points.timestamp': {'$gte': start, '$lte': end}}},
+            {'$group': {
+                '_id': '$asset',
+                'timestamps': {'$push': {'$toLong': '$points.timestamp'}},
+                'prices': {'$push': '$points.price'}
+            }}
+        ]
+
+    @staticmethod
+    def _build_series(groups: list[dict]) -> dict:
+        return {
+            group['_id']: {'timestamps': group['timestamps'], 'prices': group['prices']}
+            for group in groups
+        }
+
+    @staticmethod
+    def _range_points(buckets: list[dict], start: datetime, end: datetime) -> list[dict]:
+        return [
+            {'asset': bucket['asset'], **point}
+            for bucket in buckets
+            for point in bucket['points']
+            if start <= point['timestamp'] <= end
+        ]
+
+    @staticmethod
+    def _point_at(asset: str, buckets: list[dict], timestamp: datetime) -> dict | None:
+        # buckets newest first, the newest one may only hold later points
+        for bucket in buckets:
+            for point in reversed(bucket['points']):
+                if point['timestamp'] <= timestamp:
+                    return {'asset': asset, **point}
+        return None
+
+    def _point_find(self, asset: str, timestamp: datetime) -> dict:
+        """
+        find arguments of the two newest buckets starting at or before timestamp, see _point_at
+        """
+        return {
+            'query': {'asset': asset.upper(), 'start': {'$lte': self._bucket_start(timestamp)}},
+            'sort': [('start', DESCENDING)],
+            'limit': 2
+        }
+
+    def _upsert(self, updates: list[tuple[dict, list[dict]]]) -> None:
+        try:
+            self._crud_service.bulk_upsert(updates)
+        except BulkWriteError as error:
+            retry_updates = self._duplicate_updates(updates, error)
+            if not retry_updates:
+                raise
+            self._crud_service.bulk_upsert(retry_updates)
+
+    def _add(self, prices: list[dict]) -> int:
+        prices = self._dedupe(prices)
+        if prices:
+            self._upsert(self._bucket_updates(prices))
+
+        return len(prices)
+
+    def add_many(self, new_prices: list[dict]) -> int:
+        """
+        Return the number of written prices, a repeated (asset, timestamp) is stored once,
+        the last price written wins
+        """
+        return self._add([self._validate_new(new_price) for new_price in new_prices])
+
+    def add_quotes(self, asset_data: dict, timestamp: datetime) -> int:
+        return self._add(self._quotes(asset_data, timestamp))
+
+    def get_range(self, asset: str, start: datetime, end: datetime) -> list[dict]:
+        return self.get_range_many([asset], start, end)
+
+    def get_range_many(self, assets: list[str], start: datetime, end: datetime) -> list[dict]:
+        """
+        Return the prices of the assets within [start, end] ordered by asset and timestamp
+        """
+        start, end = self._normalize_range(start, end)
+        buckets = self._crud_service.find(**self._range_find(assets, start, end))
+        return self._range_points(buckets, start, end)
+
+    def get_range_series(self, assets: list[str], start: datetime, end: datetime) -> dict:
+        """
+        Return the prices within [start, end] as columns per asset, for bulk valuation:
+        {ASSET: {timestamps: [epoch milliseconds], prices: [...]}} ordered by timestamp
+        """
+        start, end = self._normalize_range(start, end)
+        return self._build_series(
+            self._crud_service.aggregate(self._series_pipeline(assets, start, end))
+        )
+
+    def get_at(self, asset: str, timestamp: datetime) -> dict | None:
+        """
+        Return the last price of the asset at or before timestamp
+        """
+        timestamp = self._normalize_timestamp(timestamp)
+        buckets = self._crud_service.find(**self._point_find(asset, timestamp))
+        return self._point_at(asset.upper(), buckets, timestamp)
+
+    def get_at_many(self, assets: list[str], timestamp: datetime) -> list[dict]:
+        prices = [self.get_at(asset, timestamp) for asset in assets]
+        return [price for price in prices if price]
+
+    def load_csv(self, path: str, batch_size: int = settings.IMPORT_BATCH_SIZE) -> int:
+        """
+        Bulk load an asset,timestamp,price csv file, return the number of written prices,
+        loading a file again stores no point twice
+        """
+        loaded = 0
+        with open(path, newline='') as file:
+            batch = []
+            for row in csv.DictReader(file):
+                batch.append(row)
+                if len(batch) == batch_size:
+                    loaded += self.add_many(batch)
+                    batch = []
+            loaded += self.add_many(batch)
+
+        return loaded
+
+
+class AsyncPriceRepository(PriceRepository):
+    async def _upsert(self, updates: list[tuple[dict, list[dict]]]) -> None:
+        try:
+            await self._crud_service.bulk_upsert(updates)
+        except BulkWriteError as error:
+            retry_updates = self._duplicate_updates(updates, error)
+            if not retry_updates:
+                raise
+            await self._crud_service.bulk_upsert(retry_updates)
+
+    async def _add(self, prices: list[dict]) -> int:
+        prices = self._dedupe(prices)
+        if prices:
+            await self._upsert(self._bucket_updates(prices))
+
+        return len(prices)
+
+    async def add_many(self, new_prices: list[dict]) -> int:
+        return await self._add([self._validate_new(new_price) for new_price in new_prices])
+
+    async def add_quotes(self, asset_data: dict, timestamp: datetime) -> int:
+        return await self._add(self._quotes(asset_data, timestamp))
+
+    async def get_range(self, asset: str, start: datetime, end: datetime) -> list[dict]:
+        return await self.get_range_many([asset], start, end)
+
+    async def get_range_many(
+        self,
+        assets: list[str],
+        start: datetime,
+        end: datetime
+    ) -> list[dict]:
+        start, end = self._normalize_range(start, end)
+        buckets = await self._crud_service.find(**self._range_find(assets, start, end))
+        return self._range_points(buckets, start, end)
+
+    async def get_range_series(
+        self,
+        assets: list[str],
+        start: datetime,
+        end: datetime
+    ) -> dict:
+        start, end = self._normalize_range(start, end)
+        return self._build_series(
+            await self._crud_service.aggregate(self._series_pipeline(assets, start, end))
+        )
+
+    async def get_at(self, asset: str, timestamp: datetime) -> dict | None:
+        timestamp = self._normalize_timestamp(timestamp)
+        buckets = await self._crud_service.find(**self._point_find(asset, timestamp))
+        return self._point_at(asset.upper(), buckets, timestamp)
+
+    async def get_at_many(self, assets: list[str], timestamp: datetime) -> list[dict]:
+        prices = await asyncio.gather(*(self.get_at(asset, timestamp) for asset in assets))
+        return [price for price in prices if price]
+
+
+def get_price_repository():  # pragma: no cover
+    connection = get_async_connection()
+    crud_service = AsyncCRUDService(connection, 'prices')
+    return AsyncPriceRepository(crud_service)
+
+
+async def get_test_price_repository():  # pragma: no cover
+    connection = AsyncMongoClient()
+    crud_service = AsyncCRUDService(connection, 'test_api_prices')
+    yield AsyncPriceRepository(crud_service)
+    await connection.close()
+
+
+def main() -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description='Load historical prices')
+    parser.add_argument('path', help='csv file with asset,timestamp,price columns')
+    parser.add_argument('--batch-size', type=int, default=settings.IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    connection = connection_manager.open()
+    try:
+        repository = PriceRepository(CRUDService(connection, 'prices'))
+        loaded = repository.load_csv(args.path, batch_size=args.batch_size)
+        print(f'Loaded {loaded} price(s)')
+    finally:
+        connection_manager.close()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
@@ -0,0 +1,100 @@
+from datetime import datetime, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from app.database.connection import get_async_connection
+from app.database.service import AsyncCRUDService, CRUDService
+
+
+class RevokedTokenRepository:
+    """
+    Used token ids: {_id: jti, expires_at, type}, a TTL index drops them once the token expired
+    type is revocation for revoked access tokens, claim for used up single use tokens
+    """
+    def __init__(self, crud_service: CRUDService) -> None:
+        self._crud_service = crud_service
+
+    @staticmethod
+    def _revoke_update(jti: str, expires_at: float) -> tuple[dict, dict]:
+        return (
+            {'_id': jti},
+            {'$set': {
+                'expires_at': datetime.fromtimestamp(expires_at, timezone.utc),
+                'type': 'revocation'
+            }}
+        )
+
+    @staticmethod
+    def _claim_document(jti: str, expires_at: float) -> dict:
+        return {
+            '_id': jti,
+            'expires_at': datetime.fromtimestamp(expires_at, timezone.utc),
+            'type': 'claim'
+        }
+
+    @staticmethod
+    def _revoked_find(jti: str) -> dict:
+        return {'query': {'_id': jti}, 'limit': 1, 'projection': {'_id': 1}}
+
+    @staticmethod
+    def _active_find(now: float) -> dict:
+        # $ne keeps revocations stored before they were typed
+        return {
+            'query': {
+                'type': {'$ne': 'claim'},
+                'expires_at': {'$gt': datetime.fromtimestamp(now, timezone.utc)}
+            },
+            'projection': {'_id': 1}
+        }
+
+    @staticmethod
+    def _token_ids(tokens: list[dict]) -> list[str]:
+        return [token['_id'] for token in tokens]
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        self._crud_service.bulk_upsert([self._revoke_update(jti, expires_at)])
+
+    def claim(self, jti: str, expires_at: float) -> bool:
+        """
+        Atomically mark a single use token as used, False if it was already used or revoked
+        """
+        try:
+            self._crud_service.create(self._claim_document(jti, expires_at))
+        except DuplicateKeyError:
+            return False
+
+        return True
+
+    def is_revoked(self, jti: str) -> bool:
+        return bool(self._crud_service.find(**self._revoked_find(jti)))
+
+    def get_active(self, now: float) -> list[str]:
+        """
+        Return the ids of the revoked tokens not expired at now, claimed tokens are left out
+        """
+        return self._token_ids(self._crud_service.find(**self._active_find(now)))
+
+
+class AsyncRevokedTokenRepository(RevokedTokenRepository):
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        await self._crud_service.bulk_upsert([self._revoke_update(jti, expires_at)])
+
+    async def claim(self, jti: str, expires_at: float) -> bool:
+        try:
+            await self._crud_service.create(self._claim_document(jti, expires_at))
+        except DuplicateKeyError:
+            return False
+
+        return True
+
+    async def is_revoked(self, jti: str) -> bool:
+        return bool(await self._crud_service.find(**self._revoked_find(jti)))
+
+    async def get_active(self, now: float) -> list[str]:
+        return self._token_ids(await self._crud_service.find(**self._active_find(now)))
+
+
+def get_revoked_token_repository():  # pragma: no cover
+    connection = get_async_connection()
+    return AsyncRevokedTokenRepository(AsyncCRUDService(connection, 'revoked_tokens'))
+
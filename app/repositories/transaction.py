@@ -1,25 +1,44 @@
+import argparse
+import asyncio
+
 from bson import ObjectId
 from bson.errors import InvalidId
-from pymongo import MongoClient
-
-from app.database.service import CRUDService
+from fastapi import UploadFile
+from pymongo import DESCENDING, AsyncMongoClient, ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from app import settings
+from app.database.connection import connection_manager, get_async_connection
+from app.database.pagination import build_page, page_args
+from app.costbasis.batch import PROJECTION, TransactionBatch
+from app.costbasis.service import calculate_cost_basis
+from app.database.service import AsyncCRUDService, CRUDService
 from app.fileprocessor.service import TransactionFileProcessor
-from app.schemas.transaction import Transaction
+from app.repositories.portfolio import \
+    AsyncPortfolioSnapshotRepository, \
+    PortfolioSnapshotRepository, \
+    portfolio_accumulators
+from app.schemas.transaction import Transaction, parse_asset, parse_date
 from app.serializers.transaction import TransactionSerializer
 
 
 class TransactionRepository:
+    _page_sort = [('date', DESCENDING), ('_id', DESCENDING)]
+
     def __init__(
         self,
         crud_service: CRUDService,
         file_processor: TransactionFileProcessor,
-        serializer: TransactionSerializer
+        serializer: TransactionSerializer,
+        snapshot_repository: PortfolioSnapshotRepository | None = None
     ) -> None:
         self._crud_service = crud_service
         self._file_processor = file_processor
         self._serializer = serializer
+        self._snapshot_repository = snapshot_repository
 
-    def create(self, new_transaction: Transaction | dict) -> dict:
+    @staticmethod
+    def _validate_new(new_transaction: Transaction | dict) -> dict:
         new_transaction_dict = dict(new_transaction)
         if len(new_transaction_dict) != 8:
             raise ValueError
@@ -42,150 +61,587 @@ class TransactionRepository:
         if set(new_transaction_dict.keys()) != valid_keys:
             raise ValueError
 
-        inserted_id = self._crud_service.create(new_transaction_dict).inserted_id
-        return self._serializer.serialize_one(
-            self._crud_service.get_by_id(inserted_id)
-        )
+        parse_asset(new_transaction_dict['asset'])
+        new_transaction_dict['date'] = parse_date(new_transaction_dict['date'])
+
+        return new_transaction_dict
+
+    @staticmethod
+    def _validate_update(update_data: dict) -> dict:
+        if 'asset' in update_data:
+            parse_asset(update_data['asset'])
+
+        if 'date' not in update_data:
+            return update_data
+
+        return {**update_data, 'date': parse_date(update_data['date'])}
+
+    @staticmethod
+    def _validate_many(
+        new_transactions: list[Transaction | dict],
+        row_numbers: list[int] | None = None
+    ) -> tuple[list[dict], list[int], list[dict]]:
+        """
+        Split a batch into (valid documents, their row numbers, {row, reason} errors)
+        Rows are numbered from 1 unless row_numbers is given
+        """
+        if row_numbers is None:
+            row_numbers = range(1, len(new_transactions) + 1)
+
+        documents, document_rows, errors = [], [], []
+        for row_number, new_transaction in zip(row_numbers, new_transactions):
+            try:
+                documents.append(TransactionRepository._validate_new(new_transaction))
+            except (ValueError, KeyError, TypeError, InvalidId) as error:
+                errors.append({'row': row_number, 'reason': str(error) or type(error).__name__})
+                continue
+            document_rows.append(row_number)
+
+        return documents, document_rows, errors
+
+    @staticmethod
+    def _split_inserted(
+        documents: list[dict],
+        document_rows: list[int],
+        error: BulkWriteError | None = None
+    ) -> tuple[list[dict], list[dict]]:
+        """
+        Split an unordered insert_many batch into (inserted documents, {row, reason} errors)
+        """
+        if error is None:
+            return documents, []
+
+        failed = {
+            write_error['index']: write_error.get('errmsg', 'write error')
+            for write_error in error.details.get('writeErrors', [])
+        }
+        inserted = [
+            document for index, document in enumerate(documents) if index not in failed
+        ]
+        errors = [
+            {'row': document_rows[index], 'reason': reason}
+            for index, reason in sorted(failed.items())
+        ]
+        return inserted, errors
+
+    @staticmethod
+    def _batches(
+        documents: list[dict],
+        document_rows: list[int],
+        batch_size: int
+    ) -> list[tuple[list[dict], list[int]]]:
+        return [
+            (documents[start:start + batch_size], document_rows[start:start + batch_size])
+            for start in range(0, len(documents), batch_size)
+        ]
+
+    @staticmethod
+    def _validate_id(id: str | ObjectId) -> ObjectId:
+        if not isinstance(id, str) and not isinstance(id, ObjectId):
+            raise TypeError
 
-    def get_by_id(self, id: str | ObjectId) -> dict:
-        try:
-            id = ObjectId(id)
-        except:
-            raise
+        return ObjectId(id)
 
-        transaction = self._crud_service.get_by_id(id)
+    def _serialize_found(self, transaction: dict | None) -> dict:
         if not transaction:
             return {}
 
         return self._serializer.serialize_one(transaction)
 
+    def _insert_batch(self, batch: list[dict], batch_rows: list[int]) -> tuple[int, list[dict]]:
+        """
+        Return (inserted count, {row, reason} errors) of one create_many batch
+        """
+        if self._snapshot_repository:
+            self._snapshot_repository.ensure_many(batch)
+
+        try:
+            self._crud_service.create_many(batch)
+            write_error = None
+        except BulkWriteError as error:
+            write_error = error
+
+        stored, errors = self._split_inserted(batch, batch_rows, write_error)
+        if self._snapshot_repository and stored:
+            self._snapshot_repository.apply_many(stored)
+
+        return len(stored), errors
+
+    def create_many(
+        self,
+        new_transactions: list[Transaction | dict],
+        row_numbers: list[int] | None = None,
+        batch_size: int = settings.IMPORT_BATCH_SIZE
+    ) -> dict:
+        """
+        Bulk insert with unordered insert_many in batches of batch_size
+        Invalid or rejected rows do not abort the batch, they are reported as {row, reason}
+        Rows are numbered from 1 unless row_numbers is given
+        """
+        documents, document_rows, errors = self._validate_many(new_transactions, row_numbers)
+        inserted = 0
+        for batch, batch_rows in self._batches(documents, document_rows, batch_size):
+            batch_inserted, batch_errors = self._insert_batch(batch, batch_rows)
+            inserted += batch_inserted
+            errors += batch_errors
+
+        return {'inserted': inserted, 'errors': errors}
+
+    def create(self, new_transaction: Transaction | dict) -> dict:
+        new_transaction_dict = self._validate_new(new_transaction)
+        if self._snapshot_repository:
+            self._snapshot_repository.ensure(new_transaction_dict['owner_id'])
+
+        stored_transaction = self._crud_service.create_and_return(new_transaction_dict)
+        if self._snapshot_repository:
+            self._snapshot_repository.apply(stored_transaction)
+
+        return self._serializer.serialize_one(stored_transaction)
+
+    def get_by_id(self, id: str | ObjectId) -> dict:
+        return self._serialize_found(self._crud_service.get_by_id(ObjectId(id)))
+
     def get_all(self, **kwargs) -> list[dict]:
         return self._serializer.serialize_many(
-            self._crud_service.get_all(**kwargs)
+            self._crud_service.get_all(projection=self._serializer.PROJECTION, **kwargs),
+            validate=False
         )
 
-    def get_all_by_asset(self, asset: str) -> list[dict]:
+    def get_all_sorted_by_date(self, **kwargs) -> list[dict]:
         return self._serializer.serialize_many(
-            self._crud_service.get_all_by_key('asset', asset)
+            self._crud_service.get_all(
+                sort=self._page_sort,
+                projection=self._serializer.PROJECTION,
+                **kwargs
+            ),
+            validate=False
         )
 
-    def get_all_by_tag(self, tag: str) -> list[dict]:
+    def get_page(self, limit: int, after: str | None = None, **kwargs) -> dict:
+        items = self._crud_service.get_page(
+            *page_args(self._page_sort, limit, after),
+            self._serializer.PROJECTION,
+            **kwargs
+        )
+        return build_page(items, limit, self._page_sort, self._serializer)
+
+    def get_all_by_asset(self, asset: str, **kwargs) -> list[dict]:
         return self._serializer.serialize_many(
-            self._crud_service.get_all_by_key('tags', {'$in': [tag]})
+            self._crud_service.find(
+                {**self._owner_query(**kwargs), 'asset': asset},
+                projection=self._serializer.PROJECTION
+            ),
+            validate=False
+        )
+
+    def get_all_by_tag(self, tag: str, **kwargs) -> list[dict]:
+        return self._serializer.serialize_many(
+            self._crud_service.find(
+                {**self._owner_query(**kwargs), 'tags': {'$in': [tag]}},
+                projection=self._serializer.PROJECTION
+            ),
+            validate=False
         )
 
     def update_by_id(self, id: str | ObjectId, update_data: dict) -> dict:
-        if not isinstance(id, str) and not isinstance(id, ObjectId):
-            raise TypeError
+        id = self._validate_id(id)
+        update_data = self._validate_update(update_data)
+        if self._snapshot_repository:
+            return self._update_by_id_with_snapshot(id, update_data)
 
-        id: ObjectId
-        try:
-            id = ObjectId(id)
-        except:
-            raise
+        return self._serialize_found(
+            self._crud_service.find_one_and_update_by_id(id, **update_data)
+        )
 
-        update_result = self._crud_service.update_by_id(
+    def _update_by_id_with_snapshot(self, id: ObjectId, update_data: dict) -> dict:
+        previous_transaction = self._crud_service.find_one_and_update_by_id(
             id,
+            return_document=ReturnDocument.BEFORE,
             **update_data
         )
-
-        if not update_result.raw_result['updatedExisting']:
+        if not previous_transaction:
             return {}
 
-        return self._serializer.serialize_one(
-            self._crud_service.get_by_id(id)
-        )
+        updated_transaction = {**previous_transaction, **update_data}
+        self._snapshot_repository.replace(previous_transaction, updated_transaction)
+
+        return self._serializer.serialize_one(updated_transaction)
 
     def delete_by_id(self, id: str | ObjectId) -> dict:
-        if not isinstance(id, str) and not isinstance(id, ObjectId):
-            raise TypeError
+        deleted_transaction = self._crud_service.find_one_and_delete_by_id(self._validate_id(id))
+        if deleted_transaction and self._snapshot_repository:
+            self._snapshot_repository.reverse(deleted_transaction)
 
-        id: ObjectId
-        try:
-            id = ObjectId(id)
-        except:
-            raise
+        return self._serialize_found(deleted_transaction)
 
-        deleted_transaction = self._crud_service.get_by_id(id)
-        if not deleted_transaction:
-            return {}
+    def calculate_portfolio(
+        self,
+        include_transactions: bool = False,
+        cost_basis: str | None = None,
+        **kwargs
+    ) -> dict:
+        """
+        cost_basis: fifo, lifo or average to account sells against the matched buys
+        """
+        if include_transactions:
+            return self._build_portfolio(self.get_all(**kwargs), cost_basis)
+
+        if cost_basis:
+            return calculate_cost_basis(
+                TransactionBatch.from_documents(
+                    self._crud_service.iterate(self._owner_query(**kwargs), PROJECTION)
+                ),
+                cost_basis
+            )
 
-        self._crud_service.delete_by_id(deleted_transaction['_id'])
+        if self._snapshot_repository and 'owner_id' in kwargs:
+            portfolio = self._snapshot_repository.get_by_owner_id(kwargs['owner_id'])
+            if portfolio is not None:
+                return portfolio
 
-        return self._serializer.serialize_one(
-            deleted_transaction
+        return self._build_portfolio_meta(
+            self._crud_service.aggregate(self._portfolio_pipeline(**kwargs))
         )
 
-    def calculate_portfolio(self, **kwargs) -> dict:
-        transactions = self.get_all(**kwargs)
-        if not transactions:
+    @staticmethod
+    def _portfolio_pipeline(**kwargs) -> list[dict]:
+        return [
+            {'$match': {'owner_id': kwargs['owner_id']} if 'owner_id' in kwargs else {}},
+            {'$group': {
+                '_id': {'$toUpper': '$asset'},
+                **portfolio_accumulators()
+            }},
+            {'$project': {
+                'amount': 1,
+                'investment': 1,
+                'average_price': {'$cond': [
+                    {'$eq': ['$amount', 0]},
+                    0,
+                    {'$divide': ['$investment', '$amount']}
+                ]}
+            }},
+            {'$sort': {'_id': 1}}
+        ]
+
+    @staticmethod
+    def _build_portfolio_meta(asset_groups: list[dict]) -> dict:
+        if not asset_groups:
             return {}
 
         portfolio = {
             'investment': 0,
             'assets': {}
         }
-        # group by assets
-        for transaction in transactions:
-            asset_data = portfolio['assets'].setdefault(
-                transaction['asset'].upper(),
-                {
-                    'meta': {},
-                    'transactions': []
+        for asset_group in asset_groups:
+            portfolio['assets'][asset_group['_id']] = {
+                'meta': {
+                    'amount': asset_group['amount'],
+                    'investment': asset_group['investment'],
+                    'average_price': asset_group['average_price']
                 }
-            )
-            asset_data['transactions'].append(transaction)
-
-        # calculate amount by asset
-        # calculate investment by assets and overall
-        # calculate avg price by asset
-        for asset_data in portfolio['assets'].values():
-            asset_amount = 0
-            asset_investment = 0
-            for transaction in asset_data['transactions']:
-                if transaction['type'] == 'buy':
-                    asset_amount += transaction['amount']
-                    asset_investment += \
-                        transaction['amount'] * transaction['historical_price']
-                else:
-                    asset_amount -= transaction['amount']
-
-            asset_data['meta']['amount'] = asset_amount
-            asset_data['meta']['investment'] = asset_investment
-            if asset_amount != 0:
-                asset_data['meta']['average_price'] = asset_investment / asset_amount
-            else:
-                asset_data['meta']['average_price'] = 0
-            portfolio['investment'] += asset_investment
+            }
+            portfolio['investment'] += asset_group['investment']
 
         return portfolio
 
-    def import_csv(self, file: bytes) -> list:  # pragma: no cover
+    @staticmethod
+    def _owner_query(**kwargs) -> dict:
+        return {'owner_id': kwargs['owner_id']} if 'owner_id' in kwargs else {}
+
+    @staticmethod
+    def _build_portfolio(transactions: list[dict], cost_basis: str | None = None) -> dict:
+        batch = TransactionBatch.from_documents(transactions)
+        if cost_basis:
+            portfolio = calculate_cost_basis(batch, cost_basis)
+        else:
+            portfolio = batch.portfolio()
+
+        for asset_data in portfolio.get('assets', {}).values():
+            asset_data['transactions'] = []
+        for transaction in transactions:
+            portfolio['assets'][transaction['asset'].upper()]['transactions'].append(transaction)
+
+        return portfolio
+
+    def migrate_string_dates(self, batch_size: int = 1000) -> int:
+        """
+        Convert transactions still holding a string date into a native BSON date
+        """
+        migrated = 0
+        updates = []
+        for transaction in self._crud_service.get_all_by_key('date', {'$type': 'string'}):
+            updates.append((transaction['_id'], {'date': parse_date(transaction['date'])}))
+            if len(updates) == batch_size:
+                migrated += self._crud_service.bulk_update_by_id(updates).modified_count
+                updates = []
+
+        if updates:
+            migrated += self._crud_service.bulk_update_by_id(updates).modified_count
+
+        return migrated
+
+
+class AsyncTransactionRepository(TransactionRepository):
+    async def _insert_batch(
+        self,
+        batch: list[dict],
+        batch_rows: list[int]
+    ) -> tuple[int, list[dict]]:
+        if self._snapshot_repository:
+            await self._snapshot_repository.ensure_many(batch)
+
+        try:
+            await self._crud_service.create_many(batch)
+            write_error = None
+        except BulkWriteError as error:
+            write_error = error
+
+        stored, errors = self._split_inserted(batch, batch_rows, write_error)
+        if self._snapshot_repository and stored:
+            await self._snapshot_repository.apply_many(stored)
+
+        return len(stored), errors
+
+    async def create_many(
+        self,
+        new_transactions: list[Transaction | dict],
+        row_numbers: list[int] | None = None,
+        batch_size: int = settings.IMPORT_BATCH_SIZE
+    ) -> dict:
+        documents, document_rows, errors = self._validate_many(new_transactions, row_numbers)
+        inserted = 0
+        for batch, batch_rows in self._batches(documents, document_rows, batch_size):
+            batch_inserted, batch_errors = await self._insert_batch(batch, batch_rows)
+            inserted += batch_inserted
+            errors += batch_errors
+
+        return {'inserted': inserted, 'errors': errors}
+
+    async def create(self, new_transaction: Transaction | dict) -> dict:
+        new_transaction_dict = self._validate_new(new_transaction)
+        if self._snapshot_repository:
+            await self._snapshot_repository.ensure(new_transaction_dict['owner_id'])
+
+        stored_transaction = await self._crud_service.create_and_return(new_transaction_dict)
+        if self._snapshot_repository:
+            await self._snapshot_repository.apply(stored_transaction)
+
+        return self._serializer.serialize_one(stored_transaction)
+
+    async def get_by_id(self, id: str | ObjectId) -> dict:
+        return self._serialize_found(await self._crud_service.get_by_id(ObjectId(id)))
+
+    async def get_all(self, **kwargs) -> list[dict]:
+        return self._serializer.serialize_many(
+            await self._crud_service.get_all(projection=self._serializer.PROJECTION, **kwargs),
+            validate=False
+        )
+
+    async def get_all_sorted_by_date(self, **kwargs) -> list[dict]:
+        return self._serializer.serialize_many(
+            await self._crud_service.get_all(
+                sort=self._page_sort,
+                projection=self._serializer.PROJECTION,
+                **kwargs
+            ),
+            validate=False
+        )
+
+    async def get_page(self, limit: int, after: str | None = None, **kwargs) -> dict:
+        items = await self._crud_service.get_page(
+            *page_args(self._page_sort, limit, after),
+            self._serializer.PROJECTION,
+            **kwargs
+        )
+        return build_page(items, limit, self._page_sort, self._serializer)
+
+    async def get_all_by_asset(self, asset: str, **kwargs) -> list[dict]:
+        return self._serializer.serialize_many(
+            await self._crud_service.find(
+                {**self._owner_query(**kwargs), 'asset': asset},
+                projection=self._serializer.PROJECTION
+            ),
+            validate=False
+        )
+
+    async def get_all_by_tag(self, tag: str, **kwargs) -> list[dict]:
+        return self._serializer.serialize_many(
+            await self._crud_service.find(
+                {**self._owner_query(**kwargs), 'tags': {'$in': [tag]}},
+                projection=self._serializer.PROJECTION
+            ),
+            validate=False
+        )
+
+    async def update_by_id(self, id: str | ObjectId, update_data: dict) -> dict:
+        id = self._validate_id(id)
+        update_data = self._validate_update(update_data)
+        if self._snapshot_repository:
+            return await self._update_by_id_with_snapshot(id, update_data)
+
+        return self._serialize_found(
+            await self._crud_service.find_one_and_update_by_id(id, **update_data)
+        )
+
+    async def _update_by_id_with_snapshot(self, id: ObjectId, update_data: dict) -> dict:
+        previous_transaction = await self._crud_service.find_one_and_update_by_id(
+            id,
+            return_document=ReturnDocument.BEFORE,
+            **update_data
+        )
+        if not previous_transaction:
+            return {}
+
+        updated_transaction = {**previous_transaction, **update_data}
+        await self._snapshot_repository.replace(previous_transaction, updated_transaction)
+
+        return self._serializer.serialize_one(updated_transaction)
+
+    async def delete_by_id(self, id: str | ObjectId) -> dict:
+        deleted_transaction = await self._crud_service.find_one_and_delete_by_id(
+            self._validate_id(id)
+        )
+        if deleted_transaction and self._snapshot_repository:
+            await self._snapshot_repository.reverse(deleted_transaction)
+
+        return self._serialize_found(deleted_transaction)
+
+    async def calculate_portfolio(
+        self,
+        include_transactions: bool = False,
+        cost_basis: str | None = None,
+        **kwargs
+    ) -> dict:
+        # lot matching grows with the account, it runs in executor off the event loop
+        if include_transactions:
+            transactions = await self.get_all(**kwargs)
+            if not cost_basis:
+                return self._build_portfolio(transactions)
+
+            return await asyncio.get_running_loop().run_in_executor(
+                None, self._build_portfolio, transactions, cost_basis
+            )
+
+        if cost_basis:
+            batch = await TransactionBatch.from_async_documents(
+                self._crud_service.iterate(self._owner_query(**kwargs), PROJECTION)
+            )
+            return await asyncio.get_running_loop().run_in_executor(
+                None, calculate_cost_basis, batch, cost_basis
+            )
+
+        if self._snapshot_repository and 'owner_id' in kwargs:
+            portfolio = await self._snapshot_repository.get_by_owner_id(kwargs['owner_id'])
+            if portfolio is not None:
+                return portfolio
+
+        return self._build_portfolio_meta(
+            await self._crud_service.aggregate(self._portfolio_pipeline(**kwargs))
+        )
+
+    async def import_csv(
+        self,
+        file: UploadFile,
+        owner_id: str,
+        batch_size: int = settings.IMPORT_BATCH_SIZE
+    ) -> dict:
+        """
+        Stream the csv upload and bulk insert it in batches of batch_size
+        Invalid rows are skipped and reported, at most IMPORT_MAX_ERRORS of them are listed
+        If the file itself breaks off, e.g. an oversized record or invalid utf-8, the rows
+        read so far stay imported and aborted holds the reason
+        """
+        result = {'imported': 0, 'failed': 0, 'errors': [], 'aborted': None}
         if not self._file_processor:
-            return []
+            return result
 
-        return self._file_processor.import_csv(file)
+        parse_errors = []
+        transactions, row_numbers = [], []
+        try:
+            async for row_number, transaction in self._file_processor.iter_transactions(
+                file,
+                errors=parse_errors
+            ):
+                transaction['owner_id'] = owner_id
+                transactions.append(transaction)
+                row_numbers.append(row_number)
+                if len(transactions) == batch_size:
+                    self._collect_import_errors(result, parse_errors)
+                    batch_result = await self.create_many(transactions, row_numbers, batch_size)
+                    self._collect_import_result(result, batch_result)
+                    transactions, row_numbers = [], []
+        except ValueError as error:
+            result['aborted'] = str(error)
+
+        self._collect_import_errors(result, parse_errors)
+        if transactions:
+            batch_result = await self.create_many(transactions, row_numbers, batch_size)
+            self._collect_import_result(result, batch_result)
+
+        result['errors'].sort(key=lambda error: error['row'])
+        return result
+
+    @staticmethod
+    def _collect_import_errors(result: dict, errors: list[dict]) -> None:
+        result['failed'] += len(errors)
+        free = settings.IMPORT_MAX_ERRORS - len(result['errors'])
+        result['errors'] += errors[:max(free, 0)]
+        errors.clear()
+
+    @staticmethod
+    def _collect_import_result(result: dict, batch_result: dict) -> None:
+        result['imported'] += batch_result['inserted']
+        AsyncTransactionRepository._collect_import_errors(result, batch_result['errors'])
 
 
 def get_transaction_repository():  # pragma: no cover
-    connection = MongoClient()
-    crud_service = CRUDService(connection, 'transactions')
+    connection = get_async_connection()
+    crud_service = AsyncCRUDService(connection, 'transactions')
     file_processor = TransactionFileProcessor()
-    repository = TransactionRepository(
+    snapshot_repository = AsyncPortfolioSnapshotRepository(
+        AsyncCRUDService(connection, 'portfolio_snapshots'),
+        crud_service
+    )
+    repository = AsyncTransactionRepository(
         crud_service,
         file_processor,
-        TransactionSerializer
+        TransactionSerializer,
+        snapshot_repository
     )
     return repository
 
 
-def get_test_transaction_repository():  # pragma: no cover
-    connection = MongoClient()
-    crud_service = CRUDService(connection, 'test_api_transactions')
+async def get_test_transaction_repository():  # pragma: no cover
+    connection = AsyncMongoClient()
+    crud_service = AsyncCRUDService(connection, 'test_api_transactions')
     file_processor = TransactionFileProcessor()
-    test_repository = TransactionRepository(
+    test_repository = AsyncTransactionRepository(
         crud_service,
         file_processor,
         TransactionSerializer
     )
-    return test_repository
+    yield test_repository
+    await connection.close()
+
+
+def main() -> None:  # pragma: no cover
+    parser = argparse.ArgumentParser(description='Transaction maintenance commands')
+    parser.add_argument('command', choices=['migrate-dates'])
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    connection = connection_manager.open()
+    try:
+        repository = TransactionRepository(
+            CRUDService(connection, 'transactions'),
+            None,
+            TransactionSerializer
+        )
+        migrated = repository.migrate_string_dates(batch_size=args.batch_size)
+        print(f'Migrated {migrated} transaction date(s)')
+    finally:
+        connection_manager.close()
+
+
+if __name__ == '__main__':  # pragma: no cover
+    main()
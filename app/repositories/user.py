@@ -1,9 +1,11 @@
-import hashlib
-import jwt
-
-from pymongo import MongoClient
-
-from app.database.service import CRUDService
+from pymongo import AsyncMongoClient
+
+from app import settings
+from app.auth.hasher import AsyncPasswordHasher, PasswordHasher, password_hasher
+from app.auth.service import UNAUTHORIZED, decode_token, encode_token
+from app.database.connection import get_async_connection
+from app.database.indexes import INDEX_REGISTRY, ensure_indexes_async
+from app.database.service import AsyncCRUDService, CRUDService
 from app.schemas.user import User
 from app.serializers.user import UserSerializer
 
@@ -12,12 +14,15 @@ class UserRepository:
     def __init__(
         self,
         crud_service: CRUDService,
-        serializer: UserSerializer
+        serializer: UserSerializer,
+        password_hasher: PasswordHasher | None = None
     ) -> None:
         self._crud_service = crud_service
         self._serializer = serializer
+        self._password_hasher = password_hasher or PasswordHasher()
 
-    def create(self, new_user: User) -> dict:
+    @staticmethod
+    def _validate_new(new_user: User) -> dict:
         new_user_dict = dict(new_user)
         valid_keys = {'username', 'hashed_password'}
 
@@ -27,103 +32,107 @@ class UserRepository:
         if not new_user_dict['hashed_password']:
             raise ValueError
 
-        new_user_dict['hashed_password'] = hashlib.blake2b(new_user_dict['hashed_password'].encode()).hexdigest()
-
-        inserted_id = self._crud_service.create(new_user_dict).inserted_id
-        return self._serializer.serialize_one(
-            self._crud_service.get_by_id(inserted_id)
-        )
-
-    def get_by_username(self, username: str) -> dict:
-        lookup_user = self._crud_service.get_all_by_key('username', username)
-        if not lookup_user:
-            return {}
-
-        lookup_user, = lookup_user
-     
-        return self._serializer.serialize_one(lookup_user)
-
-    def get_authenticated_user(self, username: str, password: str) -> dict:
-        lookup_user = self.get_by_username(username)
-        if not lookup_user:
-            return {'authenticated': False, 'user': {}}
-
-        if not hashlib.blake2b(password.encode()).hexdigest() == lookup_user['hashed_password']:
-            return {'authenticated': False, 'user': {}}
+        return new_user_dict
 
-        return {'authenticated': True, 'user': lookup_user}
-
-    def update_by_username(self, username: str, updated_data: dict) -> dict:
+    @staticmethod
+    def _validate_username(username: str) -> str:
         if not isinstance(username, str):
             raise TypeError
 
+        return username
+
+    @staticmethod
+    def _validate_update(username: str, updated_data: dict) -> dict:
+        UserRepository._validate_username(username)
         if not isinstance(updated_data, dict):
             raise TypeError
 
-        db_user = self.get_by_username(username)
-        if not db_user:
+        return updated_data
+
+    @staticmethod
+    def _authentication(user: dict) -> dict:
+        return {'authenticated': bool(user), 'user': user}
+
+    def _serialize_found(self, user: dict | None) -> dict:
+        if not user:
             return {}
 
-        self._crud_service.update_by_id(
-            db_user['id'],
-            **updated_data
-        )
+        return self._serializer.serialize_one(user)
+
+    def create(self, new_user: User) -> dict:
+        """
+        Raise DuplicateKeyError for a taken username, the users collection has a unique index
+        """
+        new_user_dict = self._validate_new(new_user)
+        new_user_dict['hashed_password'] = \
+            self._password_hasher.hash(new_user_dict['hashed_password'])
 
         return self._serializer.serialize_one(
-            self._crud_service.get_by_id(db_user['id'])
+            self._crud_service.create_and_return(new_user_dict)
         )
 
+    def get_by_username(self, username: str) -> dict:
+        return self._serialize_found(self._crud_service.find_one({'username': username}))
 
-    def delete_by_username(self, username: str) -> dict:
-        if not isinstance(username, str):
-            raise TypeError
+    def get_authenticated_user(self, username: str, password: str) -> dict:
+        lookup_user = self.get_by_username(username)
+        if not lookup_user:
+            self._password_hasher.verify_unknown(password)
+            return self._authentication({})
 
-        try:
-            target_user, = self._crud_service.get_all_by_key('username', username)
-        except:
-            return {}
+        authenticated, new_hash = self._password_hasher.verify_and_update(
+            password,
+            lookup_user['hashed_password']
+        )
+        if not authenticated:
+            return self._authentication({})
 
-        self._crud_service.delete_by_id(target_user['_id'])
+        if new_hash:
+            # legacy or outdated cost, upgrade while the plain password is at hand
+            self._crud_service.update_by_id(lookup_user['id'], hashed_password=new_hash)
+            lookup_user['hashed_password'] = new_hash
 
-        return self._serializer.serialize_one(
-            target_user
+        return self._authentication(lookup_user)
+
+    def update_by_username(self, username: str, updated_data: dict) -> dict:
+        updated_user = self._crud_service.find_one_and_update(
+            {'username': username},
+            **self._validate_update(username, updated_data)
+        )
+        return self._serialize_found(updated_user)
+
+    def delete_by_username(self, username: str) -> dict:
+        deleted_user = self._crud_service.find_one_and_delete(
+            {'username': self._validate_username(username)}
         )
+        return self._serialize_found(deleted_user)
 
     @staticmethod
-    def generate_jwt_token(user_data: dict, jwt_secret: str = 'SECRETKEY') -> dict:
+    def generate_jwt_token(user_data: dict, jwt_secret: str = settings.JWT_SECRET) -> dict:
         if not isinstance(user_data, dict):
             raise TypeError
 
         if not isinstance(jwt_secret, str):
             raise TypeError
 
-        payload = {
-            'id': user_data['id'],
-            'username': user_data['username'],
-            'authorized': True
-        }
-        token = jwt.encode(payload, jwt_secret, algorithm='HS256')
-
         return {
-            'access_token': token,
-            'token_type': 'bearer'
+            'access_token': encode_token(user_data, 'access', jwt_secret),
+            'refresh_token': encode_token(user_data, 'refresh', jwt_secret),
+            'token_type': 'bearer',
+            'expires_in': settings.ACCESS_TOKEN_TTL
         }
 
     @staticmethod
-    def verify_jwt_token(jwt_token: str, jwt_secret: str = 'SECRETKEY') -> dict:
+    def verify_jwt_token(jwt_token: str, jwt_secret: str = settings.JWT_SECRET) -> dict:
         if not isinstance(jwt_token, str):
             raise TypeError
 
         if not isinstance(jwt_secret, str):
             raise TypeError
 
-        try:
-            payload = jwt.decode(jwt_token, jwt_secret, algorithms=['HS256'])
-        except:
-            return {'authorized': False, 'id': '', 'username': ''}
-
-        if 'username' not in payload:
-            return {'authorized': False, 'id': '', 'username': ''}
+        payload = decode_token(jwt_token, jwt_secret)
+        if payload is None:
+            return dict(UNAUTHORIZED)
 
         return {
             'authorized': True,
@@ -132,21 +141,80 @@ class UserRepository:
         }
 
 
+class AsyncUserRepository(UserRepository):
+    def __init__(
+        self,
+        crud_service: AsyncCRUDService,
+        serializer: UserSerializer,
+        password_hasher: AsyncPasswordHasher = password_hasher
+    ) -> None:
+        super().__init__(crud_service, serializer, password_hasher)
+
+    async def create(self, new_user: User) -> dict:
+        new_user_dict = self._validate_new(new_user)
+        new_user_dict['hashed_password'] = \
+            await self._password_hasher.hash(new_user_dict['hashed_password'])
+
+        return self._serializer.serialize_one(
+            await self._crud_service.create_and_return(new_user_dict)
+        )
+
+    async def get_by_username(self, username: str) -> dict:
+        return self._serialize_found(await self._crud_service.find_one({'username': username}))
+
+    async def get_authenticated_user(self, username: str, password: str) -> dict:
+        lookup_user = await self.get_by_username(username)
+        if not lookup_user:
+            await self._password_hasher.verify_unknown(password)
+            return self._authentication({})
+
+        authenticated, new_hash = await self._password_hasher.verify_and_update(
+            password,
+            lookup_user['hashed_password']
+        )
+        if not authenticated:
+            return self._authentication({})
+
+        if new_hash:
+            await self._crud_service.update_by_id(lookup_user['id'], hashed_password=new_hash)
+            lookup_user['hashed_password'] = new_hash
+
+        return self._authentication(lookup_user)
+
+    async def update_by_username(self, username: str, updated_data: dict) -> dict:
+        updated_user = await self._crud_service.find_one_and_update(
+            {'username': username},
+            **self._validate_update(username, updated_data)
+        )
+        return self._serialize_found(updated_user)
+
+    async def delete_by_username(self, username: str) -> dict:
+        deleted_user = await self._crud_service.find_one_and_delete(
+            {'username': self._validate_username(username)}
+        )
+        return self._serialize_found(deleted_user)
+
+
 def get_user_repository():  # pragma: no cover
-    connection = MongoClient()
-    crud_service = CRUDService(connection, 'users')
-    repository = UserRepository(
+    connection = get_async_connection()
+    crud_service = AsyncCRUDService(connection, 'users')
+    repository = AsyncUserRepository(
         crud_service,
         UserSerializer
     )
     return repository
 
 
-def get_test_user_repository():  # pragma: no cover
-    connection = MongoClient()
-    crud_service = CRUDService(connection, 'test_api_users')
-    repository = UserRepository(
+async def get_test_user_repository():  # pragma: no cover
+    connection = AsyncMongoClient()
+    await ensure_indexes_async(
+        connection.local,
+        {'test_api_users': INDEX_REGISTRY['users']}
+    )
+    crud_service = AsyncCRUDService(connection, 'test_api_users')
+    repository = AsyncUserRepository(
         crud_service,
         UserSerializer
     )
-    return repository
+    yield repository
+    await connection.close()
@@ -1,13 +1,17 @@
 from bson import ObjectId
 from bson.errors import InvalidId
-from pymongo import MongoClient
+from pymongo import ASCENDING, AsyncMongoClient
 
-from app.database.service import CRUDService
+from app.database.connection import get_async_connection
+from app.database.pagination import build_page, page_args
+from app.database.service import AsyncCRUDService, CRUDService
 from app.schemas.wallet import Wallet
 from app.serializers.wallet import WalletSerializer
 
 
 class WalletRepository:
+    _page_sort = [('_id', ASCENDING)]
+
     def __init__(
         self,
         crud_service: CRUDService,
@@ -16,7 +20,8 @@ class WalletRepository:
         self._crud_service = crud_service
         self._serializer = serializer
 
-    def create(self, new_wallet: dict | Wallet) -> dict:
+    @staticmethod
+    def _validate_new(new_wallet: dict | Wallet) -> dict:
         new_wallet_dict = dict(new_wallet)
         if len(new_wallet_dict) != 3:
             raise ValueError
@@ -30,86 +35,107 @@ class WalletRepository:
         if set(new_wallet_dict.keys()) != valid_keys:
             raise ValueError
 
-        inserted_id = self._crud_service.create(new_wallet_dict).inserted_id
-        return self._serializer.serialize_one(
-            self._crud_service.get_by_id(inserted_id)
-        )
+        return new_wallet_dict
 
-    def get_by_id(self, id: str | ObjectId) -> dict:
-        try:
-            id = ObjectId(id)
-        except:
-            raise
+    @staticmethod
+    def _validate_id(id: str | ObjectId) -> ObjectId:
+        if not isinstance(id, str) and not isinstance(id, ObjectId):
+            raise TypeError
+
+        return ObjectId(id)
 
-        wallet = self._crud_service.get_by_id(id)
+    def _serialize_found(self, wallet: dict | None) -> dict:
         if not wallet:
             return {}
 
         return self._serializer.serialize_one(wallet)
 
+    def create(self, new_wallet: dict | Wallet) -> dict:
+        return self._serializer.serialize_one(
+            self._crud_service.create_and_return(self._validate_new(new_wallet))
+        )
+
+    def get_by_id(self, id: str | ObjectId) -> dict:
+        return self._serialize_found(self._crud_service.get_by_id(ObjectId(id)))
+
     def get_all(self, **kwargs) -> list[dict]:
         return self._serializer.serialize_many(
-            self._crud_service.get_all(**kwargs)
+            self._crud_service.get_all(projection=self._serializer.PROJECTION, **kwargs),
+            validate=False
         )
 
-    def update_by_id(self, id: str | ObjectId, update_data: dict) -> dict:
-        if not isinstance(id, str) and not isinstance(id, ObjectId):
-            raise TypeError
+    def get_page(self, limit: int, after: str | None = None, **kwargs) -> dict:
+        items = self._crud_service.get_page(
+            *page_args(self._page_sort, limit, after),
+            self._serializer.PROJECTION,
+            **kwargs
+        )
+        return build_page(items, limit, self._page_sort, self._serializer)
 
-        id: ObjectId
-        try:
-            id = ObjectId(id)
-        except:
-            raise
+    def update_by_id(self, id: str | ObjectId, update_data: dict) -> dict:
+        return self._serialize_found(
+            self._crud_service.find_one_and_update_by_id(self._validate_id(id), **update_data)
+        )
 
-        update_result = self._crud_service.update_by_id(
-            id,
-            **update_data
+    def delete_by_id(self, id: str | ObjectId) -> dict:
+        return self._serialize_found(
+            self._crud_service.find_one_and_delete_by_id(self._validate_id(id))
         )
 
-        if not update_result.raw_result['updatedExisting']:
-            return {}
 
+class AsyncWalletRepository(WalletRepository):
+    async def create(self, new_wallet: dict | Wallet) -> dict:
         return self._serializer.serialize_one(
-            self._crud_service.get_by_id(id)
+            await self._crud_service.create_and_return(self._validate_new(new_wallet))
         )
 
-    def delete_by_id(self, id: str | ObjectId) -> dict:
-        if not isinstance(id, str) and not isinstance(id, ObjectId):
-            raise TypeError
+    async def get_by_id(self, id: str | ObjectId) -> dict:
+        return self._serialize_found(await self._crud_service.get_by_id(ObjectId(id)))
 
-        id: ObjectId
-        try:
-            id = ObjectId(id)
-        except:
-            raise
-
-        deleted_wallet = self._crud_service.get_by_id(id)
-        if not deleted_wallet:
-            return {}
+    async def get_all(self, **kwargs) -> list[dict]:
+        return self._serializer.serialize_many(
+            await self._crud_service.get_all(projection=self._serializer.PROJECTION, **kwargs),
+            validate=False
+        )
 
-        self._crud_service.delete_by_id(deleted_wallet['_id'])
+    async def get_page(self, limit: int, after: str | None = None, **kwargs) -> dict:
+        items = await self._crud_service.get_page(
+            *page_args(self._page_sort, limit, after),
+            self._serializer.PROJECTION,
+            **kwargs
+        )
+        return build_page(items, limit, self._page_sort, self._serializer)
+
+    async def update_by_id(self, id: str | ObjectId, update_data: dict) -> dict:
+        return self._serialize_found(
+            await self._crud_service.find_one_and_update_by_id(
+                self._validate_id(id),
+                **update_data
+            )
+        )
 
-        return self._serializer.serialize_one(
-            deleted_wallet
+    async def delete_by_id(self, id: str | ObjectId) -> dict:
+        return self._serialize_found(
+            await self._crud_service.find_one_and_delete_by_id(self._validate_id(id))
         )
 
 
 def get_wallet_repository():  # pragma: no cover
-    connection = MongoClient()
-    crud_service = CRUDService(connection, 'wallets')
-    repository = WalletRepository(
+    connection = get_async_connection()
+    crud_service = AsyncCRUDService(connection, 'wallets')
+    repository = AsyncWalletRepository(
         crud_service,
         WalletSerializer
     )
     return repository
 
 
-def get_test_wallet_repository():  # pragma: no cover
-    connection = MongoClient()
-    crud_service = CRUDService(connection, 'test_api_wallets')
-    test_repository = WalletRepository(
+async def get_test_wallet_repository():  # pragma: no cover
+    connection = AsyncMongoClient()
+    crud_service = AsyncCRUDService(connection, 'test_api_wallets')
+    test_repository = AsyncWalletRepository(
         crud_service,
         WalletSerializer
     )
-    return test_repository
+    yield test_repository
+    await connection.close()
@@ -1,5 +1,36 @@
-from datetime import datetime
-from pydantic import BaseModel
+from datetime import date, datetime
+from pydantic import BaseModel, field_validator
+
+
+def parse_date(value: datetime | date | str) -> datetime:
+    """
+    Accept datetimes, dates, ISO 8601 strings and the legacy non zero padded YYYY-M-D form
+    """
+    if isinstance(value, datetime):
+        return value
+
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+
+    if not isinstance(value, str):
+        raise ValueError
+
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        year, month, day = value.split('-')
+        return datetime(int(year), int(month), int(day))
+
+
+def parse_asset(value: str) -> str:
+    """
+    Reject asset codes that are not usable as a MongoDB field name, e.g. USDC.E or $BTC,
+    portfolio snapshots key their assets by code
+    """
+    if not isinstance(value, str) or not value or '.' in value or '$' in value:
+        raise ValueError(f'invalid asset: {value}')
+
+    return value
 
 
 class Transaction(BaseModel):
@@ -9,5 +40,15 @@ class Transaction(BaseModel):
     historical_price: float
     currency: str
     tags: list[str]
-    date: str
+    date: datetime
     type: str
+
+    @field_validator('asset')
+    @classmethod
+    def validate_asset(cls, value: str) -> str:
+        return parse_asset(value)
+
+    @field_validator('date', mode='before')
+    @classmethod
+    def validate_date(cls, value: datetime | date | str) -> datetime:
+        return parse_date(value)
@@ -4,3 +4,7 @@ from pydantic import BaseModel
 class User(BaseModel):
     username: str
     hashed_password: str
+
+
+class RefreshToken(BaseModel):
+    refresh_token: str
@@ -1,27 +1,20 @@
 class TransactionSerializer:
-    @staticmethod
-    def serialize_one(transaction: dict) -> dict:
-        """
-        Serialize transaction data from MongoDB
-        Accept only: _id, owner_id, asset, amount, historical_price, currency, tags, date, type
-        """
-        valid_keys = {
-            '_id',
-            'owner_id',
-            'asset', 
-            'amount',
-            'historical_price',
-            'currency',
-            'tags',
-            'date',
-            'type'
-        }
-        if not isinstance(transaction, dict):
-            raise TypeError
-
-        if set(transaction.keys()) != valid_keys:
-            raise ValueError
+    VALID_KEYS = frozenset({
+        '_id',
+        'owner_id',
+        'asset',
+        'amount',
+        'historical_price',
+        'currency',
+        'tags',
+        'date',
+        'type'
+    })
+    # a read with this projection returns only valid keys, see serialize_many(validate=False)
+    PROJECTION = dict.fromkeys(VALID_KEYS, 1)
 
+    @staticmethod
+    def _serialize(transaction: dict) -> dict:
         return {
             'id': str(transaction['_id']),
             'owner_id': str(transaction['owner_id']),
@@ -35,11 +28,38 @@ class TransactionSerializer:
         }
 
     @staticmethod
-    def serialize_many(transactions: list[dict]) -> list[dict]:
+    def serialize_one(transaction: dict) -> dict:
+        """
+        Serialize transaction data from MongoDB
+        Accept only: _id, owner_id, asset, amount, historical_price, currency, tags, date, type
+        """
+        if not isinstance(transaction, dict):
+            raise TypeError
+
+        if transaction.keys() != TransactionSerializer.VALID_KEYS:
+            raise ValueError
+
+        return TransactionSerializer._serialize(transaction)
+
+    @staticmethod
+    def serialize_many(transactions: list[dict], validate: bool = True) -> list[dict]:
+        """
+        validate=False skips the key checks, only for documents read with PROJECTION
+        """
         if not isinstance(transactions, list):
             raise TypeError
 
-        return [
-            TransactionSerializer.serialize_one(transaction)
-            for transaction in transactions
-        ]
+        if validate:
+            valid_keys = TransactionSerializer.VALID_KEYS
+            for transaction in transactions:
+                if not isinstance(transaction, dict):
+                    raise TypeError
+                if transaction.keys() != valid_keys:
+                    raise ValueError
+
+        serialize = TransactionSerializer._serialize
+        try:
+            return [serialize(transaction) for transaction in transactions]
+        except KeyError:
+            # a projected document missing a field
+            raise ValueError
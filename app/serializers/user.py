@@ -1,16 +1,16 @@
 class UserSerializer:
+    VALID_KEYS = frozenset({'_id', 'username', 'hashed_password'})
+
     @staticmethod
     def serialize_one(user: dict) -> dict:
         """
         Serialize user data from MongoDb
         Accept only: _id, username, hashed_password
         """
-        valid_keys = {'_id', 'username', 'hashed_password'}
-
         if not isinstance(user, dict):
             raise TypeError
 
-        if set(user.keys()) != valid_keys:
+        if user.keys() != UserSerializer.VALID_KEYS:
             raise ValueError
 
         return {
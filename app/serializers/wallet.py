@@ -1,30 +1,50 @@
 class WalletSerializer:
+    VALID_KEYS = frozenset({'_id', 'owner_id', 'address', 'chain'})
+    # a read with this projection returns only valid keys, see serialize_many(validate=False)
+    PROJECTION = dict.fromkeys(VALID_KEYS, 1)
+
+    @staticmethod
+    def _serialize(wallet: dict) -> dict:
+        return {
+            'id': str(wallet['_id']),
+            'owner_id': str(wallet['owner_id']),
+            'address': wallet['address'],
+            'chain': wallet['chain']
+        }
+
     @staticmethod
     def serialize_one(wallet: dict) -> dict:
         """
         Serialize transaction data from MongoDB
         Accept only: _id, owner_id, address, chain
         """
-        valid_keys = {'_id', 'owner_id', 'address', 'chain'}
         if not isinstance(wallet, dict):
             raise TypeError
 
-        if set(wallet.keys()) != valid_keys:
+        if wallet.keys() != WalletSerializer.VALID_KEYS:
             raise ValueError
 
-        return {
-            'id': str(wallet['_id']),
-            'owner_id': str(wallet['owner_id']),
-            'address': wallet['address'],
-            'chain': wallet['chain']
-        }
+        return WalletSerializer._serialize(wallet)
 
     @staticmethod
-    def serialize_many(wallets: list[dict]) -> list[dict]:
+    def serialize_many(wallets: list[dict], validate: bool = True) -> list[dict]:
+        """
+        validate=False skips the key checks, only for documents read with PROJECTION
+        """
         if not isinstance(wallets, list):
             raise TypeError
 
-        return [
-            WalletSerializer.serialize_one(wallet)
-            for wallet in wallets
-        ]
+        if validate:
+            valid_keys = WalletSerializer.VALID_KEYS
+            for wallet in wallets:
+                if not isinstance(wallet, dict):
+                    raise TypeError
+                if wallet.keys() != valid_keys:
+                    raise ValueError
+
+        serialize = WalletSerializer._serialize
+        try:
+            return [serialize(wallet) for wallet in wallets]
+        except KeyError:
+            # a projected document missing a field
+            raise ValueError
@@ -0,0 +1,62 @@
+import os
+
+
+MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017')
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 60000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 5000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 10000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(
+    os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)
+)
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 500))
+MAX_HISTORY_POINTS = int(os.environ.get('MAX_HISTORY_POINTS', 5000))
+MAX_PRICE_HISTORY_DAYS = int(os.environ.get('MAX_PRICE_HISTORY_DAYS', 366))
+
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 64 * 1024))
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+IMPORT_MAX_RECORD_SIZE = int(os.environ.get('IMPORT_MAX_RECORD_SIZE', 64 * 1024))
+IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', 100))
+
+PRICE_API_URL = os.environ.get('PRICE_API_URL', 'https://api.nomics.com/v1/currencies/ticker')
+PRICE_API_KEY = os.environ.get('PRICE_API_KEY', 'ca109ae5159d18fc47942615b0f5018a29869a17')
+PRICE_API_MAX_CONNECTIONS = int(os.environ.get('PRICE_API_MAX_CONNECTIONS', 20))
+PRICE_API_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get('PRICE_API_MAX_KEEPALIVE_CONNECTIONS', 10)
+)
+PRICE_API_KEEPALIVE_EXPIRY = float(os.environ.get('PRICE_API_KEEPALIVE_EXPIRY', 30))
+PRICE_API_CONNECT_TIMEOUT = float(os.environ.get('PRICE_API_CONNECT_TIMEOUT', 2))
+PRICE_API_TIMEOUT = float(os.environ.get('PRICE_API_TIMEOUT', 5))
+PRICE_API_COALESCE_WINDOW = float(os.environ.get('PRICE_API_COALESCE_WINDOW', 0.005))
+PRICE_API_CHUNK_SIZE = int(os.environ.get('PRICE_API_CHUNK_SIZE', 50))
+PRICE_API_MAX_CONCURRENCY = int(os.environ.get('PRICE_API_MAX_CONCURRENCY', 4))
+PRICE_LOOKUP_TIMEOUT = float(os.environ.get('PRICE_LOOKUP_TIMEOUT', 1))
+PRICE_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('PRICE_BREAKER_FAILURE_THRESHOLD', 5))
+PRICE_BREAKER_SLOW_CALL_THRESHOLD = float(os.environ.get('PRICE_BREAKER_SLOW_CALL_THRESHOLD', 2))
+PRICE_BREAKER_RESET_TIMEOUT = float(os.environ.get('PRICE_BREAKER_RESET_TIMEOUT', 30))
+
+PRICE_CACHE_TTL = float(os.environ.get('PRICE_CACHE_TTL', 60))
+PRICE_CACHE_STALE_TTL = float(os.environ.get('PRICE_CACHE_STALE_TTL', 600))
+PRICE_CACHE_MAX_SIZE = int(os.environ.get('PRICE_CACHE_MAX_SIZE', 1000))
+
+PRICE_REFRESH_INTERVAL = float(os.environ.get('PRICE_REFRESH_INTERVAL', 30))
+
+PRICE_BUCKET_SECONDS = int(os.environ.get('PRICE_BUCKET_SECONDS', 24 * 60 * 60))
+
+JWT_SECRET = os.environ.get('JWT_SECRET', 'SECRETKEY')
+TOKEN_CACHE_MAX_SIZE = int(os.environ.get('TOKEN_CACHE_MAX_SIZE', 10000))
+ACCESS_TOKEN_TTL = int(os.environ.get('ACCESS_TOKEN_TTL', 15 * 60))
+REFRESH_TOKEN_TTL = int(os.environ.get('REFRESH_TOKEN_TTL', 7 * 24 * 60 * 60))
+
+REVOCATION_CAPACITY = int(os.environ.get('REVOCATION_CAPACITY', 100000))
+REVOCATION_ERROR_RATE = float(os.environ.get('REVOCATION_ERROR_RATE', 0.001))
+REVOCATION_REFRESH_INTERVAL = float(os.environ.get('REVOCATION_REFRESH_INTERVAL', 30))
+
+PASSWORD_HASH_COST = int(os.environ.get('PASSWORD_HASH_COST', 2 ** 14))
+PASSWORD_HASH_BLOCK_SIZE = int(os.environ.get('PASSWORD_HASH_BLOCK_SIZE', 8))
+PASSWORD_HASH_PARALLELISM = int(os.environ.get('PASSWORD_HASH_PARALLELISM', 1))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
@@ -0,0 +1,30 @@
+import unittest
+
+from app.auth.bloom import BloomFilter
+
+
+class BloomFilterTest(unittest.TestCase):
+    def test_addedItems_alwaysContained(self) -> None:
+        bloom = BloomFilter(1000, 0.01)
+        items = [f'token{index}' for index in range(1000)]
+        for item in items:
+            bloom.add(item)
+
+        self.assertTrue(all(item in bloom for item in items))
+        self.assertEqual(bloom.count, 1000)
+
+    def test_otherItems_falsePositiveRateNearErrorRate(self) -> None:
+        bloom = BloomFilter(1000, 0.01)
+        for index in range(1000):
+            bloom.add(f'token{index}')
+
+        false_positives = sum(f'other{index}' in bloom for index in range(10000))
+
+        self.assertLess(false_positives, 300)
+
+    def test_emptyFilter_containNothing(self) -> None:
+        self.assertNotIn('token', BloomFilter(0, 0.01))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+
+from app.auth.cache import TokenCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TokenCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._clock = FakeClock()
+        self._cache = TokenCache(max_size=2, clock=self._clock)
+
+    def test_getMissingKey_returnNone(self) -> None:
+        self.assertIsNone(self._cache.get(b'token'))
+
+    def test_getBeforeExpiry_returnUser(self) -> None:
+        self._cache.set(b'token', {'id': 'userid'}, expires_at=10)
+        self._clock.now = 9
+
+        self.assertEqual(self._cache.get(b'token'), {'id': 'userid'})
+
+    def test_getAtExpiry_dropEntry(self) -> None:
+        self._cache.set(b'token', {'id': 'userid'}, expires_at=10)
+        self._clock.now = 10
+
+        self.assertIsNone(self._cache.get(b'token'))
+        self.assertEqual(len(self._cache), 0)
+
+    def test_getWithoutExpiry_returnUser(self) -> None:
+        self._cache.set(b'token', {'id': 'userid'})
+        self._clock.now = 10 ** 9
+
+        self.assertEqual(self._cache.get(b'token'), {'id': 'userid'})
+
+    def test_setOverMaxSize_evictLeastRecentlyUsed(self) -> None:
+        self._cache.set(b'first', {'id': 'first'})
+        self._cache.set(b'second', {'id': 'second'})
+        self._cache.get(b'first')
+        self._cache.set(b'third', {'id': 'third'})
+
+        self.assertEqual(len(self._cache), 2)
+        self.assertIsNone(self._cache.get(b'second'))
+        self.assertEqual(self._cache.get(b'first'), {'id': 'first'})
+
+
+if __name__ == '__main__':
+    unittest.main()
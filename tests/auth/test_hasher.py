@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import threading
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from app.auth.hasher import AsyncPasswordHasher, PasswordHasher, ScryptHasher
+
+
+TEST_PASSWORD = 'supersecrethashedpassword'
+
+
+def fast_scrypt(n: int = 2 ** 4) -> ScryptHasher:
+    return ScryptHasher(n=n, r=1, p=1)
+
+
+class ScryptHasherTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._hasher = fast_scrypt()
+
+    def test_hash_saltEveryHash(self) -> None:
+        first, second = self._hasher.hash(TEST_PASSWORD), self._hasher.hash(TEST_PASSWORD)
+
+        self.assertTrue(first.startswith('$scrypt$n=16,r=1,p=1$'))
+        self.assertNotEqual(first, second)
+
+    def test_verify(self) -> None:
+        encoded = self._hasher.hash(TEST_PASSWORD)
+
+        self.assertTrue(self._hasher.verify(TEST_PASSWORD, encoded))
+        self.assertFalse(self._hasher.verify('thisisnotmypassword', encoded))
+        self.assertFalse(self._hasher.verify(TEST_PASSWORD, '$scrypt$malformed'))
+
+    def test_needsRehash_onlyForOtherCost(self) -> None:
+        self.assertFalse(self._hasher.needs_rehash(self._hasher.hash(TEST_PASSWORD)))
+        self.assertTrue(self._hasher.needs_rehash(fast_scrypt(2 ** 5).hash(TEST_PASSWORD)))
+
+
+class PasswordHasherTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._password_hasher = PasswordHasher(fast_scrypt())
+
+    def test_verifyCurrentHash_returnNoUpdate(self) -> None:
+        encoded = self._password_hasher.hash(TEST_PASSWORD)
+
+        self.assertEqual(
+            self._password_hasher.verify_and_update(TEST_PASSWORD, encoded),
+            (True, None)
+        )
+        self.assertEqual(
+            self._password_hasher.verify_and_update('thisisnotmypassword', encoded),
+            (False, None)
+        )
+
+    def test_verifyLegacyHash_returnRehash(self) -> None:
+        legacy = hashlib.blake2b(TEST_PASSWORD.encode()).hexdigest()
+
+        authenticated, new_hash = self._password_hasher.verify_and_update(TEST_PASSWORD, legacy)
+
+        self.assertTrue(authenticated)
+        self.assertTrue(new_hash.startswith('$scrypt$'))
+        self.assertEqual(
+            self._password_hasher.verify_and_update('thisisnotmypassword', legacy),
+            (False, None)
+        )
+
+    def test_verifyUnknown_spendOneVerification(self) -> None:
+        verified = []
+
+        class RecordingScryptHasher(ScryptHasher):
+            def verify(self, password: str, encoded: str) -> bool:
+                verified.append(encoded)
+                return super().verify(password, encoded)
+
+        password_hasher = PasswordHasher(RecordingScryptHasher(n=2 ** 4, r=1, p=1))
+
+        self.assertFalse(password_hasher.verify_unknown(TEST_PASSWORD))
+        self.assertFalse(password_hasher.verify_unknown(''))
+        self.assertEqual(len(verified), 2)
+        self.assertEqual(verified[0], verified[1])
+        self.assertTrue(verified[0].startswith('$scrypt$n=16,r=1,p=1$'))
+
+    def test_verifyOutdatedCost_returnRehash(self) -> None:
+        encoded = PasswordHasher(fast_scrypt(2 ** 5)).hash(TEST_PASSWORD)
+
+        authenticated, new_hash = self._password_hasher.verify_and_update(TEST_PASSWORD, encoded)
+
+        self.assertTrue(authenticated)
+        self.assertTrue(new_hash.startswith('$scrypt$n=16,'))
+
+
+class AsyncPasswordHasherTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='test-hash')
+        self._password_hasher = AsyncPasswordHasher(fast_scrypt(), executor=self._executor)
+
+    async def asyncTearDown(self) -> None:
+        self._executor.shutdown()
+
+    async def test_hashAndVerify_runInPool(self) -> None:
+        threads = set()
+
+        class RecordingScryptHasher(ScryptHasher):
+            def hash(self, password: str) -> str:
+                threads.add(threading.current_thread().name)
+                return super().hash(password)
+
+        password_hasher = AsyncPasswordHasher(
+            RecordingScryptHasher(n=2 ** 4, r=1, p=1),
+            executor=self._executor
+        )
+        encoded_passwords = await asyncio.gather(
+            *(password_hasher.hash(TEST_PASSWORD) for _ in range(4))
+        )
+
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith('test-hash') for name in threads))
+        self.assertEqual(
+            await self._password_hasher.verify_and_update(TEST_PASSWORD, encoded_passwords[0]),
+            (True, None)
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+
+from app.auth.revocation import RevocationList
+
+from tests.auth.test_cache import FakeClock
+
+
+class InMemoryRevokedTokenRepository:
+    def __init__(self) -> None:
+        self.tokens = {}
+        self.claims = set()
+        self.lookups = 0
+
+    async def revoke(self, jti: str, expires_at: float) -> None:
+        self.tokens[jti] = expires_at
+
+    async def claim(self, jti: str, expires_at: float) -> bool:
+        if jti in self.tokens:
+            return False
+
+        self.tokens[jti] = expires_at
+        self.claims.add(jti)
+        return True
+
+    async def is_revoked(self, jti: str) -> bool:
+        self.lookups += 1
+        return jti in self.tokens
+
+    async def get_active(self, now: float) -> list[str]:
+        return [
+            jti for jti, expires_at in self.tokens.items()
+            if expires_at > now and jti not in self.claims
+        ]
+
+
+class FailingRevokedTokenRepository(InMemoryRevokedTokenRepository):
+    async def get_active(self, now: float) -> list[str]:
+        raise ConnectionError('database is down')
+
+
+class RevocationListTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self._clock = FakeClock()
+        self._repository = InMemoryRevokedTokenRepository()
+        self._revocation = self._create_revocation_list(self._repository)
+        await self._revocation.rebuild()
+
+    def _create_revocation_list(self, repository) -> RevocationList:
+        return RevocationList(
+            lambda: repository,
+            capacity=100,
+            error_rate=0.001,
+            interval=0,
+            clock=self._clock
+        )
+
+    async def test_notRevokedToken_skipDatabase(self) -> None:
+        await self._revocation.revoke('revoked', 10)
+
+        self.assertFalse(await self._revocation.is_revoked('other'))
+        self.assertEqual(self._repository.lookups, 0)
+
+    async def test_revokedToken_confirmInDatabase(self) -> None:
+        await self._revocation.revoke('revoked', 10)
+
+        self.assertTrue(await self._revocation.is_revoked('revoked'))
+        self.assertEqual(self._repository.lookups, 1)
+
+    async def test_rebuild_loadRevokedTokensOfOtherProcesses(self) -> None:
+        await self._repository.revoke('elsewhere', 10)
+        self.assertFalse(await self._revocation.is_revoked('elsewhere'))
+
+        self.assertEqual(await self._revocation.rebuild(), 1)
+        self.assertTrue(await self._revocation.is_revoked('elsewhere'))
+
+    async def test_rebuild_dropExpiredTokens(self) -> None:
+        await self._revocation.revoke('revoked', 10)
+        await self._revocation.rebuild()
+        self._clock.now = 10
+
+        self.assertEqual(await self._revocation.rebuild(), 0)
+        self.assertFalse(await self._revocation.is_revoked('revoked'))
+        self.assertEqual(self._repository.lookups, 0)
+
+    async def test_beforeFirstRebuild_confirmEveryTokenInDatabase(self) -> None:
+        repository = FailingRevokedTokenRepository()
+        await repository.revoke('revoked', 10)
+        revocation = self._create_revocation_list(repository)
+
+        with self.assertRaises(ConnectionError):
+            await revocation.rebuild()
+
+        self.assertTrue(await revocation.is_revoked('revoked'))
+        self.assertFalse(await revocation.is_revoked('other'))
+        self.assertEqual(repository.lookups, 2)
+
+    async def test_claim_rejectTokenUsedByOtherProcess(self) -> None:
+        other_process = self._create_revocation_list(self._repository)
+
+        self.assertTrue(await other_process.claim('refresh', 10))
+        self.assertFalse(await self._revocation.claim('refresh', 10))
+        self.assertEqual(self._repository.lookups, 0)
+
+    async def test_rebuild_leaveOutClaimedTokens(self) -> None:
+        await self._revocation.claim('refresh', 10)
+        await self._revocation.revoke('revoked', 10)
+
+        self.assertEqual(await self._revocation.rebuild(), 1)
+        self.assertFalse(await self._revocation.is_revoked('refresh'))
+        self.assertEqual(self._repository.lookups, 0)
+
+    async def test_claimRevokedToken_returnFalse(self) -> None:
+        await self._revocation.revoke('refresh', 10)
+
+        self.assertFalse(await self._revocation.claim('refresh', 10))
+
+    async def test_startWithoutInterval_doNothing(self) -> None:
+        revocation = self._create_revocation_list(self._repository)
+        revocation.start()
+        await revocation.stop()
+
+        self.assertIsNone(revocation.last_rebuild_at)
+
+
+if __name__ == '__main__':
+    unittest.main()
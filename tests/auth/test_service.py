@@ -0,0 +1,143 @@
+import asyncio
+import time
+import unittest
+
+from unittest import mock
+
+import jwt
+
+from app.auth.cache import TokenCache
+from app.auth.revocation import RevocationList
+from app.auth.service import TokenVerifier, decode_token, encode_token
+
+from tests.auth.test_cache import FakeClock
+from tests.auth.test_revocation import InMemoryRevokedTokenRepository
+
+
+TEST_JWT_SECRET = 'testjwtsecret'
+TEST_USER = {'id': 'userid', 'username': 'testuser'}
+
+
+def encode(payload: dict) -> str:
+    return jwt.encode(payload, TEST_JWT_SECRET, algorithm='HS256')
+
+
+class EncodeTokenTest(unittest.TestCase):
+    def test_encodeToken_setExpiryAndUniqueId(self) -> None:
+        first = jwt.decode(
+            encode_token(TEST_USER, 'access', TEST_JWT_SECRET),
+            TEST_JWT_SECRET,
+            algorithms=['HS256']
+        )
+        second = jwt.decode(
+            encode_token(TEST_USER, 'refresh', TEST_JWT_SECRET),
+            TEST_JWT_SECRET,
+            algorithms=['HS256']
+        )
+
+        self.assertEqual(first['type'], 'access')
+        self.assertEqual(second['type'], 'refresh')
+        self.assertGreater(first['exp'], first['iat'])
+        self.assertGreater(second['exp'], first['exp'])
+        self.assertNotEqual(first['jti'], second['jti'])
+
+
+class DecodeTokenTest(unittest.TestCase):
+    def test_getValidToken_returnPayload(self) -> None:
+        payload = decode_token(encode_token(TEST_USER, 'access', TEST_JWT_SECRET), TEST_JWT_SECRET)
+
+        self.assertEqual(payload['id'], 'userid')
+        self.assertEqual(payload['username'], 'testuser')
+
+    def test_getInvalidToken_returnNone(self) -> None:
+        self.assertIsNone(decode_token('itisaninvalidjwttoken', TEST_JWT_SECRET))
+        self.assertIsNone(decode_token(encode_token(TEST_USER, 'access'), TEST_JWT_SECRET))
+        self.assertIsNone(decode_token(encode({'foo': 'bar'}), TEST_JWT_SECRET))
+
+    def test_getTokenWithoutExpiry_returnNone(self) -> None:
+        self.assertIsNone(decode_token(encode(TEST_USER), TEST_JWT_SECRET))
+
+    def test_getExpiredToken_returnNone(self) -> None:
+        token = encode_token(TEST_USER, 'access', TEST_JWT_SECRET, now=time.time() - 24 * 60 * 60)
+
+        self.assertIsNone(decode_token(token, TEST_JWT_SECRET))
+
+    def test_getOtherTokenType_returnNone(self) -> None:
+        token = encode_token(TEST_USER, 'refresh', TEST_JWT_SECRET)
+
+        self.assertIsNone(decode_token(token, TEST_JWT_SECRET))
+        self.assertIsNotNone(decode_token(token, TEST_JWT_SECRET, 'refresh'))
+
+
+class TokenVerifierTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self._clock = FakeClock()
+        self._clock.now = time.time()
+        self._repository = InMemoryRevokedTokenRepository()
+        self._verifier = await self._create_verifier()
+        self._token = encode_token(TEST_USER, 'access', TEST_JWT_SECRET)
+
+    async def _create_verifier(self) -> TokenVerifier:
+        revocation = RevocationList(lambda: self._repository, interval=0, clock=self._clock)
+        await revocation.rebuild()
+        return TokenVerifier(TEST_JWT_SECRET, TokenCache(clock=self._clock), revocation)
+
+    async def _refresh(self, verifier: TokenVerifier, refresh_token: str) -> bool:
+        user = await verifier.verify(refresh_token, token_type='refresh')
+        return user['authorized'] and await verifier.claim(user)
+
+    async def test_verifyValidToken_returnUser(self) -> None:
+        user = await self._verifier.verify(self._token)
+
+        self.assertTrue(user['authorized'])
+        self.assertEqual(user['id'], 'userid')
+        self.assertEqual(user['username'], 'testuser')
+
+    async def test_verifyInvalidToken_returnUnauthorized(self) -> None:
+        self.assertEqual(
+            await self._verifier.verify('itisaninvalidjwttoken'),
+            {'authorized': False, 'id': '', 'username': ''}
+        )
+
+    async def test_verifyRepeatedToken_decodeOnce(self) -> None:
+        with mock.patch('app.auth.service.jwt.decode', wraps=jwt.decode) as decode:
+            first = await self._verifier.verify(self._token)
+            second = await self._verifier.verify(self._token)
+
+        self.assertEqual(first, second)
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(self._repository.lookups, 0)
+
+    async def test_verifyCachedTokenAfterExp_decodeAgain(self) -> None:
+        user = await self._verifier.verify(self._token)
+        self._clock.now = user['exp']
+
+        with mock.patch('app.auth.service.jwt.decode', wraps=jwt.decode) as decode:
+            await self._verifier.verify(self._token)
+
+        self.assertEqual(decode.call_count, 1)
+
+    async def test_verifyRevokedCachedToken_returnUnauthorized(self) -> None:
+        user = await self._verifier.verify(self._token)
+        await self._verifier.revoke(user)
+
+        self.assertFalse((await self._verifier.verify(self._token))['authorized'])
+
+    async def test_concurrentRefresh_claimOnce(self) -> None:
+        refresh_token = encode_token(TEST_USER, 'refresh', TEST_JWT_SECRET)
+
+        refreshed = await asyncio.gather(
+            *(self._refresh(self._verifier, refresh_token) for _ in range(5))
+        )
+
+        self.assertEqual(refreshed.count(True), 1)
+
+    async def test_refreshInOtherProcess_rejectReplay(self) -> None:
+        refresh_token = encode_token(TEST_USER, 'refresh', TEST_JWT_SECRET)
+
+        self.assertTrue(await self._refresh(await self._create_verifier(), refresh_token))
+        self.assertFalse(await self._refresh(self._verifier, refresh_token))
+
+
+if __name__ == '__main__':
+    unittest.main()
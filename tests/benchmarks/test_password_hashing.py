@@ -0,0 +1,31 @@
+import unittest
+
+from app.auth.hasher import PasswordHasher, ScryptHasher
+
+from tests.benchmarks.utils import benchmark, measure
+
+
+TEST_PASSWORD = 'supersecrethashedpassword'
+COSTS = [2 ** 12, 2 ** 13, 2 ** 14, 2 ** 15]
+LOGINS = 20
+
+
+@benchmark
+class PasswordHashingBenchmark(unittest.TestCase):
+    def test_verify_loginsPerSecondPerCore(self) -> None:
+        # one thread is one core, the pool runs PASSWORD_HASH_WORKERS of these side by side
+        print()
+        for cost in COSTS:
+            password_hasher = PasswordHasher(ScryptHasher(n=cost))
+            encoded = password_hasher.hash(TEST_PASSWORD)
+
+            def logins():
+                for _ in range(LOGINS):
+                    password_hasher.verify_and_update(TEST_PASSWORD, encoded)
+
+            elapsed = measure(logins)
+            print(
+                f'n={cost} ({128 * cost * 8 / 2 ** 20:.0f} MiB): '
+                f'{LOGINS / elapsed:.1f} logins/sec per core, {elapsed / LOGINS * 1000:.1f} ms each'
+            )
+            self.assertTrue(password_hasher.verify_and_update(TEST_PASSWORD, encoded)[0])
@@ -0,0 +1,80 @@
+import datetime
+import random
+import tracemalloc
+import unittest
+
+from bson import ObjectId
+
+from app.costbasis.batch import TransactionBatch
+from app.costbasis.service import calculate_cost_basis
+
+from tests.benchmarks.utils import benchmark, measure
+
+
+ASSET_COUNT = 50
+TRANSACTION_COUNT = 200_000
+START = datetime.datetime(2017, 1, 1)
+
+
+def allocated(build) -> tuple[object, int]:
+    tracemalloc.start()
+    try:
+        result = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+@benchmark
+class PortfolioBatchBenchmark(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._randomizer = random.Random(42)
+        self._assets = [f'COIN{index}' for index in range(ASSET_COUNT)]
+        self._owner_id = str(ObjectId())
+
+    def _transactions(self) -> list[dict]:
+        # serialized transactions, the way TransactionRepository.get_all returns them
+        return [
+            {
+                'id': str(ObjectId()),
+                'owner_id': self._owner_id,
+                'asset': self._randomizer.choice(self._assets),
+                'amount': self._randomizer.uniform(0.001, 10),
+                'historical_price': self._randomizer.uniform(0.1, 60000),
+                'currency': 'usd',
+                'tags': [],
+                'date': START + datetime.timedelta(minutes=self._randomizer.randrange(10 ** 6)),
+                'type': self._randomizer.choice(['buy', 'buy', 'sell'])
+            }
+            for _ in range(TRANSACTION_COUNT)
+        ]
+
+    def test_portfolio_memoryAndTime(self) -> None:
+        transactions, dicts_size = allocated(self._transactions)
+        batch, batch_size = allocated(lambda: TransactionBatch.from_documents(transactions))
+
+        def per_transaction_loop():
+            portfolio = {}
+            for transaction in transactions:
+                meta = portfolio.setdefault(transaction['asset'].upper(), [0, 0])
+                if transaction['type'] == 'buy':
+                    meta[0] += transaction['amount']
+                    meta[1] += transaction['amount'] * transaction['historical_price']
+                else:
+                    meta[0] -= transaction['amount']
+            return portfolio
+
+        loop_time = measure(per_transaction_loop)
+        batch_time = measure(batch.portfolio)
+        cost_basis_time = measure(calculate_cost_basis, batch, 'fifo', repeat=1)
+
+        print(
+            f'\n{TRANSACTION_COUNT} transactions: dicts {dicts_size / 2 ** 20:.1f} MiB, '
+            f'batch {batch_size / 2 ** 20:.1f} MiB; '
+            f'dict loop {loop_time * 1000:.1f} ms, vectorized {batch_time * 1000:.1f} ms, '
+            f'fifo cost basis {cost_basis_time * 1000:.1f} ms'
+        )
+        self.assertLess(batch_size * 10, dicts_size)
+        self.assertEqual(len(batch.portfolio()['assets']), ASSET_COUNT)
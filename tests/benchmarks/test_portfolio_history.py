@@ -0,0 +1,71 @@
+import datetime
+import random
+import unittest
+
+from app.history.service import build_price_series, build_timeline, compute_history
+
+from tests.benchmarks.utils import benchmark, measure
+
+
+ASSET_COUNT = 50
+TRANSACTION_COUNT = 10_000
+START = datetime.datetime(2017, 1, 1)
+END = START + datetime.timedelta(days=5 * 365)
+
+
+@benchmark
+class PortfolioHistoryBenchmark(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        randomizer = random.Random(42)
+        assets = [f'COIN{index}' for index in range(ASSET_COUNT)]
+        self._transactions = [
+            {
+                'asset': randomizer.choice(assets),
+                'amount': randomizer.uniform(0.001, 10),
+                'type': randomizer.choice(['buy', 'buy', 'sell']),
+                'date': START + datetime.timedelta(minutes=randomizer.randrange(5 * 365 * 24 * 60))
+            }
+            for _ in range(TRANSACTION_COUNT)
+        ]
+        start_ms = int(START.replace(tzinfo=datetime.timezone.utc).timestamp() * 1000)
+        # columnar, the way PriceRepository.get_range_series returns prices
+        self._range_series = {
+            asset: {
+                'timestamps': [start_ms + day * 24 * 60 * 60 * 1000 for day in range(5 * 365)],
+                'prices': [randomizer.uniform(0.1, 60000) for _ in range(5 * 365)]
+            }
+            for asset in assets
+        }
+        self._timeline = build_timeline(START, END, 'day')
+
+    def test_computeHistory_fiveYearsDailyFiftyAssets(self) -> None:
+        def per_day_loop():
+            totals = []
+            for point in self._timeline.astype(datetime.datetime).tolist():
+                holdings = {}
+                for transaction in self._transactions:
+                    if transaction['date'] <= point:
+                        sign = 1 if transaction['type'] == 'buy' else -1
+                        holdings[transaction['asset']] = \
+                            holdings.get(transaction['asset'], 0) + sign * transaction['amount']
+                totals.append(holdings)
+            return totals
+
+        def vectorized():
+            return compute_history(
+                self._transactions,
+                build_price_series(self._range_series),
+                self._timeline
+            )
+
+        vectorized_time = measure(vectorized)
+        loop_time = measure(per_day_loop, repeat=1)
+
+        print(
+            f'\n{len(self._timeline)} daily points, {ASSET_COUNT} assets, '
+            f'{TRANSACTION_COUNT} transactions: vectorized {vectorized_time * 1000:.1f} ms, '
+            f'per-day loop (holdings only) {loop_time * 1000:.1f} ms'
+        )
+        history = vectorized()
+        self.assertEqual(len(history['total']), len(self._timeline))
@@ -0,0 +1,96 @@
+import unittest
+
+from copy import deepcopy
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.api.v1.user import get_current_user
+from app.main import portfolio_service
+from app.nomicsapi.service import CLIENT_OPTIONS, NomicsAPIHandler, get_api_handler
+from app.repositories.transaction import \
+    get_transaction_repository, \
+    get_test_transaction_repository
+
+from tests.benchmarks.utils import benchmark, percentile, sample
+from tests.consts import TEST_VALID_TRANSACTIONS
+from tests.nomicsapi.server import PriceServer
+from tests.repositories.settings import TEST_TRANSACTION_CONN
+
+
+TEST_OWNER_ID = 'e5e403a76c58de3a4c2b5f16'
+TEST_COLLECTION = 'test_api_transactions'
+REQUEST_COUNT = 300
+
+
+class PerRequestClientHandler(NomicsAPIHandler):
+    """
+    The handler before pooling, opening a new client for every lookup
+    """
+    async def get_asset_data(self, *ids: str) -> dict:
+        async with httpx.AsyncClient(**self._client_options) as client:
+            res = await client.get(
+                self._base_url,
+                params={'key': self._api_key, 'ids': ','.join(ids)}
+            )
+
+        return {
+            asset_data['id']: {'price': asset_data['price'], 'logo_url': asset_data['logo_url']}
+            for asset_data in res.json()
+        }
+
+
+@benchmark
+class PortfolioLatencyBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._server = PriceServer().start()
+        TEST_TRANSACTION_CONN.local[TEST_COLLECTION].insert_many(deepcopy(TEST_VALID_TRANSACTIONS))
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        TEST_TRANSACTION_CONN.local[TEST_COLLECTION].drop()
+        cls._server.stop()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self._overrides = dict(portfolio_service.dependency_overrides)
+        portfolio_service.dependency_overrides[get_current_user] = lambda: {'id': TEST_OWNER_ID}
+        portfolio_service.dependency_overrides[get_transaction_repository] = \
+            get_test_transaction_repository
+
+    def tearDown(self) -> None:
+        portfolio_service.dependency_overrides = self._overrides
+        super().tearDown()
+
+    def _sample_portfolio(self, api_handler: NomicsAPIHandler) -> list[float]:
+        portfolio_service.dependency_overrides[get_api_handler] = lambda: api_handler
+        # a single TestClient session keeps one event loop, like a running server
+        with TestClient(portfolio_service) as client:
+            def get_portfolio():
+                response = client.get('/api/v1/transactions/portfolio')
+                self.assertEqual(response.status_code, 200)
+
+            timings = sample(get_portfolio, count=REQUEST_COUNT)
+            client.portal.call(api_handler.close)
+
+        return timings
+
+    def test_portfolio_comparePerRequestAndPooledClient(self) -> None:
+        per_request_handler = PerRequestClientHandler(self._server.url, 'test-key', **CLIENT_OPTIONS)
+        pooled_handler = NomicsAPIHandler(self._server.url, 'test-key', **CLIENT_OPTIONS)
+
+        per_request_timings = self._sample_portfolio(per_request_handler)
+        connections = self._server.connections
+        pooled_timings = self._sample_portfolio(pooled_handler)
+
+        print(
+            f'\n{REQUEST_COUNT} portfolio requests: '
+            f'client per request p50 {percentile(per_request_timings, 50) * 1000:.2f} ms '
+            f'p99 {percentile(per_request_timings, 99) * 1000:.2f} ms, '
+            f'pooled client p50 {percentile(pooled_timings, 50) * 1000:.2f} ms '
+            f'p99 {percentile(pooled_timings, 99) * 1000:.2f} ms'
+        )
+        self.assertLess(self._server.connections - connections, REQUEST_COUNT)
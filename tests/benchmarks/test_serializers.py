@@ -0,0 +1,87 @@
+import datetime
+import unittest
+
+from bson import ObjectId
+
+from app.serializers.transaction import TransactionSerializer
+
+from tests.benchmarks.utils import benchmark, measure
+
+
+TRANSACTION_COUNT = 1_000_000
+# serialize one chunk repeatedly, a million distinct documents would need about 1 GiB
+CHUNK_SIZE = 100_000
+
+
+def serialize_many_per_call_sets(transactions: list[dict]) -> list[dict]:
+    """
+    The serializer before the key sets were hoisted, a set literal and a key set per document
+    """
+    serialized_transactions = []
+    for transaction in transactions:
+        valid_keys = {
+            '_id', 'owner_id', 'asset', 'amount', 'historical_price',
+            'currency', 'tags', 'date', 'type'
+        }
+        if not isinstance(transaction, dict):
+            raise TypeError
+        if set(transaction.keys()) != valid_keys:
+            raise ValueError
+        serialized_transactions.append({
+            'id': str(transaction['_id']),
+            'owner_id': str(transaction['owner_id']),
+            'asset': transaction['asset'],
+            'amount': transaction['amount'],
+            'historical_price': transaction['historical_price'],
+            'currency': transaction['currency'],
+            'tags': transaction['tags'],
+            'date': transaction['date'],
+            'type': transaction['type']
+        })
+    return serialized_transactions
+
+
+@benchmark
+class SerializerBenchmark(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        owner_id = ObjectId()
+        date = datetime.datetime(2022, 2, 4)
+        self._transactions = [
+            {
+                '_id': ObjectId(),
+                'owner_id': owner_id,
+                'asset': 'BTC',
+                'amount': 0.314,
+                'historical_price': 11680.0,
+                'currency': 'USD',
+                'tags': [],
+                'date': date,
+                'type': 'buy'
+            }
+            for _ in range(CHUNK_SIZE)
+        ]
+
+    def _docs_per_second(self, serialize_many) -> float:
+        def serialize_all():
+            for _ in range(TRANSACTION_COUNT // CHUNK_SIZE):
+                serialize_many(self._transactions)
+
+        return TRANSACTION_COUNT / measure(serialize_all, repeat=1)
+
+    def test_serializeMany_docsPerSecond(self) -> None:
+        before = self._docs_per_second(serialize_many_per_call_sets)
+        validated = self._docs_per_second(TransactionSerializer.serialize_many)
+        trusted = self._docs_per_second(
+            lambda transactions: TransactionSerializer.serialize_many(transactions, validate=False)
+        )
+
+        print(
+            f'\n{TRANSACTION_COUNT} transactions: per-call sets {before:,.0f} docs/s, '
+            f'hoisted keys {validated:,.0f} docs/s, skip validation {trusted:,.0f} docs/s'
+        )
+        self.assertEqual(
+            TransactionSerializer.serialize_many(self._transactions[:10]),
+            serialize_many_per_call_sets(self._transactions[:10])
+        )
+        self.assertGreater(trusted, before)
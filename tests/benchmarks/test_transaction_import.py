@@ -0,0 +1,67 @@
+import datetime
+import random
+import unittest
+
+from app.database.service import CRUDService
+from app.repositories.transaction import TransactionRepository
+from app.serializers.transaction import TransactionSerializer
+
+from tests.benchmarks.utils import benchmark, measure
+from tests.repositories.settings import TEST_TRANSACTION_CONN
+
+
+TEST_OWNER_ID = 'e5e403a76c58de3a4c2b5f16'
+TEST_COLLECTION = 'benchmark_import_transactions'
+TRANSACTION_COUNT = 20_000
+
+
+@benchmark
+class TransactionImportBenchmark(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        randomizer = random.Random(42)
+        self._transactions = [
+            {
+                'owner_id': TEST_OWNER_ID,
+                'asset': randomizer.choice(['BTC', 'ETH', 'ADA']),
+                'amount': randomizer.uniform(0.001, 10),
+                'historical_price': randomizer.uniform(0.1, 60000),
+                'currency': 'USD',
+                'tags': [],
+                'date': datetime.datetime(2017, 1, 1) + datetime.timedelta(
+                    days=randomizer.randrange(5 * 365)
+                ),
+                'type': 'buy'
+            }
+            for _ in range(TRANSACTION_COUNT)
+        ]
+        self._repository = TransactionRepository(
+            CRUDService(TEST_TRANSACTION_CONN, TEST_COLLECTION),
+            None,
+            TransactionSerializer
+        )
+
+    def tearDown(self) -> None:
+        TEST_TRANSACTION_CONN.local[TEST_COLLECTION].drop()
+        super().tearDown()
+
+    def test_import_compareRowByRowAndBulkInsert(self) -> None:
+        def row_by_row():
+            for transaction in self._transactions:
+                self._repository.create(dict(transaction))
+
+        def bulk():
+            self._repository.create_many([dict(transaction) for transaction in self._transactions])
+
+        row_by_row_time = measure(row_by_row, repeat=1)
+        bulk_time = measure(bulk, repeat=1)
+
+        print(
+            f'\n{TRANSACTION_COUNT} transactions imported: '
+            f'row by row {TRANSACTION_COUNT / row_by_row_time:.0f} rows/s, '
+            f'insert_many {TRANSACTION_COUNT / bulk_time:.0f} rows/s'
+        )
+        self.assertEqual(
+            TEST_TRANSACTION_CONN.local[TEST_COLLECTION].count_documents({}),
+            2 * TRANSACTION_COUNT
+        )
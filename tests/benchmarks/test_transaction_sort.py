@@ -0,0 +1,97 @@
+import datetime
+import random
+import unittest
+
+from pymongo import DESCENDING
+
+from app.database.service import CRUDService
+from app.repositories.transaction import TransactionRepository
+from app.serializers.transaction import TransactionSerializer
+
+from tests.benchmarks.utils import benchmark, measure
+from tests.repositories.settings import TEST_TRANSACTION_CONN
+
+
+TEST_OWNER_ID = 'e5e403a76c58de3a4c2b5f16'
+TEST_LEGACY_COLLECTION = 'benchmark_legacy_transactions'
+TEST_COLLECTION = 'benchmark_transactions'
+TRANSACTION_COUNT = 100_000
+
+
+@benchmark
+class TransactionSortBenchmark(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        randomizer = random.Random(42)
+        legacy_transactions, transactions = [], []
+        for _ in range(TRANSACTION_COUNT):
+            date = datetime.datetime(2017, 1, 1) + datetime.timedelta(
+                days=randomizer.randrange(5 * 365)
+            )
+            transaction = {
+                'owner_id': TEST_OWNER_ID,
+                'asset': randomizer.choice(['BTC', 'ETH', 'ADA']),
+                'amount': randomizer.uniform(0.001, 10),
+                'historical_price': randomizer.uniform(0.1, 60000),
+                'currency': 'USD',
+                'tags': [],
+                'type': 'buy'
+            }
+            legacy_transactions.append({
+                **transaction,
+                'date': f'{date.year}-{date.month}-{date.day}'
+            })
+            transactions.append({**transaction, 'date': date})
+
+        db = TEST_TRANSACTION_CONN.local
+        db[TEST_LEGACY_COLLECTION].insert_many(legacy_transactions)
+        db[TEST_COLLECTION].insert_many(transactions)
+        db[TEST_COLLECTION].create_index(
+            [('owner_id', 1), ('date', DESCENDING), ('_id', DESCENDING)]
+        )
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        TEST_TRANSACTION_CONN.local[TEST_LEGACY_COLLECTION].drop()
+        TEST_TRANSACTION_CONN.local[TEST_COLLECTION].drop()
+        super().tearDownClass()
+
+    def test_sortByDate_compareLegacyAndServerSidePath(self) -> None:
+        legacy_repository = TransactionRepository(
+            CRUDService(TEST_TRANSACTION_CONN, TEST_LEGACY_COLLECTION),
+            None,
+            TransactionSerializer
+        )
+        repository = TransactionRepository(
+            CRUDService(TEST_TRANSACTION_CONN, TEST_COLLECTION),
+            None,
+            TransactionSerializer
+        )
+
+        def legacy_path():
+            return sorted(
+                legacy_repository.get_all(owner_id=TEST_OWNER_ID),
+                key=lambda t: datetime.datetime(
+                    int(t['date'].split('-')[0]),
+                    int(t['date'].split('-')[1]),
+                    int(t['date'].split('-')[2])
+                ),
+                reverse=True
+            )
+
+        legacy_time = measure(legacy_path)
+        server_side_time = measure(
+            repository.get_all_sorted_by_date,
+            owner_id=TEST_OWNER_ID
+        )
+
+        print(
+            f'\n{TRANSACTION_COUNT} transactions sorted by date: '
+            f'python sort {legacy_time * 1000:.1f} ms, '
+            f'server-side sort {server_side_time * 1000:.1f} ms'
+        )
+        self.assertEqual(
+            len(repository.get_all_sorted_by_date(owner_id=TEST_OWNER_ID)),
+            TRANSACTION_COUNT
+        )
@@ -0,0 +1,43 @@
+import os
+import time
+import unittest
+
+
+# benchmarks need a local MongoDB and take a while, run them with RUN_BENCHMARKS=1
+benchmark = unittest.skipUnless(
+    os.environ.get('RUN_BENCHMARKS'),
+    'set RUN_BENCHMARKS=1 to run benchmarks'
+)
+
+
+def measure(func, *args, repeat: int = 3, **kwargs) -> float:
+    """
+    Return the best wall time of `repeat` runs in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def sample(func, *args, count: int = 200, **kwargs) -> list[float]:
+    """
+    Return the wall time of `count` runs in seconds
+    """
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def percentile(timings: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of the timings
+    """
+    ordered = sorted(timings)
+    rank = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
@@ -0,0 +1,66 @@
+import unittest
+
+from datetime import datetime, timezone
+
+from bson import ObjectId
+
+from app.costbasis.batch import TransactionBatch
+
+
+TEST_TRANSACTIONS = [
+    {'asset': 'btc', 'amount': 1.0, 'type': 'buy', 'historical_price': 100.0,
+     'date': datetime(2022, 2, 2)},
+    {'asset': 'ETH', 'amount': 10.0, 'type': 'buy', 'historical_price': 10.0,
+     'date': '2022-2-1'},
+    {'asset': 'BTC', 'amount': 0.5, 'type': 'sell', 'historical_price': 300.0,
+     'date': datetime(2022, 2, 3, tzinfo=timezone.utc)},
+    {'asset': 'BTC', 'amount': 1.0, 'type': 'buy', 'historical_price': 200.0,
+     'date': datetime(2022, 2, 1)},
+]
+
+
+class TransactionBatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._batch = TransactionBatch.from_documents(iter(TEST_TRANSACTIONS))
+
+    def test_fromDocuments_internUpperCasedAssets(self) -> None:
+        self.assertEqual(len(self._batch), 4)
+        self.assertEqual(self._batch.assets, ['BTC', 'ETH'])
+        self.assertEqual(self._batch.asset_codes.tolist(), [0, 1, 0, 0])
+        self.assertEqual(self._batch.is_buy.tolist(), [True, True, False, True])
+        self.assertEqual(self._batch.amounts.dtype, 'float64')
+
+    def test_dateOrder_keepTiesInOriginalOrder(self) -> None:
+        self.assertEqual(self._batch.date_order().tolist(), [1, 3, 0, 2])
+
+    def test_dateOrder_breakTiesById(self) -> None:
+        first, second = ObjectId(), ObjectId()
+        documents = [
+            {**TEST_TRANSACTIONS[3], '_id': second},
+            {**TEST_TRANSACTIONS[1], 'id': str(first)},
+        ]
+
+        for ordered in [documents, documents[::-1]]:
+            batch = TransactionBatch.from_documents(ordered)
+            self.assertEqual(
+                [ordered[index]['asset'] for index in batch.date_order()],
+                ['ETH', 'BTC']
+            )
+
+    def test_portfolio_returnMetaPerAsset(self) -> None:
+        portfolio = self._batch.portfolio()
+
+        self.assertEqual(list(portfolio['assets']), ['BTC', 'ETH'])
+        self.assertEqual(
+            portfolio['assets']['BTC']['meta'],
+            {'amount': 1.5, 'investment': 300.0, 'average_price': 200.0}
+        )
+        self.assertEqual(portfolio['investment'], 400.0)
+
+    def test_portfolio_returnEmptyDictForNoTransactions(self) -> None:
+        self.assertEqual(TransactionBatch.from_documents([]).portfolio(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+
+from datetime import datetime
+
+from app.costbasis.batch import TransactionBatch
+from app.costbasis.service import LotQueue, apply_unrealized_pnl, calculate_cost_basis
+
+
+TEST_TRANSACTIONS = [
+    {'asset': 'BTC', 'amount': 1.5, 'type': 'sell', 'historical_price': 300.0,
+     'date': datetime(2022, 2, 3)},
+    {'asset': 'btc', 'amount': 1.0, 'type': 'buy', 'historical_price': 100.0,
+     'date': datetime(2022, 2, 1)},
+    {'asset': 'ETH', 'amount': 10.0, 'type': 'buy', 'historical_price': 10.0,
+     'date': datetime(2022, 2, 1)},
+    {'asset': 'BTC', 'amount': 1.0, 'type': 'buy', 'historical_price': 200.0,
+     'date': datetime(2022, 2, 2)},
+]
+
+TEST_BATCH = TransactionBatch.from_documents(TEST_TRANSACTIONS)
+
+
+class LotQueueTest(unittest.TestCase):
+    def test_consumeFifo(self):
+        lots = LotQueue()
+        lots.push(1, 100)
+        lots.push(1, 200)
+
+        self.assertEqual(lots.consume(1.5), (1.5, 200))
+        self.assertEqual(len(lots), 1)
+        self.assertEqual(lots.totals(), (0.5, 100))
+
+    def test_consumeLifo(self):
+        lots = LotQueue()
+        lots.push(1, 100)
+        lots.push(1, 200)
+
+        self.assertEqual(lots.consume(1.5, lifo=True), (1.5, 250))
+        self.assertEqual(lots.totals(), (0.5, 50))
+
+    def test_consumeMoreThanOpen(self):
+        lots = LotQueue()
+        lots.push(1, 100)
+
+        self.assertEqual(lots.consume(3), (1, 100))
+        self.assertEqual(len(lots), 0)
+        self.assertEqual(lots.totals(), (0, 0))
+
+
+class CalculateCostBasisTest(unittest.TestCase):
+    def assertMeta(self, meta, amount, investment, average_price, realized_pnl):
+        self.assertAlmostEqual(meta['amount'], amount)
+        self.assertAlmostEqual(meta['investment'], investment)
+        self.assertAlmostEqual(meta['average_price'], average_price)
+        self.assertAlmostEqual(meta['realized_pnl'], realized_pnl)
+
+    def test_fifo(self):
+        portfolio = calculate_cost_basis(TEST_BATCH, 'fifo')
+
+        self.assertEqual(portfolio['method'], 'fifo')
+        self.assertEqual(list(portfolio['assets']), ['BTC', 'ETH'])
+        self.assertMeta(portfolio['assets']['BTC']['meta'], 0.5, 100, 200, 250)
+        self.assertMeta(portfolio['assets']['ETH']['meta'], 10, 100, 10, 0)
+        self.assertAlmostEqual(portfolio['investment'], 200)
+        self.assertAlmostEqual(portfolio['realized_pnl'], 250)
+
+    def test_lifo(self):
+        portfolio = calculate_cost_basis(TEST_BATCH, 'lifo')
+
+        self.assertMeta(portfolio['assets']['BTC']['meta'], 0.5, 50, 100, 200)
+
+    def test_average(self):
+        portfolio = calculate_cost_basis(TEST_BATCH, 'average')
+
+        self.assertMeta(portfolio['assets']['BTC']['meta'], 0.5, 75, 150, 225)
+
+    def test_closedPosition(self):
+        portfolio = calculate_cost_basis(TransactionBatch.from_documents(TEST_TRANSACTIONS + [
+            {'asset': 'BTC', 'amount': 0.5, 'type': 'sell', 'historical_price': 100.0,
+             'date': datetime(2022, 2, 4)},
+        ]), 'fifo')
+
+        self.assertMeta(portfolio['assets']['BTC']['meta'], 0, 0, 0, 200)
+
+    def test_empty(self):
+        self.assertEqual(calculate_cost_basis(TransactionBatch.from_documents([]), 'fifo'), {})
+
+    def test_unknownMethod(self):
+        with self.assertRaises(ValueError):
+            calculate_cost_basis(TEST_BATCH, 'hifo')
+
+
+class ApplyUnrealizedPnlTest(unittest.TestCase):
+    def test_applyUnrealizedPnl(self):
+        portfolio = apply_unrealized_pnl(
+            calculate_cost_basis(TEST_BATCH, 'fifo'),
+            {'BTC': '400'}
+        )
+
+        self.assertAlmostEqual(portfolio['assets']['BTC']['meta']['unrealized_pnl'], 100)
+        self.assertIsNone(portfolio['assets']['ETH']['meta']['unrealized_pnl'])
+        self.assertAlmostEqual(portfolio['unrealized_pnl'], 100)
+
+    def test_applyUnrealizedPnlInvalidPrice(self):
+        for price in ['', 'n/a', None, 'nan']:
+            portfolio = apply_unrealized_pnl(
+                calculate_cost_basis(TEST_BATCH, 'fifo'),
+                {'BTC': price, 'ETH': '20'}
+            )
+
+            self.assertIsNone(portfolio['assets']['BTC']['meta']['unrealized_pnl'])
+            self.assertIsNotNone(portfolio['assets']['ETH']['meta']['unrealized_pnl'])
+
+    def test_applyUnrealizedPnlEmpty(self):
+        self.assertEqual(apply_unrealized_pnl({}, {'BTC': '400'}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+from pymongo import AsyncMongoClient
+
+from app.database.service import AsyncCRUDService
+from tests.database.settings import TEST_COLLECTION, TEST_ITEM
+from tests.utils import tag
+
+
+class AsyncCRUDServiceTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self._conn = AsyncMongoClient()
+        self._collection = self._conn.local[TEST_COLLECTION]
+        self._service = AsyncCRUDService(self._conn, TEST_COLLECTION)
+
+        method = getattr(self, self._testMethodName)
+        tags = getattr(method, 'tags', {})
+        if 'skip_setup' in tags:
+            return
+        self._testitem = await self._collection.insert_one(dict(TEST_ITEM))
+
+    async def asyncTearDown(self) -> None:
+        await self._collection.drop()
+        await self._conn.close()
+        await super().asyncTearDown()
+
+    # ---  TEST SERVICE  ---
+    @tag('skip_setup')
+    async def test_create(self) -> None:
+        result = await self._service.create({'foo': 'bar'})
+        new_item, = await self._collection.find({}).to_list()
+
+        self.assertEqual(new_item['_id'], result.inserted_id)
+        self.assertEqual(new_item['foo'], 'bar')
+
+    async def test_get_by_id(self) -> None:
+        test_item = await self._service.get_by_id(self._testitem.inserted_id)
+
+        self.assertNotEqual(test_item, None)
+        self.assertEqual(test_item['test'], TEST_ITEM['test'])
+
+    async def test_get_all(self) -> None:
+        await self._collection.insert_one({'test': 'item2', 'owner_id': 'owner'})
+
+        self.assertEqual(len(await self._service.get_all()), 2)
+        owned_item, = await self._service.get_all(owner_id='owner')
+        self.assertEqual(owned_item['test'], 'item2')
+
+    async def test_get_all_by_key(self) -> None:
+        test_inserted_item = await self._service.get_by_id(self._testitem.inserted_id)
+        test_selected_item, = await self._service.get_all_by_key('test', 'item')
+        self.assertEqual(test_inserted_item, test_selected_item)
+
+    async def test_find_one(self) -> None:
+        test_item = await self._service.find_one({'test': 'item'}, {'_id': 0})
+
+        self.assertEqual(test_item, {'test': 'item'})
+        self.assertIsNone(await self._service.find_one({'test': 'nonexists'}))
+
+    async def test_find_one_and_update(self) -> None:
+        updated_item = await self._service.find_one_and_update(
+            {'test': 'item'},
+            test='updated_item'
+        )
+
+        self.assertEqual(updated_item, {'_id': self._testitem.inserted_id, 'test': 'updated_item'})
+
+    async def test_update_by_id(self) -> None:
+        updated_item = {'test': 'updated_item'}
+        await self._service.update_by_id(self._testitem.inserted_id, **updated_item)
+
+        updated_item.update({'_id': self._testitem.inserted_id})
+        test_item = await self._collection.find_one({'_id': self._testitem.inserted_id})
+
+        self.assertEqual(updated_item, test_item)
+
+    async def test_delete_by_id(self) -> None:
+        result = await self._service.delete_by_id(self._testitem.inserted_id)
+
+        self.assertEqual(result.deleted_count, 1)
+        self.assertEqual(await self._collection.find({}).to_list(), [])
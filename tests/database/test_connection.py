@@ -0,0 +1,52 @@
+import unittest
+
+from pymongo import AsyncMongoClient, MongoClient
+
+from app.database.connection import AsyncConnectionManager, ConnectionManager
+
+
+class ConnectionManagerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._manager = ConnectionManager(
+            'mongodb://localhost:27017',
+            maxPoolSize=5,
+            connect=False
+        )
+
+    def tearDown(self) -> None:
+        self._manager.close()
+        super().tearDown()
+
+    def test_open_returnPooledClient(self) -> None:
+        client = self._manager.open()
+        self.assertIsInstance(client, MongoClient)
+        self.assertEqual(client.options.pool_options.max_pool_size, 5)
+
+    def test_openTwice_returnSameClient(self) -> None:
+        self.assertIs(self._manager.open(), self._manager.open())
+        self.assertIs(self._manager.open(), self._manager.client)
+
+    def test_clientWithoutOpen_openLazily(self) -> None:
+        self.assertIsInstance(self._manager.client, MongoClient)
+
+    def test_close_releaseClient(self) -> None:
+        client = self._manager.open()
+        self._manager.close()
+        self.assertIsNot(self._manager.open(), client)
+
+    def test_closeWithoutOpen_doNothing(self) -> None:
+        self._manager.close()
+
+
+class AsyncConnectionManagerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_openAndClose_reuseSingleAsyncClient(self) -> None:
+        manager = AsyncConnectionManager('mongodb://localhost:27017', maxPoolSize=5)
+        client = manager.open()
+
+        self.assertIsInstance(client, AsyncMongoClient)
+        self.assertIs(client, manager.client)
+
+        await manager.close()
+        self.assertIsNot(manager.open(), client)
+        await manager.close()
@@ -0,0 +1,70 @@
+import unittest
+
+from pymongo import ASCENDING, IndexModel
+
+from app.database.indexes import ensure_indexes, report_indexes
+from tests.database.settings import TEST_CONN, TEST_COLLECTION
+
+
+TEST_REGISTRY = {
+    TEST_COLLECTION: [
+        IndexModel([('owner_id', ASCENDING), ('asset', ASCENDING)], name='owner_id_asset'),
+        IndexModel([('username', ASCENDING)], name='username', unique=True),
+    ]
+}
+
+TEST_QUERY_SHAPES = {
+    TEST_COLLECTION: [
+        ({'owner_id': '', 'asset': ''}, None),
+        ({'address': ''}, None),
+    ]
+}
+
+
+class IndexRegistryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        TEST_CONN.local[TEST_COLLECTION].insert_one({'owner_id': 'owner', 'asset': 'BTC'})
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        TEST_CONN.local[TEST_COLLECTION].drop()
+
+    def test_ensureIndexes_createRegisteredIndexes(self) -> None:
+        created = ensure_indexes(TEST_CONN.local, TEST_REGISTRY)
+        index_information = TEST_CONN.local[TEST_COLLECTION].index_information()
+
+        self.assertEqual(created[TEST_COLLECTION], ['owner_id_asset', 'username'])
+        self.assertIn('owner_id_asset', index_information)
+        self.assertTrue(index_information['username']['unique'])
+
+    def test_ensureIndexesTwice_isIdempotent(self) -> None:
+        ensure_indexes(TEST_CONN.local, TEST_REGISTRY)
+        ensure_indexes(TEST_CONN.local, TEST_REGISTRY)
+
+        self.assertEqual(
+            len(TEST_CONN.local[TEST_COLLECTION].index_information()),
+            3
+        )
+
+    def test_reportWithoutIndexes_returnMissingIndexesAndCollectionScans(self) -> None:
+        report = report_indexes(TEST_CONN.local, TEST_REGISTRY, TEST_QUERY_SHAPES)
+
+        self.assertEqual(
+            report[TEST_COLLECTION]['missing'],
+            ['owner_id_asset', 'username']
+        )
+        self.assertEqual(len(report[TEST_COLLECTION]['collection_scans']), 2)
+
+    def test_reportWithIndexes_returnOnlyUnindexedShapes(self) -> None:
+        ensure_indexes(TEST_CONN.local, TEST_REGISTRY)
+        TEST_CONN.local[TEST_COLLECTION].create_index('chain', name='chain')
+        report = report_indexes(TEST_CONN.local, TEST_REGISTRY, TEST_QUERY_SHAPES)
+
+        self.assertEqual(report[TEST_COLLECTION]['missing'], [])
+        self.assertEqual(report[TEST_COLLECTION]['unregistered'], ['chain'])
+        self.assertIn('username', report[TEST_COLLECTION]['unused'])
+        self.assertEqual(
+            report[TEST_COLLECTION]['collection_scans'],
+            [{'filter': ['address'], 'sort': []}]
+        )
@@ -0,0 +1,92 @@
+import base64
+import unittest
+
+from bson import ObjectId
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING
+
+from app.database.pagination import \
+    build_page, \
+    decode_cursor, \
+    encode_cursor, \
+    keyset_filter, \
+    page_args
+
+
+TEST_SORT = [('date', DESCENDING), ('_id', DESCENDING)]
+TEST_ITEM = {
+    '_id': ObjectId('61f5b2c4a3ed85c67a304e5e'),
+    'date': datetime(2022, 2, 4),
+    'asset': 'BTC'
+}
+
+
+class KeysetFilterTest(unittest.TestCase):
+    def test_getSingleAscendingKey_returnGreaterThanFilter(self) -> None:
+        self.assertEqual(
+            keyset_filter([('_id', ASCENDING)], {'_id': TEST_ITEM['_id']}),
+            {'$or': [{'_id': {'$gt': TEST_ITEM['_id']}}]}
+        )
+
+    def test_getCompoundDescendingKeys_returnTieBreakingFilter(self) -> None:
+        self.assertEqual(
+            keyset_filter(TEST_SORT, TEST_ITEM),
+            {'$or': [
+                {'date': {'$lt': TEST_ITEM['date']}},
+                {'date': TEST_ITEM['date'], '_id': {'$lt': TEST_ITEM['_id']}}
+            ]}
+        )
+
+
+class CursorTest(unittest.TestCase):
+    def test_encodeAndDecode_returnSortKeyValues(self) -> None:
+        cursor = encode_cursor(TEST_ITEM, TEST_SORT)
+
+        self.assertIsInstance(cursor, str)
+        self.assertEqual(
+            decode_cursor(cursor, TEST_SORT),
+            {'_id': TEST_ITEM['_id'], 'date': TEST_ITEM['date']}
+        )
+
+    def test_decodeMalformedCursor_raiseValueError(self) -> None:
+        for cursor in ['foo', '!!!', base64.urlsafe_b64encode(b'42').decode()]:
+            self.assertRaises(ValueError, decode_cursor, cursor, TEST_SORT)
+
+    def test_decodeCursorOfAnotherSort_raiseValueError(self) -> None:
+        cursor = encode_cursor(TEST_ITEM, [('_id', ASCENDING)])
+        self.assertRaises(ValueError, decode_cursor, cursor, TEST_SORT)
+
+
+class PageTest(unittest.TestCase):
+    class Serializer:
+        @staticmethod
+        def serialize_many(items: list[dict], validate: bool = True) -> list[dict]:
+            return [{'id': str(item['_id'])} for item in items]
+
+    def test_getPageArgs_fetchOneExtraItem(self) -> None:
+        cursor = encode_cursor(TEST_ITEM, TEST_SORT)
+
+        self.assertEqual(page_args(TEST_SORT, 2), (TEST_SORT, 3, None))
+        self.assertEqual(
+            page_args(TEST_SORT, 2, cursor),
+            (TEST_SORT, 3, {'_id': TEST_ITEM['_id'], 'date': TEST_ITEM['date']})
+        )
+
+    def test_getPageArgsOfMalformedCursor_raiseValueError(self) -> None:
+        self.assertRaises(ValueError, page_args, TEST_SORT, 2, 'foo')
+
+    def test_buildPageWithExtraItem_returnNextCursor(self) -> None:
+        items = [dict(TEST_ITEM, _id=ObjectId()) for _ in range(3)]
+
+        page = build_page(items, 2, TEST_SORT, self.Serializer)
+
+        self.assertEqual(page['data'], [{'id': str(item['_id'])} for item in items[:2]])
+        self.assertEqual(
+            decode_cursor(page['next_cursor'], TEST_SORT),
+            {'_id': items[1]['_id'], 'date': TEST_ITEM['date']}
+        )
+
+    def test_buildLastPage_returnNoNextCursor(self) -> None:
+        page = build_page([TEST_ITEM], 2, TEST_SORT, self.Serializer)
+
+        self.assertEqual(page, {'data': [{'id': str(TEST_ITEM['_id'])}], 'next_cursor': None})
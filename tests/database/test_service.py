@@ -84,3 +84,74 @@ class CRUDServiceTest(unittest.TestCase):
 
         self.assertEqual(result.deleted_count, 1)
         self.assertEqual(items, [])
+
+    @tag('skip_setup')
+    def test_create_and_return(self) -> None:
+        test_item = {'foo': 'bar'}
+        new_item = self._service.create_and_return(test_item)
+        stored_item, = self._get_all()
+
+        self.assertNotIn('_id', test_item)
+        self.assertEqual(new_item, stored_item)
+
+    def test_find_one(self) -> None:
+        test_item = self._service.find_one({'test': TEST_ITEM['test']})
+
+        self.assertEqual(test_item['_id'], self._testitem.inserted_id)
+        self.assertIsNone(self._service.find_one({'test': 'nonexists'}))
+
+    def test_find_one_and_update(self) -> None:
+        updated_item = self._service.find_one_and_update(
+            {'test': TEST_ITEM['test']},
+            test='updated_item'
+        )
+
+        self.assertEqual(
+            updated_item,
+            {'_id': self._testitem.inserted_id, 'test': 'updated_item'}
+        )
+
+    def test_find_one_and_delete(self) -> None:
+        deleted_item = self._service.find_one_and_delete({'test': TEST_ITEM['test']})
+
+        self.assertEqual(deleted_item['_id'], self._testitem.inserted_id)
+        self.assertEqual(self._get_all(), [])
+
+    def test_find_one_and_update_by_id(self) -> None:
+        updated_item = self._service.find_one_and_update_by_id(
+            self._testitem.inserted_id,
+            test='updated_item'
+        )
+
+        self.assertEqual(
+            updated_item,
+            {'_id': self._testitem.inserted_id, 'test': 'updated_item'}
+        )
+        self.assertEqual(
+            self._get_by_id(self._testitem.inserted_id),
+            updated_item
+        )
+
+    def test_find_one_and_update_by_id_nonExistsId(self) -> None:
+        updated_item = self._service.find_one_and_update_by_id(
+            '61f5b2c4a3ed85c67a304e5e',
+            test='updated_item'
+        )
+
+        self.assertIsNone(updated_item)
+
+    def test_find_one_and_delete_by_id(self) -> None:
+        deleted_item = self._service.find_one_and_delete_by_id(
+            self._testitem.inserted_id
+        )
+
+        self.assertEqual(deleted_item['_id'], self._testitem.inserted_id)
+        self.assertEqual(self._get_all(), [])
+
+    def test_find_one_and_delete_by_id_nonExistsId(self) -> None:
+        deleted_item = self._service.find_one_and_delete_by_id(
+            '61f5b2c4a3ed85c67a304e5e'
+        )
+
+        self.assertIsNone(deleted_item)
+        self.assertEqual(len(self._get_all()), 1)
@@ -0,0 +1,129 @@
+import io
+import unittest
+
+from datetime import datetime
+from fastapi import UploadFile
+
+from app.fileprocessor.service import TransactionFileProcessor, split_complete_records
+
+
+async def collect(iterator) -> list:
+    return [item async for item in iterator]
+
+
+class SplitCompleteRecordsTest(unittest.TestCase):
+    def test_getTextWithoutNewline_returnEverythingPending(self) -> None:
+        self.assertEqual(split_complete_records('BTC,1'), ('', 'BTC,1'))
+
+    def test_getPartialLastLine_splitAfterLastNewline(self) -> None:
+        self.assertEqual(
+            split_complete_records('BTC,1\r\nETH,2\nAD'),
+            ('BTC,1\r\nETH,2\n', 'AD')
+        )
+
+    def test_getNewlineInsideOpenQuote_splitBeforeQuotedRecord(self) -> None:
+        self.assertEqual(
+            split_complete_records('BTC,1\n"multi\nline'),
+            ('BTC,1\n', '"multi\nline')
+        )
+
+    def test_getNewlineAfterClosedQuote_splitAfterIt(self) -> None:
+        self.assertEqual(
+            split_complete_records('"multi\nline",1\nETH'),
+            ('"multi\nline",1\n', 'ETH')
+        )
+
+
+class TransactionFileProcessorTest(unittest.IsolatedAsyncioTestCase):
+    def _upload(self, content: bytes) -> UploadFile:
+        return UploadFile(file=io.BytesIO(content), filename='transactions.csv')
+
+    async def test_getRowsAcrossChunks_yieldEveryRow(self) -> None:
+        content = ''.join(
+            f'"BTC",{index},"1,000.5",2022-2-4,buy\r\n' for index in range(100)
+        ).encode()
+
+        rows = await collect(
+            TransactionFileProcessor.iter_rows(self._upload(content), chunk_size=7)
+        )
+
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(rows[42], ['BTC', '42', '1,000.5', '2022-2-4', 'buy'])
+
+    async def test_getQuotedNewlineAcrossChunks_yieldSingleRow(self) -> None:
+        content = 'BTC,1,2,2022-2-4,buy\n"E\nTH",1,2,2022-2-4,sell\n'.encode()
+
+        rows = await collect(
+            TransactionFileProcessor.iter_rows(self._upload(content), chunk_size=3)
+        )
+
+        self.assertEqual(rows[1][0], 'E\nTH')
+        self.assertEqual(len(rows), 2)
+
+    async def test_getMultiByteCharacterAcrossChunks_decodeIt(self) -> None:
+        content = 'ÉTH,1,2,2022-2-4,buy'.encode()
+
+        rows = await collect(
+            TransactionFileProcessor.iter_rows(self._upload(content), chunk_size=1)
+        )
+
+        self.assertEqual(rows, [['ÉTH', '1', '2', '2022-2-4', 'buy']])
+
+    async def test_getValidFile_yieldTransactions(self) -> None:
+        content = b'asset,amount,historical_price,date,type\nBTC,0.5,11680,2022-2-4,buy\n\nETH,1,3342,2022-02-21,sell'
+
+        transactions = await collect(
+            TransactionFileProcessor.iter_transactions(self._upload(content))
+        )
+
+        self.assertEqual(
+            transactions,
+            [
+                (2, {
+                    'asset': 'BTC',
+                    'amount': 0.5,
+                    'historical_price': 11680,
+                    'date': datetime(2022, 2, 4),
+                    'type': 'buy',
+                    'currency': 'USD',
+                    'tags': []
+                }),
+                (4, {
+                    'asset': 'ETH',
+                    'amount': 1,
+                    'historical_price': 3342,
+                    'date': datetime(2022, 2, 21),
+                    'type': 'sell',
+                    'currency': 'USD',
+                    'tags': []
+                }),
+            ]
+        )
+
+    async def test_getInvalidRow_raiseValueErrorWithRowNumber(self) -> None:
+        for content in [
+            b'BTC,0.5,11680,2022-2-4,buy\nETH,foo,3342,2022-2-4,buy\n',
+            b'BTC,0.5,11680,2022-2-4,buy\nETH,1,3342,2022-2-4\n',
+            b'BTC,0.5,11680,2022-2-4,buy\nETH,1,3342,2022-2-4,hodl\n',
+        ]:
+            with self.assertRaisesRegex(ValueError, 'row 2'):
+                await collect(
+                    TransactionFileProcessor.iter_transactions(self._upload(content))
+                )
+
+    async def test_getInvalidRowsWithErrorList_reportAndSkipThem(self) -> None:
+        content = (
+            b'asset,amount,historical_price,date,type\n'
+            b'BTC,0.5,11680,2022-2-4,buy\n'
+            b'ETH,foo,3342,2022-2-4,buy\n'
+            b'ETH,1,3342,2022-2-4\n'
+            b'ADA,10,1.2,2022-2-21,sell\n'
+        )
+        errors = []
+
+        transactions = await collect(
+            TransactionFileProcessor.iter_transactions(self._upload(content), errors=errors)
+        )
+
+        self.assertEqual([row_number for row_number, _ in transactions], [2, 5])
+        self.assertEqual([error['row'] for error in errors], [3, 4])
@@ -0,0 +1,150 @@
+import unittest
+
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.history.service import \
+    as_of, \
+    build_price_series, \
+    build_timeline, \
+    compute_history, \
+    count_points, \
+    naive_utc
+
+
+TEST_TRANSACTIONS = [
+    {'asset': 'BTC', 'amount': 1.0, 'type': 'buy', 'date': datetime(2022, 2, 2)},
+    {'asset': 'eth', 'amount': 10.0, 'type': 'buy', 'date': datetime(2022, 2, 1)},
+    {'asset': 'BTC', 'amount': 0.5, 'type': 'sell', 'date': datetime(2022, 2, 4)},
+    {'asset': 'BTC', 'amount': 2.0, 'type': 'buy', 'date': datetime(2022, 2, 3)},
+]
+
+def epoch_ms(timestamp: datetime) -> int:
+    return int(timestamp.replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+TEST_RANGE_SERIES = {
+    'BTC': {'timestamps': [epoch_ms(datetime(2022, 2, 3))], 'prices': [200.0]},
+    'ETH': {'timestamps': [epoch_ms(datetime(2022, 2, 2, 12))], 'prices': [10.0]},
+    'ADA': {'timestamps': [epoch_ms(datetime(2022, 2, 1))], 'prices': [1.0]},
+}
+
+TEST_PREVIOUS_PRICES = [
+    {'asset': 'BTC', 'timestamp': datetime(2022, 1, 30), 'price': 100.0},
+]
+
+
+class NaiveUtcTest(unittest.TestCase):
+    def test_mixAwareAndNaive_returnComparableUTC(self) -> None:
+        start = naive_utc(datetime(2024, 1, 1, tzinfo=timezone.utc))
+        end = naive_utc(datetime(2024, 1, 2))
+
+        self.assertEqual(start, datetime(2024, 1, 1))
+        self.assertLess(start, end)
+
+
+class BuildTimelineTest(unittest.TestCase):
+    def test_buildDaily_includeBothEnds(self) -> None:
+        timeline = build_timeline(datetime(2022, 2, 1), datetime(2022, 2, 4), 'day')
+
+        self.assertEqual(timeline[0], np.datetime64('2022-02-01T00:00:00'))
+        self.assertEqual(timeline[-1], np.datetime64('2022-02-04T00:00:00'))
+        self.assertEqual(len(timeline), 4)
+
+    def test_buildFromAwareDatetimes_useUTC(self) -> None:
+        timeline = build_timeline(
+            datetime(2022, 2, 1, tzinfo=timezone.utc),
+            datetime(2022, 2, 1, 3, tzinfo=timezone.utc),
+            'hour'
+        )
+
+        self.assertEqual(len(timeline), 4)
+
+    def test_buildEndBeforeStart_returnEmptyTimeline(self) -> None:
+        self.assertEqual(
+            len(build_timeline(datetime(2022, 2, 2), datetime(2022, 2, 1), 'week')),
+            0
+        )
+
+
+class CountPointsTest(unittest.TestCase):
+    def test_countPoints_matchTimelineLength(self) -> None:
+        for start, end, interval in [
+            (datetime(2022, 2, 1), datetime(2022, 2, 4), 'day'),
+            (datetime(2022, 2, 1), datetime(2022, 2, 4, 23, 59), 'day'),
+            (datetime(2022, 2, 1), datetime(2022, 3, 1), 'week'),
+            (datetime(2022, 2, 1, tzinfo=timezone.utc), datetime(2022, 2, 1, 3), 'hour'),
+            (datetime(2022, 2, 2), datetime(2022, 2, 1), 'week'),
+        ]:
+            self.assertEqual(
+                count_points(start, end, interval),
+                len(build_timeline(start, end, interval))
+            )
+
+    def test_countHugeRange_notBuildTimeline(self) -> None:
+        self.assertEqual(
+            count_points(datetime(1, 1, 1), datetime(9999, 1, 1), 'hour'),
+            87640657
+        )
+
+
+class AsOfTest(unittest.TestCase):
+    def test_asOf_returnLastValueAtOrBeforeEachPoint(self) -> None:
+        timeline = np.array(['2022-01-01', '2022-01-02', '2022-01-03'], dtype='datetime64[s]')
+        event_times = np.array(['2022-01-02', '2022-01-02T12'], dtype='datetime64[s]')
+
+        np.testing.assert_array_equal(
+            as_of(event_times, np.array([1.0, 2.0]), timeline, 0.0),
+            [0.0, 1.0, 2.0]
+        )
+
+    def test_asOfWithoutEvents_returnDefault(self) -> None:
+        timeline = np.array(['2022-01-01'], dtype='datetime64[s]')
+
+        self.assertTrue(np.isnan(as_of(timeline[:0], np.array([]), timeline, np.nan)[0]))
+
+
+class BuildPriceSeriesTest(unittest.TestCase):
+    def test_buildPriceSeries_prependPreviousPrice(self) -> None:
+        series = build_price_series(TEST_RANGE_SERIES, TEST_PREVIOUS_PRICES)
+
+        times, prices = series['BTC']
+        np.testing.assert_array_equal(
+            times,
+            np.array(['2022-01-30', '2022-02-03'], dtype='datetime64[ms]')
+        )
+        np.testing.assert_array_equal(prices, [100.0, 200.0])
+
+    def test_buildPriceSeries_addAssetOnlyKnownBeforeRange(self) -> None:
+        series = build_price_series({}, TEST_PREVIOUS_PRICES)
+
+        np.testing.assert_array_equal(series['BTC'][1], [100.0])
+
+
+class ComputeHistoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._timeline = build_timeline(datetime(2022, 2, 1), datetime(2022, 2, 4), 'day')
+        self._price_series = build_price_series(TEST_RANGE_SERIES, TEST_PREVIOUS_PRICES)
+
+    def test_computeHistory_returnCumulativeHoldingsPerAsset(self) -> None:
+        history = compute_history(TEST_TRANSACTIONS, self._price_series, self._timeline)
+
+        self.assertEqual(list(history['assets']), ['BTC', 'ETH'])
+        self.assertEqual(history['assets']['BTC']['amount'], [0.0, 1.0, 3.0, 2.5])
+        self.assertEqual(history['assets']['ETH']['amount'], [10.0, 10.0, 10.0, 10.0])
+
+    def test_computeHistory_valueWithLastKnownPrice(self) -> None:
+        history = compute_history(TEST_TRANSACTIONS, self._price_series, self._timeline)
+
+        self.assertEqual(history['assets']['BTC']['value'], [0.0, 100.0, 600.0, 500.0])
+        self.assertEqual(history['assets']['ETH']['value'], [None, None, 100.0, 100.0])
+        self.assertEqual(history['total'], [0.0, 100.0, 700.0, 600.0])
+        self.assertEqual(history['timestamps'][0], datetime(2022, 2, 1))
+
+    def test_computeHistoryWithoutTransactions_returnZeroTotal(self) -> None:
+        history = compute_history([], self._price_series, self._timeline)
+
+        self.assertEqual(history['total'], [0.0] * 4)
+        self.assertEqual(history['assets'], {})
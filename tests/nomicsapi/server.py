@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+TEST_PRICES = {
+    'BTC': 43000.5,
+    'ETH': 3100.25,
+    'ADA': 1.05,
+}
+
+
+class _TickerRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+
+        try:
+            self._respond()
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def _respond(self) -> None:
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        query = parse_qs(urlparse(self.path).query)
+        ids = query.get('ids', [''])[0].split(',')
+        if self.server.failing_ids & set(ids):
+            self.send_response(500)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = json.dumps([
+            {
+                'id': asset,
+                'price': str(self.server.prices[asset]),
+                'logo_url': f'https://example.com/{asset.lower()}.svg'
+            }
+            for asset in ids if asset in self.server.prices
+        ]).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class PriceServer:
+    """
+    Local stand-in of the Nomics ticker endpoint, serving fixed prices on a free port
+    Counts the accepted connections and requests so tests can check connection reuse,
+    requests asking for any of failing_ids get a 500 response
+    """
+    def __init__(
+        self,
+        prices: dict = TEST_PRICES,
+        delay: float = 0,
+        failing_ids: set[str] = frozenset()
+    ) -> None:
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _TickerRequestHandler)
+        self._server.daemon_threads = True
+        self._server.prices = prices
+        self._server.delay = delay
+        self._server.failing_ids = failing_ids
+        self._server.lock = threading.Lock()
+        self._server.connections = 0
+        self._server.requests = 0
+        self._server.active = 0
+        self._server.max_active = 0
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f'http://{host}:{port}/v1/currencies/ticker'
+
+    @property
+    def connections(self) -> int:
+        return self._server.connections
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    @property
+    def max_active(self) -> int:
+        """
+        The most requests served at the same time
+        """
+        return self._server.max_active
+
+    def start(self) -> 'PriceServer':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
@@ -0,0 +1,77 @@
+import unittest
+
+from app.nomicsapi.breaker import CircuitBreaker
+
+from tests.nomicsapi.test_cache import FakeClock
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._clock = FakeClock()
+        self._breaker = CircuitBreaker(
+            failure_threshold=3,
+            slow_call_threshold=1,
+            reset_timeout=10,
+            clock=self._clock
+        )
+
+    def _fail(self, count: int) -> None:
+        for _ in range(count):
+            self._breaker.record_failure()
+
+    def test_failuresBelowThreshold_stayClosed(self) -> None:
+        self._fail(2)
+        self._breaker.record_success(0.1)
+        self._fail(2)
+
+        self.assertEqual(self._breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(self._breaker.allow())
+
+    def test_failuresReachThreshold_openAndRejectCalls(self) -> None:
+        self._fail(3)
+
+        self.assertEqual(self._breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self._breaker.allow())
+
+    def test_slowCalls_countAsFailures(self) -> None:
+        for _ in range(3):
+            self._breaker.record_success(1.5)
+
+        self.assertEqual(self._breaker.state, CircuitBreaker.OPEN)
+
+    def test_resetTimeoutElapsed_allowSingleProbe(self) -> None:
+        self._fail(3)
+        self._clock.now = 10
+
+        self.assertEqual(self._breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self._breaker.allow())
+        self.assertFalse(self._breaker.allow())
+
+    def test_probeSucceeds_close(self) -> None:
+        self._fail(3)
+        self._clock.now = 10
+        self._breaker.allow()
+        self._breaker.record_success(0.1)
+
+        self.assertEqual(self._breaker.state, CircuitBreaker.CLOSED)
+
+    def test_probeFails_reopen(self) -> None:
+        self._fail(3)
+        self._clock.now = 10
+        self._breaker.allow()
+        self._breaker.record_failure()
+
+        self.assertEqual(self._breaker.state, CircuitBreaker.OPEN)
+        self._clock.now = 19
+        self.assertFalse(self._breaker.allow())
+
+    def test_probeReleased_allowNextProbe(self) -> None:
+        self._fail(3)
+        self._clock.now = 10
+        self._breaker.allow()
+        self._breaker.release()
+
+        self.assertEqual(self._breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self._breaker.allow())
+
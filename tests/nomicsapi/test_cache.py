@@ -0,0 +1,49 @@
+import unittest
+
+from app.nomicsapi.cache import PriceCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class PriceCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._clock = FakeClock()
+        self._cache = PriceCache(ttl=10, stale_ttl=20, max_size=3, clock=self._clock)
+
+    def test_lookupEmptyCache_returnEveryIdMissing(self) -> None:
+        self.assertEqual(self._cache.lookup(['BTC', 'ETH']), ({}, [], ['BTC', 'ETH']))
+
+    def test_lookupFreshEntry_returnHit(self) -> None:
+        self._cache.set_many({'BTC': {'price': '1'}})
+        self._clock.now = 10
+
+        self.assertEqual(self._cache.lookup(['BTC']), ({'BTC': {'price': '1'}}, [], []))
+
+    def test_lookupStaleEntry_returnHitAndStaleId(self) -> None:
+        self._cache.set_many({'BTC': {'price': '1'}})
+        self._clock.now = 11
+
+        self.assertEqual(self._cache.lookup(['BTC']), ({'BTC': {'price': '1'}}, ['BTC'], []))
+
+    def test_lookupExpiredEntry_returnMissingButKeepItForPeek(self) -> None:
+        self._cache.set_many({'BTC': {'price': '1'}})
+        self._clock.now = 31
+
+        self.assertEqual(self._cache.lookup(['BTC']), ({}, [], ['BTC']))
+        self.assertEqual(self._cache.peek(['BTC', 'ETH']), {'BTC': {'price': '1'}})
+
+    def test_setManyOverMaxSize_evictLeastRecentlyUsed(self) -> None:
+        self._cache.set_many({'BTC': {}, 'ETH': {}, 'ADA': {}})
+        self._cache.lookup(['BTC'])
+        self._cache.set_many({'DOT': {}})
+
+        self.assertEqual(len(self._cache), 3)
+        self.assertEqual(self._cache.lookup(['ETH'])[2], ['ETH'])
+        self.assertEqual(self._cache.lookup(['BTC', 'ADA', 'DOT'])[2], [])
@@ -0,0 +1,116 @@
+import asyncio
+import unittest
+
+from app.nomicsapi.cache import PriceCache
+from app.nomicsapi.refresher import PriceRefresher
+from app.nomicsapi.service import CLIENT_OPTIONS, NomicsAPIHandler
+
+from tests.nomicsapi.server import PriceServer, TEST_PRICES
+from tests.nomicsapi.test_cache import FakeClock
+
+
+class PriceRefresherTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._server = PriceServer().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._server.stop()
+        super().tearDownClass()
+
+    async def asyncSetUp(self) -> None:
+        self._clock = FakeClock()
+        self._cache = PriceCache(ttl=10, stale_ttl=20, max_size=10, clock=self._clock)
+        self._handler = NomicsAPIHandler(
+            self._server.url,
+            'test-key',
+            cache=self._cache,
+            chunk_size=2,
+            **CLIENT_OPTIONS
+        )
+        self._assets = sorted(TEST_PRICES)
+
+    async def asyncTearDown(self) -> None:
+        await self._handler.close()
+
+    def _refresher(self, **kwargs) -> PriceRefresher:
+        async def get_assets() -> list[str]:
+            return self._assets
+
+        return PriceRefresher(self._handler, get_assets, clock=self._clock, **kwargs)
+
+    async def test_refresh_fillCacheInChunks(self) -> None:
+        refresher = self._refresher()
+        requests = self._server.requests
+
+        refreshed = await refresher.refresh()
+
+        self.assertEqual(refreshed, len(TEST_PRICES))
+        self.assertEqual(self._server.requests - requests, 2)
+        self.assertEqual(self._cache.lookup(self._assets)[2], [])
+
+    async def test_refresh_serveLookupsWithoutUpstreamCall(self) -> None:
+        await self._refresher().refresh()
+        requests = self._server.requests
+
+        await self._handler.get_asset_data(*self._assets)
+
+        self.assertEqual(self._server.requests, requests)
+
+    async def test_getLag_returnSecondsSinceLastRefresh(self) -> None:
+        refresher = self._refresher()
+        self.assertIsNone(refresher.lag)
+
+        self._clock.now = 100
+        await refresher.refresh()
+        self._clock.now = 112
+
+        self.assertEqual(refresher.status()['last_refresh_at'], 100)
+        self.assertEqual(refresher.lag, 12)
+
+    async def test_startAndStop_refreshPeriodically(self) -> None:
+        refresher = self._refresher(interval=0.01)
+
+        refresher.start()
+        # the first round opens the connections, wait for it instead of a fixed delay
+        for _ in range(100):
+            if refresher.last_refresh_at is not None:
+                break
+            await asyncio.sleep(0.01)
+        self.assertTrue(refresher.status()['running'])
+        await refresher.stop()
+
+        self.assertIsNotNone(refresher.last_refresh_at)
+        self.assertFalse(refresher.status()['running'])
+
+    async def test_runWithFailingSource_recordErrorAndKeepRunning(self) -> None:
+        async def get_assets() -> list[str]:
+            raise RuntimeError('database is down')
+
+        refresher = PriceRefresher(self._handler, get_assets, interval=0.01)
+
+        refresher.start()
+        await asyncio.sleep(0.05)
+        running = refresher.status()['running']
+        await refresher.stop()
+
+        self.assertTrue(running)
+        self.assertIn('database is down', refresher.last_error)
+        self.assertIsNone(refresher.last_refresh_at)
+
+    async def test_refresh_storeRefreshedPrices(self) -> None:
+        stored = []
+
+        async def store_prices(asset_data: dict, timestamp) -> int:
+            stored.append((asset_data, timestamp))
+            return len(asset_data)
+
+        async def get_assets() -> list[str]:
+            return self._assets
+
+        await PriceRefresher(self._handler, get_assets, store_prices).refresh()
+
+        self.assertEqual(len(stored), 1)
+        self.assertEqual(set(stored[0][0]), set(TEST_PRICES))
@@ -0,0 +1,314 @@
+import asyncio
+import unittest
+
+import httpx
+
+from app.nomicsapi.breaker import CircuitBreaker
+from app.nomicsapi.cache import PriceCache
+from app.nomicsapi.service import CLIENT_OPTIONS, NomicsAPIHandler
+
+from tests.nomicsapi.server import PriceServer, TEST_PRICES
+from tests.nomicsapi.test_cache import FakeClock
+
+
+class NomicsAPIHandlerTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._server = PriceServer().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._server.stop()
+        super().tearDownClass()
+
+    async def asyncSetUp(self) -> None:
+        self._handler = NomicsAPIHandler(self._server.url, 'test-key', **CLIENT_OPTIONS)
+
+    async def asyncTearDown(self) -> None:
+        await self._handler.close()
+
+    async def test_getAssetData_returnPriceAndLogoById(self) -> None:
+        asset_data = await self._handler.get_asset_data('BTC', 'ETH')
+
+        self.assertEqual(set(asset_data), {'BTC', 'ETH'})
+        self.assertEqual(asset_data['BTC']['price'], str(TEST_PRICES['BTC']))
+        self.assertIn('logo_url', asset_data['ETH'])
+
+    async def test_getAssetDataRepeatedly_reuseKeepAliveConnection(self) -> None:
+        connections = self._server.connections
+        for _ in range(5):
+            await self._handler.get_asset_data('ADA')
+
+        self.assertEqual(self._server.connections - connections, 1)
+
+    async def test_getClient_returnSameClientUntilClosed(self) -> None:
+        client = self._handler.client
+
+        self.assertIs(self._handler.open(), client)
+        await self._handler.close()
+        self.assertIsNot(self._handler.client, client)
+
+    async def test_closeUnopenedHandler_doNothing(self) -> None:
+        await self._handler.close()
+        await self._handler.close()
+
+
+class NomicsAPIHandlerCacheTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._server = PriceServer().start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._server.stop()
+        super().tearDownClass()
+
+    async def asyncSetUp(self) -> None:
+        self._clock = FakeClock()
+        self._cache = PriceCache(ttl=10, stale_ttl=20, max_size=10, clock=self._clock)
+        self._handler = NomicsAPIHandler(
+            self._server.url,
+            'test-key',
+            cache=self._cache,
+            **CLIENT_OPTIONS
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self._handler.close()
+
+    async def _settle(self) -> None:
+        await asyncio.gather(*self._handler._tasks)
+
+    async def test_getFreshAssetData_serveFromCache(self) -> None:
+        await self._handler.get_asset_data('BTC', 'ETH')
+        requests = self._server.requests
+
+        asset_data = await self._handler.get_asset_data('ETH', 'BTC')
+
+        self.assertEqual(list(asset_data), ['ETH', 'BTC'])
+        self.assertEqual(self._server.requests, requests)
+
+    async def test_getPartiallyCachedAssetData_fetchOnlyMissingIds(self) -> None:
+        await self._handler.get_asset_data('BTC')
+
+        asset_data = await self._handler.get_asset_data('BTC', 'ADA')
+
+        self.assertEqual(set(asset_data), {'BTC', 'ADA'})
+        self.assertEqual(len(self._cache), 2)
+
+    async def test_getStaleAssetData_serveStaleAndRefreshInBackground(self) -> None:
+        await self._handler.get_asset_data('BTC')
+        self._clock.now = 15
+        requests = self._server.requests
+
+        asset_data = await self._handler.get_asset_data('BTC')
+        await self._handler.get_asset_data('BTC')
+        await self._settle()
+
+        self.assertEqual(asset_data['BTC']['price'], str(TEST_PRICES['BTC']))
+        self.assertEqual(self._server.requests - requests, 1)
+        self.assertEqual(self._cache.lookup(['BTC'])[1], [])
+
+    async def test_getExpiredAssetData_fetchUpstream(self) -> None:
+        await self._handler.get_asset_data('BTC')
+        self._clock.now = 31
+        requests = self._server.requests
+
+        await self._handler.get_asset_data('BTC')
+
+        self.assertEqual(self._server.requests - requests, 1)
+        self.assertEqual(self._handler._tasks, set())
+
+
+class NomicsAPIHandlerCoalesceTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._server = PriceServer(delay=0.05).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._server.stop()
+        super().tearDownClass()
+
+    async def asyncSetUp(self) -> None:
+        self._handler = NomicsAPIHandler(
+            self._server.url,
+            'test-key',
+            coalesce_window=0.01,
+            **CLIENT_OPTIONS
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self._handler.close()
+
+    async def test_getConcurrentOverlappingLookups_mergeIntoOneUpstreamCall(self) -> None:
+        requests = self._server.requests
+
+        results = await asyncio.gather(
+            self._handler.get_asset_data('BTC', 'ETH'),
+            self._handler.get_asset_data('ETH', 'ADA'),
+            *(self._handler.get_asset_data('BTC') for _ in range(20))
+        )
+
+        self.assertEqual(self._server.requests - requests, 1)
+        self.assertEqual(set(results[0]), {'BTC', 'ETH'})
+        self.assertEqual(set(results[1]), {'ETH', 'ADA'})
+        self.assertEqual(results[2]['BTC']['price'], str(TEST_PRICES['BTC']))
+
+    async def test_getLookupDuringUpstreamCall_joinInFlightCall(self) -> None:
+        requests = self._server.requests
+        first_lookup = asyncio.create_task(self._handler.get_asset_data('BTC'))
+        await asyncio.sleep(0.03)
+
+        second_asset_data = await self._handler.get_asset_data('BTC')
+
+        self.assertEqual(await first_lookup, second_asset_data)
+        self.assertEqual(self._server.requests - requests, 1)
+
+    async def test_getCancelledWaiter_keepSharedLookupForOthers(self) -> None:
+        cancelled_lookup = asyncio.create_task(self._handler.get_asset_data('ADA'))
+        lookup = asyncio.create_task(self._handler.get_asset_data('ADA'))
+        await asyncio.sleep(0)
+        cancelled_lookup.cancel()
+
+        self.assertIn('ADA', await lookup)
+
+    async def test_getUnknownId_leaveItOut(self) -> None:
+        self.assertEqual(await self._handler.get_asset_data('FOO'), {})
+
+    async def test_getUpstreamError_raiseForEveryWaiter(self) -> None:
+        handler = NomicsAPIHandler('http://127.0.0.1:1/ticker', 'test-key', **CLIENT_OPTIONS)
+        try:
+            results = await asyncio.gather(
+                handler.get_asset_data('BTC'),
+                handler.get_asset_data('BTC', 'ETH'),
+                return_exceptions=True
+            )
+        finally:
+            await handler.close()
+
+        for result in results:
+            self.assertIsInstance(result, httpx.HTTPError)
+        self.assertEqual(handler._in_flight, {})
+
+
+class NomicsAPIHandlerChunkTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._prices = {f'COIN{index}': index for index in range(10)}
+        cls._server = PriceServer(prices=cls._prices, delay=0.02, failing_ids={'COIN9'}).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._server.stop()
+        super().tearDownClass()
+
+    async def asyncSetUp(self) -> None:
+        self._handler = NomicsAPIHandler(
+            self._server.url,
+            'test-key',
+            chunk_size=2,
+            max_concurrency=2,
+            **CLIENT_OPTIONS
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self._handler.close()
+
+    async def test_getManyIds_fetchConcurrentChunksWithinCap(self) -> None:
+        requests = self._server.requests
+        ids = [f'COIN{index}' for index in range(8)]
+
+        asset_data = await self._handler.get_asset_data(*ids)
+
+        self.assertEqual(list(asset_data), ids)
+        self.assertEqual(self._server.requests - requests, 4)
+        self.assertEqual(self._server.max_active, 2)
+
+    async def test_lookupWithFailingChunk_returnRestAndMissingIds(self) -> None:
+        asset_data, missing, prices_stale = await self._handler.lookup(
+            'COIN0', 'COIN1', 'COIN8', 'COIN9'
+        )
+
+        self.assertEqual(set(asset_data), {'COIN0', 'COIN1'})
+        self.assertEqual(missing, ['COIN8', 'COIN9'])
+        self.assertTrue(prices_stale)
+
+    async def test_lookupWithEveryChunkFailing_returnEveryIdMissing(self) -> None:
+        self.assertEqual(await self._handler.lookup('COIN9'), ({}, ['COIN9'], True))
+
+    async def test_getAssetDataWithEveryChunkFailing_raiseHTTPError(self) -> None:
+        with self.assertRaises(httpx.HTTPStatusError):
+            await self._handler.get_asset_data('COIN9')
+
+
+class NomicsAPIHandlerDegradedTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._server = PriceServer(delay=0.2).start()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls._server.stop()
+        super().tearDownClass()
+
+    async def asyncSetUp(self) -> None:
+        self._clock = FakeClock()
+        self._cache = PriceCache(ttl=10, stale_ttl=20, max_size=10, clock=self._clock)
+        self._breaker = CircuitBreaker(
+            failure_threshold=1,
+            slow_call_threshold=0.1,
+            reset_timeout=60,
+            clock=self._clock
+        )
+        self._handler = NomicsAPIHandler(
+            self._server.url,
+            'test-key',
+            cache=self._cache,
+            breaker=self._breaker,
+            **CLIENT_OPTIONS
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self._handler.close()
+
+    async def test_lookupSlowProvider_returnWithinTimeoutAndWarmCacheLater(self) -> None:
+        asset_data, missing, prices_stale = await self._handler.lookup('BTC', timeout=0.05)
+
+        self.assertEqual((asset_data, missing, prices_stale), ({}, ['BTC'], True))
+        await asyncio.gather(*self._handler._tasks)
+        self.assertEqual(self._cache.lookup(['BTC'])[2], [])
+
+    async def test_lookupWithOpenCircuit_serveExpiredCachedPrices(self) -> None:
+        await self._handler.get_asset_data('BTC')
+        self.assertEqual(self._breaker.state, CircuitBreaker.OPEN)
+        self._clock.now = 45
+        requests = self._server.requests
+
+        asset_data, missing, prices_stale = await self._handler.lookup('BTC', 'ETH', timeout=1)
+
+        self.assertEqual(set(asset_data), {'BTC'})
+        self.assertEqual(missing, ['ETH'])
+        self.assertTrue(prices_stale)
+        self.assertEqual(self._server.requests, requests)
+
+    async def test_closeDuringUpstreamCall_keepCircuitClosed(self) -> None:
+        task = asyncio.create_task(self._handler.get_asset_data('BTC'))
+        await asyncio.sleep(0.05)
+        await self._handler.close()
+        await asyncio.gather(task, return_exceptions=True)
+
+        self.assertEqual(self._breaker.state, CircuitBreaker.CLOSED)
+
+    async def test_lookupFreshPrices_notStale(self) -> None:
+        self._cache.set_many({'BTC': {'price': '1', 'logo_url': ''}})
+
+        self.assertEqual(
+            await self._handler.lookup('BTC'),
+            ({'BTC': {'price': '1', 'logo_url': ''}}, [], False)
+        )
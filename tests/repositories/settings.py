@@ -9,3 +9,7 @@ TEST_TRANSACTION_COLLECTION = 'test_transactions'
 
 TEST_WALLET_CONN = MongoClient()
 TEST_WALLET_COLLECTION = 'test_wallets'
+
+
+TEST_SNAPSHOT_COLLECTION = 'test_portfolio_snapshots'
+TEST_PRICE_COLLECTION = 'test_prices'
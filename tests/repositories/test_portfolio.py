@@ -0,0 +1,223 @@
+import unittest
+
+from copy import deepcopy
+
+from app.database.service import CRUDService
+from app.repositories.portfolio import PortfolioSnapshotRepository
+from app.repositories.transaction import TransactionRepository
+from app.serializers.transaction import TransactionSerializer
+
+from tests.consts import TEST_VALID_TRANSACTIONS, TEST_PORTFOLIO
+
+from tests.repositories.settings import \
+    TEST_TRANSACTION_CONN, \
+    TEST_TRANSACTION_COLLECTION, \
+    TEST_SNAPSHOT_COLLECTION
+
+
+TEST_OWNER_ID = 'e5e403a76c58de3a4c2b5f16'
+
+
+class PortfolioSnapshotTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self._TEST_VALID_TRANSACTIONS = deepcopy(TEST_VALID_TRANSACTIONS)
+
+        self._crud_service = CRUDService(
+            TEST_TRANSACTION_CONN,
+            TEST_TRANSACTION_COLLECTION
+        )
+        self._snapshot_crud_service = CRUDService(
+            TEST_TRANSACTION_CONN,
+            TEST_SNAPSHOT_COLLECTION
+        )
+        self._snapshot_repository = PortfolioSnapshotRepository(
+            self._snapshot_crud_service,
+            self._crud_service
+        )
+        self._repository = TransactionRepository(
+            crud_service=self._crud_service,
+            file_processor=None,
+            serializer=TransactionSerializer(),
+            snapshot_repository=self._snapshot_repository
+        )
+
+        self._transactions = [
+            self._repository.create(transaction)
+            for transaction in self._TEST_VALID_TRANSACTIONS
+        ]
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        TEST_TRANSACTION_CONN.local[TEST_TRANSACTION_COLLECTION].drop()
+        TEST_TRANSACTION_CONN.local[TEST_SNAPSHOT_COLLECTION].drop()
+
+    def _assertSnapshotMatchesTransactions(self) -> None:
+        portfolio = self._snapshot_repository.get_by_owner_id(TEST_OWNER_ID)
+        test_portfolio = self._repository.calculate_portfolio(
+            include_transactions=True,
+            owner_id=TEST_OWNER_ID
+        )
+
+        self.assertEqual(set(portfolio), set(test_portfolio))
+        if not portfolio:
+            return
+
+        self.assertAlmostEqual(portfolio['investment'], test_portfolio['investment'])
+        self.assertEqual(set(portfolio['assets']), set(test_portfolio['assets']))
+        for asset, asset_data in portfolio['assets'].items():
+            for key, value in asset_data['meta'].items():
+                self.assertAlmostEqual(
+                    value,
+                    test_portfolio['assets'][asset]['meta'][key]
+                )
+
+    def test_getNonExistsOwner_returnNone(self) -> None:
+        self.assertIsNone(
+            self._snapshot_repository.get_by_owner_id('61f5b2c4a3ed85c67a304e5e')
+        )
+
+    def test_create_applyTransactionsToSnapshot(self) -> None:
+        portfolio = self._repository.calculate_portfolio(owner_id=TEST_OWNER_ID)
+
+        self.assertAlmostEqual(portfolio['investment'], TEST_PORTFOLIO['investment'])
+        self._assertSnapshotMatchesTransactions()
+
+    def test_getHeldAssets_returnAssetsOfEveryOwner(self) -> None:
+        self._repository.create({
+            **deepcopy(TEST_VALID_TRANSACTIONS[0]),
+            'owner_id': '61f5b2c4a3ed85c67a304e5e',
+            'asset': 'DOT'
+        })
+        self._repository.delete_by_id(self._transactions[1]['id'])
+
+        self.assertEqual(self._snapshot_repository.get_held_assets(), ['BTC', 'DOT'])
+
+    def test_createMany_applyBatchToSnapshot(self) -> None:
+        self._repository.create_many(deepcopy(TEST_VALID_TRANSACTIONS), batch_size=2)
+
+        self._assertSnapshotMatchesTransactions()
+
+    def test_updateById_reverseAndReapplyTransaction(self) -> None:
+        self._repository.update_by_id(
+            self._transactions[0]['id'],
+            {'type': 'sell', 'amount': 0.1}
+        )
+        self._repository.update_by_id(
+            self._transactions[1]['id'],
+            {'asset': 'ADA'}
+        )
+
+        self._assertSnapshotMatchesTransactions()
+
+    def test_deleteById_reverseTransaction(self) -> None:
+        self._repository.delete_by_id(self._transactions[1]['id'])
+        portfolio = self._repository.calculate_portfolio(owner_id=TEST_OWNER_ID)
+
+        self.assertNotIn('ETH', portfolio['assets'])
+        self._assertSnapshotMatchesTransactions()
+
+    def test_deleteAll_returnEmptyPortfolio(self) -> None:
+        for transaction in self._transactions:
+            self._repository.delete_by_id(transaction['id'])
+
+        self.assertEqual(
+            self._repository.calculate_portfolio(owner_id=TEST_OWNER_ID),
+            {}
+        )
+
+    def test_rebuild_repairDrift(self) -> None:
+        self._snapshot_crud_service.increment_by_id(
+            TEST_OWNER_ID,
+            **{'assets.BTC.amount': 42, 'assets.DOGE.count': 1}
+        )
+        self._snapshot_crud_service.increment_by_id(
+            '61f5b2c4a3ed85c67a304e5e',
+            **{'assets.BTC.count': 1}
+        )
+
+        rebuilt = self._snapshot_repository.rebuild()
+
+        self.assertEqual(rebuilt, 1)
+        self.assertIsNone(
+            self._snapshot_repository.get_by_owner_id('61f5b2c4a3ed85c67a304e5e')
+        )
+        self._assertSnapshotMatchesTransactions()
+
+    def test_rebuildOwner_repairOwnerDrift(self) -> None:
+        self._snapshot_crud_service.increment_by_id(
+            TEST_OWNER_ID,
+            **{'assets.ETH.investment': 42}
+        )
+
+        self._snapshot_repository.rebuild(owner_id=TEST_OWNER_ID)
+
+        self._assertSnapshotMatchesTransactions()
+
+    def _createWithoutSnapshots(self) -> TransactionRepository:
+        TEST_TRANSACTION_CONN.local[TEST_SNAPSHOT_COLLECTION].drop()
+        repository = TransactionRepository(
+            crud_service=self._crud_service,
+            file_processor=None,
+            serializer=TransactionSerializer()
+        )
+        repository.create_many(deepcopy(TEST_VALID_TRANSACTIONS))
+        return repository
+
+    def test_createWithoutSnapshot_rebuildFromTransactions(self) -> None:
+        self._createWithoutSnapshots()
+
+        self._repository.create(deepcopy(TEST_VALID_TRANSACTIONS[0]))
+
+        self._assertSnapshotMatchesTransactions()
+
+    def test_updateAndDeleteWithoutSnapshot_rebuildFromTransactions(self) -> None:
+        self._createWithoutSnapshots()
+        self._repository.update_by_id(self._transactions[0]['id'], {'amount': 0.1})
+        self._assertSnapshotMatchesTransactions()
+
+        TEST_TRANSACTION_CONN.local[TEST_SNAPSHOT_COLLECTION].drop()
+        self._repository.delete_by_id(self._transactions[1]['id'])
+        self._assertSnapshotMatchesTransactions()
+
+    def test_backfill_buildMissingSnapshots(self) -> None:
+        self._createWithoutSnapshots()
+
+        self.assertEqual(self._snapshot_repository.backfill(), 1)
+        self.assertEqual(self._snapshot_repository.backfill(), 0)
+        self.assertEqual(self._snapshot_repository.get_held_assets(), ['BTC', 'ETH'])
+        self._assertSnapshotMatchesTransactions()
+
+    def test_concurrentFirstWrites_countEveryTransactionOnce(self) -> None:
+        owner_id = '61f5b2c4a3ed85c67a304e5e'
+        transactions = [
+            TransactionRepository._validate_new({
+                **deepcopy(TEST_VALID_TRANSACTIONS[0]),
+                'owner_id': owner_id
+            })
+            for _ in range(2)
+        ]
+
+        # both writers ensure the snapshot before either transaction is stored
+        for _ in transactions:
+            self._snapshot_repository.ensure(owner_id)
+        stored_transactions = [
+            self._crud_service.create_and_return(transaction) for transaction in transactions
+        ]
+        for transaction in stored_transactions:
+            self._snapshot_repository.apply(transaction)
+
+        asset = TEST_VALID_TRANSACTIONS[0]['asset'].upper()
+        self.assertAlmostEqual(
+            self._snapshot_repository.get_by_owner_id(owner_id)['assets'][asset]['meta']['amount'],
+            2 * TEST_VALID_TRANSACTIONS[0]['amount']
+        )
+
+    def test_ensureExistingSnapshot_keepSnapshot(self) -> None:
+        self._snapshot_crud_service.increment_by_id(TEST_OWNER_ID, **{'assets.BTC.amount': 42})
+        snapshot = self._snapshot_crud_service.get_by_id(TEST_OWNER_ID)
+
+        self._snapshot_repository.ensure(TEST_OWNER_ID)
+
+        self.assertEqual(self._snapshot_crud_service.get_by_id(TEST_OWNER_ID), snapshot)
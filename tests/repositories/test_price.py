@@ -0,0 +1,223 @@
+import os
+import tempfile
+import unittest
+
+from datetime import datetime, timezone
+from pymongo.errors import BulkWriteError
+
+from app.database.service import CRUDService
+from app.repositories.price import PriceRepository
+
+from tests.repositories.settings import \
+    TEST_TRANSACTION_CONN, \
+    TEST_PRICE_COLLECTION
+
+
+TEST_PRICES = [
+    {'asset': 'btc', 'timestamp': '2022-02-01', 'price': '38000'},
+    {'asset': 'BTC', 'timestamp': '2022-02-02', 'price': 38500.5},
+    {'asset': 'BTC', 'timestamp': '2022-02-04', 'price': 41000},
+    {'asset': 'ETH', 'timestamp': '2022-02-02', 'price': 2700},
+]
+
+
+class PriceRepositoryBucketTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._repository = PriceRepository(None, bucket_seconds=2 * 24 * 60 * 60)
+
+    def test_bucketPoints_groupPricesByAssetAndBucket(self) -> None:
+        prices = [PriceRepository._validate_new(price) for price in TEST_PRICES]
+
+        buckets = self._repository._bucket_points(prices)
+
+        self.assertEqual(
+            [(asset, start, len(points)) for (asset, start), points in buckets.items()],
+            [
+                ('BTC', datetime(2022, 2, 1), 2),
+                ('BTC', datetime(2022, 2, 3), 1),
+                ('ETH', datetime(2022, 2, 1), 1),
+            ]
+        )
+
+    def test_bucketUpdates_upsertOnePipelinePerBucket(self) -> None:
+        prices = [PriceRepository._validate_new(price) for price in TEST_PRICES]
+
+        updates = self._repository._bucket_updates(prices)
+
+        self.assertEqual(
+            [query for query, _ in updates],
+            [
+                {'asset': 'BTC', 'start': datetime(2022, 2, 1)},
+                {'asset': 'BTC', 'start': datetime(2022, 2, 3)},
+                {'asset': 'ETH', 'start': datetime(2022, 2, 1)},
+            ]
+        )
+        self.assertTrue(all(isinstance(update, list) for _, update in updates))
+
+    def test_dedupe_keepLastPriceOfTimestamp(self) -> None:
+        prices = [
+            PriceRepository._validate_new(price)
+            for price in [*TEST_PRICES, {**TEST_PRICES[0], 'price': 1}]
+        ]
+
+        deduped = PriceRepository._dedupe(prices)
+
+        self.assertEqual(len(deduped), 4)
+        self.assertEqual(deduped[0]['price'], 1.0)
+
+    def test_duplicateUpdates_retryOnlyLostBucketRaces(self) -> None:
+        updates = self._repository._bucket_updates(
+            [PriceRepository._validate_new(price) for price in TEST_PRICES]
+        )
+        duplicate = BulkWriteError({'writeErrors': [{'index': 1, 'code': 11000}]})
+        other = BulkWriteError({'writeErrors': [
+            {'index': 0, 'code': 11000},
+            {'index': 1, 'code': 121}
+        ]})
+
+        self.assertEqual(PriceRepository._duplicate_updates(updates, duplicate), [updates[1]])
+        self.assertEqual(PriceRepository._duplicate_updates(updates, other), [])
+
+    def test_validateNewAwareTimestamp_storeNaiveUTC(self) -> None:
+        price = PriceRepository._validate_new({
+            'asset': 'BTC',
+            'timestamp': datetime(2022, 2, 1, 12, tzinfo=timezone.utc),
+            'price': 1
+        })
+
+        self.assertEqual(price['timestamp'], datetime(2022, 2, 1, 12))
+
+    def test_validateNewWrongKeys_raiseValueError(self) -> None:
+        self.assertRaises(ValueError, PriceRepository._validate_new, {'asset': 'BTC'})
+
+    def test_pointAt_fallBackToPreviousBucket(self) -> None:
+        buckets = [
+            {'points': [{'timestamp': datetime(2022, 2, 3, 12), 'price': 2}]},
+            {'points': [{'timestamp': datetime(2022, 2, 1), 'price': 1}]},
+        ]
+
+        self.assertEqual(
+            PriceRepository._point_at('BTC', buckets, datetime(2022, 2, 3)),
+            {'asset': 'BTC', 'timestamp': datetime(2022, 2, 1), 'price': 1}
+        )
+
+
+class PriceRepositoryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._repository = PriceRepository(
+            CRUDService(TEST_TRANSACTION_CONN, TEST_PRICE_COLLECTION),
+            bucket_seconds=2 * 24 * 60 * 60
+        )
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        TEST_TRANSACTION_CONN.local[TEST_PRICE_COLLECTION].drop()
+
+    def test_addMany_storeNormalizedPrices(self) -> None:
+        self.assertEqual(self._repository.add_many(TEST_PRICES), 4)
+
+        self.assertEqual(
+            self._repository.get_range('btc', datetime(2022, 2, 1), datetime(2022, 2, 1)),
+            [{'asset': 'BTC', 'timestamp': datetime(2022, 2, 1), 'price': 38000.0}]
+        )
+
+    def test_addManyTwice_appendToBuckets(self) -> None:
+        self._repository.add_many(TEST_PRICES[:1])
+        self._repository.add_many([{**TEST_PRICES[0], 'timestamp': '2022-01-31'}])
+
+        self.assertEqual(
+            [
+                price['timestamp'].day
+                for price in self._repository.get_range(
+                    'BTC', datetime(2022, 1, 1), datetime(2022, 2, 1)
+                )
+            ],
+            [31, 1]
+        )
+
+    def test_addManyDuplicateTimestamps_storeOnePoint(self) -> None:
+        self.assertEqual(self._repository.add_many([*TEST_PRICES, TEST_PRICES[1]]), 4)
+
+        self.assertEqual(
+            len(self._repository.get_range('BTC', datetime(2022, 2, 2), datetime(2022, 2, 2))),
+            1
+        )
+
+    def test_addManyAcrossWrites_storeOnePointWithLastPrice(self) -> None:
+        self._repository.add_many(TEST_PRICES)
+        self._repository.add_many([*TEST_PRICES[:2], {**TEST_PRICES[1], 'price': 1}])
+
+        self.assertEqual(
+            self._repository.get_range('BTC', datetime(2022, 2, 1), datetime(2022, 2, 4)),
+            [
+                {'asset': 'BTC', 'timestamp': datetime(2022, 2, 1), 'price': 38000.0},
+                {'asset': 'BTC', 'timestamp': datetime(2022, 2, 2), 'price': 1.0},
+                {'asset': 'BTC', 'timestamp': datetime(2022, 2, 4), 'price': 41000.0},
+            ]
+        )
+
+    def test_getRangeMany_returnPricesOrderedByAssetAndTime(self) -> None:
+        self._repository.add_many(TEST_PRICES)
+
+        prices = self._repository.get_range_many(
+            ['BTC', 'ETH'],
+            datetime(2022, 2, 2),
+            datetime(2022, 2, 28)
+        )
+
+        self.assertEqual(
+            [(price['asset'], price['timestamp'].day) for price in prices],
+            [('BTC', 2), ('BTC', 4), ('ETH', 2)]
+        )
+
+    def test_getAt_returnLastPriceAtOrBeforeTimestamp(self) -> None:
+        self._repository.add_many(TEST_PRICES)
+
+        self.assertEqual(
+            self._repository.get_at('BTC', datetime(2022, 2, 3))['price'],
+            38500.5
+        )
+        self.assertIsNone(self._repository.get_at('BTC', datetime(2022, 1, 31)))
+
+    def test_addQuotes_storeTickerPrices(self) -> None:
+        self._repository.add_quotes(
+            {'BTC': {'price': '43000.5', 'logo_url': ''}},
+            datetime(2022, 3, 1, 12, tzinfo=timezone.utc)
+        )
+
+        self.assertEqual(
+            self._repository.get_at('BTC', datetime(2022, 3, 2))['price'],
+            43000.5
+        )
+
+    def test_loadCsv_storeEveryRowInBatches(self) -> None:
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('asset,timestamp,price\n')
+            for price in TEST_PRICES:
+                file.write(f"{price['asset']},{price['timestamp']},{price['price']}\n")
+        try:
+            loaded = self._repository.load_csv(file.name, batch_size=3)
+        finally:
+            os.remove(file.name)
+
+        self.assertEqual(loaded, 4)
+        self.assertEqual(len(self._repository.get_range_many(
+            ['BTC', 'ETH'], datetime(2022, 1, 1), datetime(2022, 3, 1)
+        )), 4)
+
+    def test_getRangeSeries_returnColumnsPerAsset(self) -> None:
+        self._repository.add_many(TEST_PRICES)
+
+        series = self._repository.get_range_series(
+            ['BTC', 'ETH'],
+            datetime(2022, 2, 2),
+            datetime(2022, 2, 28)
+        )
+
+        self.assertEqual(series['BTC']['prices'], [38500.5, 41000.0])
+        self.assertEqual(
+            series['ETH']['timestamps'],
+            [int(datetime(2022, 2, 2, tzinfo=timezone.utc).timestamp() * 1000)]
+        )
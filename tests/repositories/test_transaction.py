@@ -1,11 +1,23 @@
+import asyncio
+import io
+import random
 import unittest
 
 from bson import ObjectId
 from bson.errors import InvalidId
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-
-from app.database.service import CRUDService
-from app.repositories.transaction import TransactionRepository
+from datetime import datetime
+from fastapi import UploadFile
+from pymongo import AsyncMongoClient
+from pymongo.errors import BulkWriteError
+
+from app import settings
+from app.costbasis.service import calculate_cost_basis
+from app.database.service import AsyncCRUDService, CRUDService
+from app.fileprocessor.service import TransactionFileProcessor
+from app.repositories.transaction import AsyncTransactionRepository, TransactionRepository
+from app.schemas.transaction import parse_date
 from app.serializers.transaction import TransactionSerializer
 
 from tests.consts import \
@@ -20,6 +32,54 @@ from tests.repositories.settings import \
 from tests.utils import tag
 
 
+def build_portfolio(transactions: list[dict]) -> dict:
+    """
+    The original per-transaction implementation, kept as the reference both the aggregation
+    and the batch implementations are checked against
+    """
+    if not transactions:
+        return {}
+
+    portfolio = {
+        'investment': 0,
+        'assets': {}
+    }
+    # group by assets
+    for transaction in transactions:
+        asset_data = portfolio['assets'].setdefault(
+            transaction['asset'].upper(),
+            {
+                'meta': {},
+                'transactions': []
+            }
+        )
+        asset_data['transactions'].append(transaction)
+
+    # calculate amount by asset
+    # calculate investment by assets and overall
+    # calculate avg price by asset
+    for asset_data in portfolio['assets'].values():
+        asset_amount = 0
+        asset_investment = 0
+        for transaction in asset_data['transactions']:
+            if transaction['type'] == 'buy':
+                asset_amount += transaction['amount']
+                asset_investment += \
+                    transaction['amount'] * transaction['historical_price']
+            else:
+                asset_amount -= transaction['amount']
+
+        asset_data['meta']['amount'] = asset_amount
+        asset_data['meta']['investment'] = asset_investment
+        if asset_amount != 0:
+            asset_data['meta']['average_price'] = asset_investment / asset_amount
+        else:
+            asset_data['meta']['average_price'] = 0
+        portfolio['investment'] += asset_investment
+
+    return portfolio
+
+
 class TransactionRepositoryCreateTest(unittest.TestCase):
     def setUp(self) -> None:
         super().setUp()
@@ -71,10 +131,20 @@ class TransactionRepositoryCreateTest(unittest.TestCase):
             test_transaction
         )
 
+    def test_getFieldPathAsset_raiseValueError(self) -> None:
+        for asset in ['usdc.e', '$BTC']:
+            self.assertRaises(
+                ValueError,
+                self._repository.create,
+                {**self._TEST_VALID_TRANSACTIONS[0], 'asset': asset}
+            )
+        self.assertEqual(self._crud_service.get_all(), [])
+
     def test_getValidTransactionData_returnSerializedData(self) -> None:
         test_transaction = self._TEST_VALID_TRANSACTIONS[0]
         new_serialized_transaction = self._repository.create(test_transaction)
         test_transaction['_id'] = ObjectId(new_serialized_transaction['id'])
+        test_transaction['date'] = parse_date(test_transaction['date'])
         test_serialized_transaction = self._serializer.serialize_one(test_transaction)
         self.assertEqual(test_serialized_transaction, new_serialized_transaction)
 
@@ -176,6 +246,202 @@ class TransactionRepositoryGetAllTest(unittest.TestCase):
         self.assertEqual(test_transactions, transactions)
 
 
+class TransactionRepositoryGetPageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self._crud_service = CRUDService(
+            TEST_TRANSACTION_CONN,
+            TEST_TRANSACTION_COLLECTION
+        )
+        self._repository = TransactionRepository(
+            crud_service=self._crud_service,
+            file_processor=None,
+            serializer=TransactionSerializer()
+        )
+        for transaction in deepcopy(TEST_VALID_TRANSACTIONS) * 3:
+            self._crud_service.create(transaction)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        TEST_TRANSACTION_CONN.local[TEST_TRANSACTION_COLLECTION].drop()
+
+    def test_getPages_returnEveryTransactionOnceInSortOrder(self) -> None:
+        page = self._repository.get_page(4, owner_id='e5e403a76c58de3a4c2b5f16')
+        transactions = page['data']
+        while page['next_cursor']:
+            page = self._repository.get_page(
+                4,
+                page['next_cursor'],
+                owner_id='e5e403a76c58de3a4c2b5f16'
+            )
+            transactions += page['data']
+
+        self.assertEqual(len(transactions), 9)
+        self.assertEqual(
+            len({transaction['id'] for transaction in transactions}),
+            9
+        )
+        self.assertEqual(
+            [(t['date'], t['id']) for t in transactions],
+            sorted([(t['date'], t['id']) for t in transactions], reverse=True)
+        )
+
+    def test_getNonExistsOwner_returnEmptyPage(self) -> None:
+        self.assertEqual(
+            self._repository.get_page(4, owner_id='61f5b2c4a3ed85c67a304e5e'),
+            {'data': [], 'next_cursor': None}
+        )
+
+
+class TransactionRepositoryDateTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self._crud_service = CRUDService(
+            TEST_TRANSACTION_CONN,
+            TEST_TRANSACTION_COLLECTION
+        )
+        self._repository = TransactionRepository(
+            crud_service=self._crud_service,
+            file_processor=None,
+            serializer=TransactionSerializer()
+        )
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        TEST_TRANSACTION_CONN.local[TEST_TRANSACTION_COLLECTION].drop()
+
+    def test_create_storeNativeDate(self) -> None:
+        transaction = self._repository.create(deepcopy(TEST_VALID_TRANSACTIONS[0]))
+        stored_transaction = self._crud_service.get_by_id(transaction['id'])
+
+        self.assertEqual(stored_transaction['date'], datetime(2022, 2, 4))
+
+    def test_updateById_storeNativeDate(self) -> None:
+        transaction = self._repository.create(deepcopy(TEST_VALID_TRANSACTIONS[0]))
+        updated_transaction = self._repository.update_by_id(
+            transaction['id'],
+            {'date': '2022-03-01'}
+        )
+
+        self.assertEqual(updated_transaction['date'], datetime(2022, 3, 1))
+        self.assertEqual(
+            self._crud_service.get_by_id(transaction['id'])['date'],
+            datetime(2022, 3, 1)
+        )
+
+    def test_getAllSortedByDate_returnLatestFirst(self) -> None:
+        for transaction in deepcopy(TEST_VALID_TRANSACTIONS):
+            self._repository.create(transaction)
+
+        transactions = self._repository.get_all_sorted_by_date(
+            owner_id='e5e403a76c58de3a4c2b5f16'
+        )
+
+        self.assertEqual(
+            [transaction['date'] for transaction in transactions],
+            [datetime(2022, 2, 21), datetime(2022, 2, 4), datetime(2022, 2, 4)]
+        )
+
+    def test_migrateStringDates_convertOnlyStringDates(self) -> None:
+        for transaction in deepcopy(TEST_VALID_TRANSACTIONS):
+            self._crud_service.create(transaction)
+        self._repository.create(deepcopy(TEST_VALID_TRANSACTIONS[0]))
+
+        migrated = self._repository.migrate_string_dates(batch_size=2)
+
+        self.assertEqual(migrated, 3)
+        self.assertEqual(
+            sorted(transaction['date'] for transaction in self._crud_service.get_all()),
+            [datetime(2022, 2, 4)] * 3 + [datetime(2022, 2, 21)]
+        )
+
+
+class TransactionRepositoryCreateManyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self._crud_service = CRUDService(
+            TEST_TRANSACTION_CONN,
+            TEST_TRANSACTION_COLLECTION
+        )
+        self._repository = TransactionRepository(
+            crud_service=self._crud_service,
+            file_processor=None,
+            serializer=TransactionSerializer()
+        )
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        TEST_TRANSACTION_CONN.local[TEST_TRANSACTION_COLLECTION].drop()
+
+    def test_getValidTransactions_insertEveryBatch(self) -> None:
+        result = self._repository.create_many(deepcopy(TEST_VALID_TRANSACTIONS), batch_size=2)
+
+        self.assertEqual(result, {'inserted': 3, 'errors': []})
+        self.assertEqual(len(self._crud_service.get_all()), 3)
+        for transaction in self._crud_service.get_all():
+            self.assertIsInstance(transaction['date'], datetime)
+
+    def test_getInvalidTransactions_reportRowsAndInsertTheRest(self) -> None:
+        transactions = [
+            deepcopy(TEST_VALID_TRANSACTIONS[0]),
+            deepcopy(TEST_INVALID_TRANSACTIONS[0]),
+            {'foo': 'bar'},
+            deepcopy(TEST_VALID_TRANSACTIONS[1]),
+        ]
+
+        result = self._repository.create_many(transactions, row_numbers=[2, 3, 4, 5])
+
+        self.assertEqual(result['inserted'], 2)
+        self.assertEqual([error['row'] for error in result['errors']], [3, 4])
+        self.assertEqual(len(self._crud_service.get_all()), 2)
+
+    def test_getDuplicateId_reportRejectedRow(self) -> None:
+        stored_transaction = self._repository.create(deepcopy(TEST_VALID_TRANSACTIONS[0]))
+        duplicate_id = ObjectId(stored_transaction['id'])
+
+        documents, document_rows, _ = self._repository._validate_many(
+            deepcopy(TEST_VALID_TRANSACTIONS[1:]),
+            [1, 2]
+        )
+        documents[0]['_id'] = duplicate_id
+        try:
+            self._crud_service.create_many(documents)
+            write_error = None
+        except BulkWriteError as error:
+            write_error = error
+        inserted, errors = self._repository._split_inserted(documents, document_rows, write_error)
+
+        self.assertEqual(len(inserted), 1)
+        self.assertEqual([error['row'] for error in errors], [1])
+
+
+class TransactionRepositoryImportCsvTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self._connection = AsyncMongoClient()
+        self._repository = AsyncTransactionRepository(
+            crud_service=AsyncCRUDService(self._connection, TEST_TRANSACTION_COLLECTION),
+            file_processor=TransactionFileProcessor(),
+            serializer=TransactionSerializer()
+        )
+
+    async def asyncTearDown(self) -> None:
+        await self._connection.local[TEST_TRANSACTION_COLLECTION].drop()
+        await self._connection.close()
+
+    async def test_importFileBrokenOffMidway_reportImportedRowsAndReason(self) -> None:
+        content = b'BTC,1,100,2022-2-1,buy\nETH,"' + b'x' * (settings.IMPORT_MAX_RECORD_SIZE * 2)
+        file = UploadFile(file=io.BytesIO(content), filename='transactions.csv')
+
+        result = await self._repository.import_csv(file, TEST_VALID_TRANSACTIONS[0]['owner_id'], 1)
+
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(result['aborted'], 'record is too long')
+        self.assertEqual(len(await self._repository.get_all()), 1)
+
+
 class TransactionRepositoryGetAllByAssetTest(unittest.TestCase):
     def setUp(self) -> None:
         super().setUp()
@@ -239,6 +505,19 @@ class TransactionRepositoryGetAllByAssetTest(unittest.TestCase):
         self.assertEqual(len(transactionss_btc), 2)
         self.assertListEqual(transactionss_btc, test_transactions_btc)
 
+    def test_getOtherOwner_returnOnlyOwnerTransactions(self) -> None:
+        self._crud_service.create({
+            **deepcopy(TEST_VALID_TRANSACTIONS[1]),
+            'owner_id': '61f5b2c4a3ed85c67a304e5e'
+        })
+
+        self.assertEqual(len(self._repository.get_all_by_asset('ETH')), 2)
+        transactions_eth, = self._repository.get_all_by_asset(
+            'ETH',
+            owner_id=TEST_VALID_TRANSACTIONS[1]['owner_id']
+        )
+        self.assertEqual(transactions_eth['id'], str(self._test_items_id[1]))
+
 
 class TransactionRepositoryGetAllByTagTest(unittest.TestCase):
     def setUp(self) -> None:
@@ -391,6 +670,14 @@ class TransactionRepositoryUpdateByIdTest(unittest.TestCase):
             {'foo': 'bar'}
         )
 
+    def test_getExistsIdWithFieldPathAsset_raiseValueError(self) -> None:
+        self.assertRaises(
+            ValueError,
+            self._repository.update_by_id,
+            self._test_items_id[0],
+            {'asset': 'usdc.e'}
+        )
+
     def test_getExistsId_returnUpdatedSerializedData(self) -> None:
         updated_transaction = self._repository.update_by_id(
             self._test_items_id[0],
@@ -546,3 +833,175 @@ class TransactionRepositoryCalculatePortfolioTest(unittest.TestCase):
                 asset_data['meta']['investment'],
                 test_asset_data['meta']['investment']
             )
+
+    def test_getCostBasis_returnRealizedPnlPerAsset(self) -> None:
+        portfolio = self._repository.calculate_portfolio(
+            include_transactions=True,
+            cost_basis='fifo'
+        )
+
+        self.assertEqual(portfolio['method'], 'fifo')
+        self.assertEqual(
+            sum(len(asset_data['transactions']) for asset_data in portfolio['assets'].values()),
+            len(self._TEST_VALID_TRANSACTIONS)
+        )
+        for asset_data in portfolio['assets'].values():
+            self.assertIn('realized_pnl', asset_data['meta'])
+            self.assertGreaterEqual(asset_data['meta']['amount'], 0)
+
+    def test_getCostBasisFromCursor_returnSameMetaAsWithTransactions(self) -> None:
+        portfolio = self._repository.calculate_portfolio(cost_basis='lifo')
+        test_portfolio = self._repository.calculate_portfolio(
+            include_transactions=True,
+            cost_basis='lifo'
+        )
+
+        for asset, asset_data in portfolio['assets'].items():
+            self.assertNotIn('transactions', asset_data)
+            self.assertEqual(asset_data['meta'], test_portfolio['assets'][asset]['meta'])
+
+
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self) -> None:
+        super().__init__(max_workers=1)
+        self.submitted = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.submitted.append(fn)
+        return super().submit(fn, *args, **kwargs)
+
+
+class AsyncTransactionRepositoryCostBasisTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self._connection = AsyncMongoClient()
+        self._crud_service = AsyncCRUDService(self._connection, TEST_TRANSACTION_COLLECTION)
+        self._repository = AsyncTransactionRepository(
+            crud_service=self._crud_service,
+            file_processor=None,
+            serializer=TransactionSerializer()
+        )
+        await self._crud_service.create_many(deepcopy(TEST_VALID_TRANSACTIONS))
+
+        self._executor = RecordingExecutor()
+        asyncio.get_running_loop().set_default_executor(self._executor)
+
+    async def asyncTearDown(self) -> None:
+        await self._connection.local[TEST_TRANSACTION_COLLECTION].drop()
+        await self._connection.close()
+
+    async def test_getCostBasis_matchLotsInExecutor(self) -> None:
+        portfolio = await self._repository.calculate_portfolio(cost_basis='fifo')
+
+        self.assertEqual(portfolio['method'], 'fifo')
+        self.assertEqual(self._executor.submitted, [calculate_cost_basis])
+
+    async def test_getCostBasisWithTransactions_matchLotsInExecutor(self) -> None:
+        portfolio = await self._repository.calculate_portfolio(
+            include_transactions=True,
+            cost_basis='fifo'
+        )
+
+        self.assertEqual(portfolio['method'], 'fifo')
+        self.assertEqual(len(self._executor.submitted), 1)
+
+
+class TransactionRepositoryCalculatePortfolioParityTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self._crud_service = CRUDService(
+            TEST_TRANSACTION_CONN,
+            TEST_TRANSACTION_COLLECTION
+        )
+        self._repository = TransactionRepository(
+            crud_service=self._crud_service,
+            file_processor=None,
+            serializer=TransactionSerializer()
+        )
+
+        randomizer = random.Random(42)
+        for _ in range(500):
+            self._crud_service.create({
+                'owner_id': randomizer.choice([
+                    'e5e403a76c58de3a4c2b5f16',
+                    '61f5b2c4a3ed85c67a304e5e'
+                ]),
+                'asset': randomizer.choice(['BTC', 'btc', 'ETH', 'Eth', 'ADA']),
+                'amount': round(randomizer.uniform(0.001, 10), 6),
+                'historical_price': round(randomizer.uniform(0.1, 60000), 2),
+                'currency': 'USD',
+                'tags': [],
+                'date': '2022-2-4',
+                'type': randomizer.choice(['buy', 'buy', 'sell'])
+            })
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        TEST_TRANSACTION_CONN.local[TEST_TRANSACTION_COLLECTION].drop()
+
+    def _assertPortfolioMetaEqual(self, portfolio: dict, test_portfolio: dict) -> None:
+        self.assertAlmostEqual(
+            portfolio['investment'],
+            test_portfolio['investment'],
+            places=4
+        )
+        self.assertEqual(
+            set(portfolio['assets']),
+            set(test_portfolio['assets'])
+        )
+        for asset, asset_data in portfolio['assets'].items():
+            test_meta = test_portfolio['assets'][asset]['meta']
+            for key in ('amount', 'investment', 'average_price'):
+                self.assertAlmostEqual(
+                    asset_data['meta'][key],
+                    test_meta[key],
+                    places=4
+                )
+
+    def _assertPortfoliosMatchPythonImplementation(self, **kwargs) -> None:
+        test_portfolio = build_portfolio(self._repository.get_all(**kwargs))
+
+        self._assertPortfolioMetaEqual(
+            self._repository.calculate_portfolio(**kwargs),
+            test_portfolio
+        )
+        self._assertPortfolioMetaEqual(
+            self._repository.calculate_portfolio(include_transactions=True, **kwargs),
+            test_portfolio
+        )
+
+    def test_getAllOwners_returnSameMetaAsPythonImplementation(self) -> None:
+        self._assertPortfoliosMatchPythonImplementation()
+
+    def test_getOwner_returnSameMetaAsPythonImplementation(self) -> None:
+        self._assertPortfoliosMatchPythonImplementation(owner_id='e5e403a76c58de3a4c2b5f16')
+
+    def test_getOwner_returnSameTransactionsAsPythonImplementation(self) -> None:
+        owner_id = 'e5e403a76c58de3a4c2b5f16'
+        portfolio = self._repository.calculate_portfolio(
+            include_transactions=True,
+            owner_id=owner_id
+        )
+        test_portfolio = build_portfolio(self._repository.get_all(owner_id=owner_id))
+
+        for asset, asset_data in test_portfolio['assets'].items():
+            transactions = portfolio['assets'][asset]['transactions']
+            self.assertEqual(
+                sorted(transaction['id'] for transaction in transactions),
+                sorted(transaction['id'] for transaction in asset_data['transactions'])
+            )
+
+    def test_getMetaOnly_returnAssetsWithoutTransactions(self) -> None:
+        portfolio = self._repository.calculate_portfolio()
+        test_portfolio = self._repository.calculate_portfolio(include_transactions=True)
+
+        self.assertEqual(set(portfolio['assets']), {'ADA', 'BTC', 'ETH'})
+        for asset, asset_data in portfolio['assets'].items():
+            self.assertNotIn('transactions', asset_data)
+            self.assertTrue(test_portfolio['assets'][asset]['transactions'])
+
+    def test_getNonExistsOwner_returnEmptyDict(self) -> None:
+        self.assertEqual(
+            self._repository.calculate_portfolio(owner_id='thisownerdoesnotexists'),
+            {}
+        )
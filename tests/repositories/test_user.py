@@ -1,9 +1,14 @@
+import hashlib
 import jwt
 import unittest
 
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 from copy import deepcopy
 
+from app.auth.hasher import PasswordHasher
+from app.auth.service import encode_token
+from app.database.indexes import INDEX_REGISTRY, ensure_indexes
 from app.database.service import CRUDService
 from app.repositories.user import UserRepository
 from app.serializers.user import UserSerializer
@@ -66,9 +71,20 @@ class UserRepositoryCreateTest(unittest.TestCase):
         test_user = self._TEST_VALID_USERS[0]
         new_serialized_user = self._repository.create(test_user)
         test_user['_id'] = ObjectId(new_serialized_user['id'])
+        test_user['hashed_password'] = new_serialized_user['hashed_password']
         test_serialized_user = self._serializer.serialize_one(test_user)
         self.assertEqual(test_serialized_user, new_serialized_user)
 
+    def test_getTakenUsername_raiseDuplicateKeyError(self) -> None:
+        ensure_indexes(TEST_USER_CONN.local, {TEST_USER_COLLECTION: INDEX_REGISTRY['users']})
+        self._repository.create(self._TEST_VALID_USERS[0])
+
+        self.assertRaises(
+            DuplicateKeyError,
+            self._repository.create,
+            self._TEST_VALID_USERS[0]
+        )
+
 
 class UserRepositoryGetUserByUsernameTest(unittest.TestCase):
     def setUp(self) -> None:
@@ -187,6 +203,23 @@ class UserRepositoryGetAuthenticatedUserTest(unittest.TestCase):
             {'authenticated': True, 'user': authenticate_data['user']}
         )
 
+    def test_getLegacyHash_rehashOnLogin(self) -> None:
+        legacy_user = {
+            'username': 'legacyuser',
+            'hashed_password': hashlib.blake2b(b'legacypassword').hexdigest()
+        }
+        TEST_USER_CONN.local[TEST_USER_COLLECTION].insert_one(legacy_user)
+
+        authenticate_data = self._repository.get_authenticated_user(
+            'legacyuser',
+            'legacypassword'
+        )
+
+        self.assertTrue(authenticate_data['authenticated'])
+        self.assertTrue(
+            self._repository.get_by_username('legacyuser')['hashed_password'].startswith('$scrypt$')
+        )
+
 
 class UserRepositoryCreateJWTTokenTest(unittest.TestCase):
     def setUp(self) -> None:
@@ -251,12 +284,12 @@ class UserRepositoryCreateJWTTokenTest(unittest.TestCase):
 
         self.assertEqual(
             set(jwt_data.keys()),
-            {'access_token', 'token_type'}
+            {'access_token', 'refresh_token', 'token_type', 'expires_in'}
         )
 
         self.assertEqual(
             set(payload.keys()),
-            {'authorized', 'id', 'username'}
+            {'authorized', 'id', 'username', 'type', 'iat', 'exp', 'jti'}
         )
 
 
@@ -326,10 +359,10 @@ class UserRepositoryVerifyJWTTokenTest(unittest.TestCase):
         )
 
     def test_getValidToken_returnEncodedUserData(self) -> None:
-        valid_token = jwt.encode(
+        valid_token = encode_token(
             {'username': 'testuser', 'id': 'userid'},
-            self._JWT_SECRET,
-            algorithm='HS256'
+            'access',
+            self._JWT_SECRET
         )
 
         verified_data = self._repository.verify_jwt_token(
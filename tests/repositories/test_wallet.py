@@ -163,6 +163,60 @@ class WalletRepositoryGetAllTest(unittest.TestCase):
         self.assertEqual(test_wallets, wallets)
 
 
+class WalletRepositoryGetPageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        self._crud_service = CRUDService(
+            TEST_WALLET_CONN,
+            TEST_WALLET_COLLECTION
+        )
+        self._serializer = WalletSerializer()
+        self._repository = WalletRepository(self._crud_service, self._serializer)
+
+        for index in range(5):
+            self._crud_service.create({
+                'owner_id': 'e5e403a76c58de3a4c2b5f16',
+                'address': f'testwalletaddress{index}',
+                'chain': 'testchain'
+            })
+        self._crud_service.create({
+            'owner_id': '61f5b2c4a3ed85c67a304e5e',
+            'address': 'otherwalletaddress',
+            'chain': 'testchain'
+        })
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        TEST_WALLET_CONN.local[TEST_WALLET_COLLECTION].drop()
+
+    def test_getPages_returnEveryOwnedWalletOnce(self) -> None:
+        page = self._repository.get_page(2, owner_id='e5e403a76c58de3a4c2b5f16')
+        wallets = page['data']
+        while page['next_cursor']:
+            page = self._repository.get_page(
+                2,
+                page['next_cursor'],
+                owner_id='e5e403a76c58de3a4c2b5f16'
+            )
+            self.assertLessEqual(len(page['data']), 2)
+            wallets += page['data']
+
+        self.assertEqual(
+            wallets,
+            self._repository.get_all(owner_id='e5e403a76c58de3a4c2b5f16')
+        )
+
+    def test_getLastPage_returnNoCursor(self) -> None:
+        page = self._repository.get_page(5, owner_id='e5e403a76c58de3a4c2b5f16')
+
+        self.assertEqual(len(page['data']), 5)
+        self.assertIsNone(page['next_cursor'])
+
+    def test_getInvalidCursor_raiseValueError(self) -> None:
+        self.assertRaises(ValueError, self._repository.get_page, 2, 'foo')
+
+
 class WalletRepositoryUpdateByIdTest(unittest.TestCase):
     def setUp(self) -> None:
         super().setUp()
@@ -0,0 +1,56 @@
+import unittest
+
+from datetime import date, datetime, timezone
+from pydantic import ValidationError
+
+from app.schemas.transaction import Transaction, parse_asset, parse_date
+from tests.consts import TEST_VALID_TRANSACTIONS
+
+
+class ParseDateTest(unittest.TestCase):
+    def test_getLegacyDate_returnDatetime(self) -> None:
+        self.assertEqual(parse_date('2022-2-4'), datetime(2022, 2, 4))
+
+    def test_getIsoDate_returnDatetime(self) -> None:
+        self.assertEqual(parse_date('2022-02-21'), datetime(2022, 2, 21))
+        self.assertEqual(
+            parse_date('2022-02-21T10:30:00+00:00'),
+            datetime(2022, 2, 21, 10, 30, tzinfo=timezone.utc)
+        )
+
+    def test_getDateObjects_returnDatetime(self) -> None:
+        self.assertEqual(parse_date(date(2022, 2, 4)), datetime(2022, 2, 4))
+        self.assertEqual(parse_date(datetime(2022, 2, 4, 1)), datetime(2022, 2, 4, 1))
+
+    def test_getInvalidDate_raiseValueError(self) -> None:
+        for value in ['foo', '2022-13-1', '2022-2', 20220204, None]:
+            self.assertRaises(ValueError, parse_date, value)
+
+
+class ParseAssetTest(unittest.TestCase):
+    def test_getAsset_returnAsset(self) -> None:
+        self.assertEqual(parse_asset('btc'), 'btc')
+
+    def test_getFieldPathAsset_raiseValueError(self) -> None:
+        for value in ['usdc.e', '$BTC', 'BTC$', '', None]:
+            self.assertRaises(ValueError, parse_asset, value)
+
+
+class TransactionSchemaTest(unittest.TestCase):
+    def test_getStringDate_storeDatetime(self) -> None:
+        transaction = Transaction(**TEST_VALID_TRANSACTIONS[0])
+        self.assertEqual(transaction.date, datetime(2022, 2, 4))
+
+    def test_getInvalidDate_raiseValidationError(self) -> None:
+        self.assertRaises(
+            ValidationError,
+            Transaction,
+            **{**TEST_VALID_TRANSACTIONS[0], 'date': 'foo'}
+        )
+
+    def test_getFieldPathAsset_raiseValidationError(self) -> None:
+        self.assertRaises(
+            ValidationError,
+            Transaction,
+            **{**TEST_VALID_TRANSACTIONS[0], 'asset': 'usdc.e'}
+        )
@@ -122,3 +122,20 @@ class TransactionSerializerManyTest(unittest.TestCase):
             },
             serialized_transactions[1]
         )
+
+    def test_skipValidation_returnSameAsValidated(self) -> None:
+        self.assertEqual(
+            TransactionSerializer.serialize_many(VALID_TEST_TRANSACTIONS, validate=False),
+            TransactionSerializer.serialize_many(VALID_TEST_TRANSACTIONS)
+        )
+
+    def test_skipValidationMissingKey_raiseValueError(self) -> None:
+        self.assertRaises(
+            ValueError,
+            TransactionSerializer.serialize_many,
+            [{'_id': '61f5b2c4a3ed85c67a304e5e'}],
+            validate=False
+        )
+
+    def test_projection_selectOnlyValidKeys(self) -> None:
+        self.assertEqual(set(TransactionSerializer.PROJECTION), TransactionSerializer.VALID_KEYS)
@@ -106,3 +106,20 @@ class WalletSerializerManyTest(unittest.TestCase):
             },
             serialized_wallets[1]
         )
+
+    def test_skipValidation_returnSameAsValidated(self) -> None:
+        self.assertEqual(
+            WalletSerializer.serialize_many(VALID_TEST_WALLETS, validate=False),
+            WalletSerializer.serialize_many(VALID_TEST_WALLETS)
+        )
+
+    def test_skipValidationMissingKey_raiseValueError(self) -> None:
+        self.assertRaises(
+            ValueError,
+            WalletSerializer.serialize_many,
+            [{'_id': '61f5b2c4a3ed85c67a304e5e'}],
+            validate=False
+        )
+
+    def test_projection_selectOnlyValidKeys(self) -> None:
+        self.assertEqual(set(WalletSerializer.PROJECTION), WalletSerializer.VALID_KEYS)
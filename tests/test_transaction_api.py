@@ -6,6 +6,7 @@ from fastapi.testclient import TestClient
 from pymongo import MongoClient
 
 from app.api.v1.user import get_current_user
+from app.nomicsapi.service import CLIENT_OPTIONS, NomicsAPIHandler, get_api_handler
 
 from app.repositories.transaction import \
     get_transaction_repository, \
@@ -17,11 +18,33 @@ from tests.consts import \
     TEST_VALID_TRANSACTIONS, \
     TEST_INVALID_TRANSACTIONS, \
     TEST_PORTFOLIO
+from tests.nomicsapi.server import PriceServer
+
+
+TEST_PRICE_SERVER = PriceServer()
+
+
+def setUpModule() -> None:
+    TEST_PRICE_SERVER.start()
+
+
+def tearDownModule() -> None:
+    TEST_PRICE_SERVER.stop()
+
+
+async def get_test_api_handler():
+    # TestClient runs every request on a new event loop, so the pooled client can not be shared
+    api_handler = NomicsAPIHandler(TEST_PRICE_SERVER.url, 'test-key', **CLIENT_OPTIONS)
+    try:
+        yield api_handler
+    finally:
+        await api_handler.close()
 
 
 portfolio_service.dependency_overrides[get_current_user] = lambda: {'id': 'e5e403a76c58de3a4c2b5f16'}
 portfolio_service.dependency_overrides[get_transaction_repository] = \
     get_test_transaction_repository
+portfolio_service.dependency_overrides[get_api_handler] = get_test_api_handler
 
 TEST_CLIENT = TestClient(portfolio_service)
 
@@ -71,11 +94,13 @@ class APITransactionCreateTest(unittest.TestCase):
         self.assertIn('id', response.json())
 
         transaction_data_wo_id = {k: v for k, v in response.json().items()
-                                       if k != 'id'}
+                                       if k not in {'id', 'date'}}
         self.assertEqual(
             transaction_data_wo_id,
-            self._TEST_VALID_TRANSACTIONS[0]
+            {k: v for k, v in self._TEST_VALID_TRANSACTIONS[0].items()
+                  if k != 'date'}
         )
+        self.assertEqual(response.json()['date'], '2022-02-04T00:00:00')
 
 
 class APITransactionGetByIdTest(unittest.TestCase):
@@ -5,6 +5,7 @@ from copy import deepcopy
 from fastapi.testclient import TestClient
 from pymongo import MongoClient
 
+from app.auth.service import get_test_token_verifier, get_token_verifier
 from app.repositories.user import get_user_repository, get_test_user_repository
 from app.main import portfolio_service
 
@@ -14,6 +15,7 @@ from tests.consts import \
 
 portfolio_service.dependency_overrides[get_user_repository] = \
     get_test_user_repository
+portfolio_service.dependency_overrides[get_token_verifier] = get_test_token_verifier
 
 TEST_CLIENT = TestClient(portfolio_service)
 
@@ -52,7 +54,7 @@ class APIUserCreateTest(unittest.TestCase):
         self.assertEqual(response.status_code, 201)
         self.assertEqual(
             set(response.json()),
-            {'access_token', 'token_type'}
+            {'access_token', 'refresh_token', 'token_type', 'expires_in'}
         )
 
     def test_getExistsUsername_returnHTTP400(self) -> None:
@@ -174,3 +176,74 @@ class APIUserGetCurrentUserTest(unittest.TestCase):
             response.json()['username'],
             self._test_user['username']
         )
+
+
+class APIUserRefreshTokenTest(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._TEST_VALID_USERS = deepcopy(TEST_VALID_USERS)
+        self._test_user = self._TEST_VALID_USERS[0]
+        self._mongo_client = MongoClient()
+        self._mongo_client.local['test_api_users'].insert_one(self._test_user)
+        self._auth_user = TEST_CLIENT.post(
+            '/api/v1/users/auth',
+            {
+                'username': self._test_user['username'],
+                'password': self._test_user['hashed_password']
+            }
+        ).json()
+
+    def tearDown(self) -> None:
+        self._mongo_client.local['test_api_users'].drop()
+        self._mongo_client.local['test_api_revoked_tokens'].drop()
+        super().tearDown()
+
+    def test_getRefreshToken_returnNewTokens(self) -> None:
+        response = TEST_CLIENT.post(
+            '/api/v1/users/refresh',
+            json={'refresh_token': self._auth_user['refresh_token']}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(
+            response.json()['refresh_token'],
+            self._auth_user['refresh_token']
+        )
+
+    def test_getUsedRefreshToken_returnHTTP401(self) -> None:
+        TEST_CLIENT.post(
+            '/api/v1/users/refresh',
+            json={'refresh_token': self._auth_user['refresh_token']}
+        )
+        response = TEST_CLIENT.post(
+            '/api/v1/users/refresh',
+            json={'refresh_token': self._auth_user['refresh_token']}
+        )
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_getAccessTokenAsRefreshToken_returnHTTP401(self) -> None:
+        response = TEST_CLIENT.post(
+            '/api/v1/users/refresh',
+            json={'refresh_token': self._auth_user['access_token']}
+        )
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_revokeAccessToken(self) -> None:
+        headers = {'Authorization': f'''Bearer {self._auth_user['access_token']}'''}
+        response = TEST_CLIENT.post(
+            '/api/v1/users/logout',
+            json={'refresh_token': self._auth_user['refresh_token']},
+            headers=headers
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(TEST_CLIENT.get('/api/v1/users/me', headers=headers).status_code, 401)
+        self.assertEqual(
+            TEST_CLIENT.post(
+                '/api/v1/users/refresh',
+                json={'refresh_token': self._auth_user['refresh_token']}
+            ).status_code,
+            401
+        )